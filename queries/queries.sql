@@ -62,17 +62,143 @@ FROM (
 ) t
 ORDER BY year;
 
+-- Normalized zipcode -> municipality -> province lookup, one row per zipcode.
+-- Zipcodes are trimmed, upper-cased and stripped of a 'B-' prefix; foreign
+-- addresses are grouped under 'Abroad' by country and unusable zipcodes under 'Unknown'.
+CREATE TEMPORARY TABLE geo_zipcodes AS
+-- materialized: the CASE expressions below reference zipcode many times
+WITH normalized AS MATERIALIZED (
+    SELECT
+        e.EnterpriseNumber AS enterprise_number,
+        NULLIF(TRIM(a.CountryNL), '') AS country,
+        COALESCE(NULLIF(TRIM(a.MunicipalityNL), ''), NULLIF(TRIM(a.MunicipalityFR), '')) AS municipality,
+        REPLACE(REPLACE(UPPER(TRIM(COALESCE(a.Zipcode, ''))), ' ', ''), 'B-', '') AS zipcode
+    FROM address a
+    JOIN enterprise e ON a.EntityNumber = e.EnterpriseNumber
+),
+located AS (
+    SELECT
+        enterprise_number,
+        CASE
+            WHEN country IS NOT NULL AND country NOT IN ('België', 'Belgique') THEN 'Abroad'
+            WHEN zipcode NOT GLOB '[1-9][0-9][0-9][0-9]' THEN 'Unknown'
+            WHEN zipcode < '1300' THEN 'Brussels-Capital Region'
+            WHEN zipcode < '1500' THEN 'Walloon Brabant'
+            WHEN zipcode < '2000' THEN 'Flemish Brabant'
+            WHEN zipcode < '3000' THEN 'Antwerp'
+            WHEN zipcode < '3500' THEN 'Flemish Brabant'
+            WHEN zipcode < '4000' THEN 'Limburg'
+            WHEN zipcode < '5000' THEN 'Liège'
+            WHEN zipcode < '6000' THEN 'Namur'
+            WHEN zipcode < '6600' THEN 'Hainaut'
+            WHEN zipcode < '7000' THEN 'Luxembourg'
+            WHEN zipcode < '8000' THEN 'Hainaut'
+            WHEN zipcode < '9000' THEN 'West Flanders'
+            ELSE 'East Flanders'
+        END AS province,
+        country,
+        municipality,
+        zipcode
+    FROM normalized
+),
+placed AS (
+    SELECT
+        enterprise_number,
+        province,
+        -- foreign zipcodes are only unique within their country
+        CASE WHEN province = 'Abroad' THEN country ELSE '' END AS area,
+        CASE
+            WHEN province = 'Abroad' THEN country
+            WHEN province = 'Unknown' THEN 'Unknown'
+            ELSE COALESCE(municipality, zipcode)
+        END AS municipality,
+        CASE
+            WHEN province = 'Unknown' OR zipcode = '' THEN 'Unknown'
+            ELSE zipcode
+        END AS zipcode
+    FROM located
+),
+zipcode_counts AS (
+    SELECT
+        province,
+        area,
+        zipcode,
+        NULL AS municipality,
+        COUNT(DISTINCT enterprise_number) AS company_count
+    FROM placed
+    GROUP BY province, area, zipcode
+),
+zipcode_names AS (
+    -- most frequent municipality spelling per zipcode
+    SELECT
+        province,
+        area,
+        zipcode,
+        municipality,
+        NULL AS company_count,
+        ROW_NUMBER() OVER (
+            PARTITION BY province, area, zipcode
+            ORDER BY COUNT(*) DESC, municipality
+        ) AS name_rank
+    FROM placed
+    GROUP BY province, area, zipcode, municipality
+)
+-- counts and names share the key: stack and collapse them instead of joining
+SELECT
+    province,
+    MAX(municipality) AS municipality,
+    zipcode,
+    MAX(company_count) AS company_count
+FROM (
+    SELECT province, area, zipcode, municipality, company_count FROM zipcode_counts
+    UNION ALL
+    SELECT province, area, zipcode, municipality, company_count FROM zipcode_names WHERE name_rank = 1
+)
+GROUP BY province, area, zipcode;
+
 -- 5. geographical distribution of companies
+-- (province -> municipality -> zipcode rollup: top 20 municipalities per province
+-- and top 10 zipcodes per municipality, the rest summed into 'Other' rows)
+WITH municipalities AS (
+    SELECT
+        *,
+        SUM(company_count) OVER (PARTITION BY province, municipality) AS municipality_count
+    FROM geo_zipcodes
+),
+ranked AS (
+    SELECT
+        province,
+        municipality,
+        zipcode,
+        company_count,
+        DENSE_RANK() OVER (
+            PARTITION BY province
+            ORDER BY municipality_count DESC, municipality
+        ) AS municipality_rank,
+        ROW_NUMBER() OVER (
+            PARTITION BY province, municipality
+            ORDER BY company_count DESC, zipcode
+        ) AS zipcode_rank
+    FROM municipalities
+),
+bucketed AS (
+    SELECT
+        province,
+        CASE WHEN municipality_rank <= 20 THEN municipality ELSE 'Other municipalities' END AS municipality,
+        CASE
+            WHEN municipality_rank <= 20 AND zipcode_rank <= 10 THEN zipcode
+            ELSE 'Other zipcodes'
+        END AS zipcode,
+        company_count
+    FROM ranked
+)
 SELECT
-    a.Zipcode,
-    COUNT(DISTINCT e.EnterpriseNumber) AS company_count,
-    ROUND(
-        COUNT(e.EnterpriseNumber) * 100.0 / SUM(COUNT(e.EnterpriseNumber)) OVER (), 
-        2
-    ) AS percentage
-FROM address a
-JOIN enterprise e ON a.EntityNumber = e.EnterpriseNumber
-GROUP BY a.Zipcode
+    province,
+    municipality,
+    zipcode,
+    SUM(company_count) AS company_count
+FROM bucketed
+GROUP BY province, municipality, zipcode
 ORDER BY company_count DESC;
 
 --Personal query below: 
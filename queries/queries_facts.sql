@@ -0,0 +1,598 @@
+-- 1. juridical form percentage
+SELECT
+    JuridicalForm,
+    COUNT(EnterpriseNumber) AS company_count,
+    ROUND(
+        COUNT(EnterpriseNumber) * 100.0 / SUM(COUNT(EnterpriseNumber)) OVER (), 
+        2
+    ) AS percentage
+FROM enterprise
+GROUP BY JuridicalForm
+ORDER BY company_count DESC;
+
+-- 2. company statuses
+SELECT
+    Status,
+    count(*) AS count
+FROM enterprise
+GROUP BY Status
+ORDER BY count DESC;
+
+-- 3.average company age(NACE codes)
+SELECT
+    t.NaceCode,
+    ROUND(AVG(company_age), 2) AS avg_company_age
+FROM (
+    SELECT
+        a.NaceCode,
+        (JULIANDAY('now') - JULIANDAY(
+            SUBSTR(e.StartDate, 7, 4) || '-' || SUBSTR(e.StartDate, 4, 2) || '-' || SUBSTR(e.StartDate, 1, 2)
+        )) / 365.25 AS company_age  
+    FROM 
+        activity a
+    JOIN 
+        enterprise e 
+    ON 
+        a.EntityNumber = e.EnterpriseNumber
+    WHERE 
+        e.StartDate IS NOT NULL
+) t
+GROUP BY t.NaceCode
+ORDER BY avg_company_age DESC;
+
+-- 4. company creation trends
+SELECT
+  year,
+  new_companies,
+  LAG(new_companies) OVER (ORDER BY year) AS prev_year,
+  ROUND(
+    (new_companies - LAG(new_companies) OVER (ORDER BY year)) * 100.0 /
+    LAG(new_companies) OVER (ORDER BY year),
+    2
+  ) AS yoy_change
+FROM (
+  SELECT
+    STRFTIME('%Y', 
+        SUBSTR(StartDate, 7, 4) || '-' || SUBSTR(StartDate, 4, 2) || '-' || SUBSTR(StartDate, 1, 2)
+    ) AS year,
+    COUNT(*) AS new_companies
+  FROM enterprise
+  WHERE StartDate IS NOT NULL
+  GROUP BY year
+) t
+ORDER BY year;
+
+-- Normalized zipcode -> municipality -> province lookup, one row per zipcode.
+-- Zipcodes are trimmed, upper-cased and stripped of a 'B-' prefix; foreign
+-- addresses are grouped under 'Abroad' by country and unusable zipcodes under 'Unknown'.
+CREATE TEMPORARY TABLE geo_zipcodes AS
+-- materialized: the CASE expressions below reference zipcode many times
+WITH normalized AS MATERIALIZED (
+    SELECT
+        e.EnterpriseNumber AS enterprise_number,
+        NULLIF(TRIM(a.CountryNL), '') AS country,
+        COALESCE(NULLIF(TRIM(a.MunicipalityNL), ''), NULLIF(TRIM(a.MunicipalityFR), '')) AS municipality,
+        REPLACE(REPLACE(UPPER(TRIM(COALESCE(a.Zipcode, ''))), ' ', ''), 'B-', '') AS zipcode
+    FROM address a
+    JOIN enterprise e ON a.EntityNumber = e.EnterpriseNumber
+),
+located AS (
+    SELECT
+        enterprise_number,
+        CASE
+            WHEN country IS NOT NULL AND country NOT IN ('België', 'Belgique') THEN 'Abroad'
+            WHEN zipcode NOT GLOB '[1-9][0-9][0-9][0-9]' THEN 'Unknown'
+            WHEN zipcode < '1300' THEN 'Brussels-Capital Region'
+            WHEN zipcode < '1500' THEN 'Walloon Brabant'
+            WHEN zipcode < '2000' THEN 'Flemish Brabant'
+            WHEN zipcode < '3000' THEN 'Antwerp'
+            WHEN zipcode < '3500' THEN 'Flemish Brabant'
+            WHEN zipcode < '4000' THEN 'Limburg'
+            WHEN zipcode < '5000' THEN 'Liège'
+            WHEN zipcode < '6000' THEN 'Namur'
+            WHEN zipcode < '6600' THEN 'Hainaut'
+            WHEN zipcode < '7000' THEN 'Luxembourg'
+            WHEN zipcode < '8000' THEN 'Hainaut'
+            WHEN zipcode < '9000' THEN 'West Flanders'
+            ELSE 'East Flanders'
+        END AS province,
+        country,
+        municipality,
+        zipcode
+    FROM normalized
+),
+placed AS (
+    SELECT
+        enterprise_number,
+        province,
+        -- foreign zipcodes are only unique within their country
+        CASE WHEN province = 'Abroad' THEN country ELSE '' END AS area,
+        CASE
+            WHEN province = 'Abroad' THEN country
+            WHEN province = 'Unknown' THEN 'Unknown'
+            ELSE COALESCE(municipality, zipcode)
+        END AS municipality,
+        CASE
+            WHEN province = 'Unknown' OR zipcode = '' THEN 'Unknown'
+            ELSE zipcode
+        END AS zipcode
+    FROM located
+),
+zipcode_counts AS (
+    SELECT
+        province,
+        area,
+        zipcode,
+        NULL AS municipality,
+        COUNT(DISTINCT enterprise_number) AS company_count
+    FROM placed
+    GROUP BY province, area, zipcode
+),
+zipcode_names AS (
+    -- most frequent municipality spelling per zipcode
+    SELECT
+        province,
+        area,
+        zipcode,
+        municipality,
+        NULL AS company_count,
+        ROW_NUMBER() OVER (
+            PARTITION BY province, area, zipcode
+            ORDER BY COUNT(*) DESC, municipality
+        ) AS name_rank
+    FROM placed
+    GROUP BY province, area, zipcode, municipality
+)
+-- counts and names share the key: stack and collapse them instead of joining
+SELECT
+    province,
+    MAX(municipality) AS municipality,
+    zipcode,
+    MAX(company_count) AS company_count
+FROM (
+    SELECT province, area, zipcode, municipality, company_count FROM zipcode_counts
+    UNION ALL
+    SELECT province, area, zipcode, municipality, company_count FROM zipcode_names WHERE name_rank = 1
+)
+GROUP BY province, area, zipcode;
+
+-- 5. geographical distribution of companies
+-- (province -> municipality -> zipcode rollup: top 20 municipalities per province
+-- and top 10 zipcodes per municipality, the rest summed into 'Other' rows)
+WITH municipalities AS (
+    SELECT
+        *,
+        SUM(company_count) OVER (PARTITION BY province, municipality) AS municipality_count
+    FROM geo_zipcodes
+),
+ranked AS (
+    SELECT
+        province,
+        municipality,
+        zipcode,
+        company_count,
+        DENSE_RANK() OVER (
+            PARTITION BY province
+            ORDER BY municipality_count DESC, municipality
+        ) AS municipality_rank,
+        ROW_NUMBER() OVER (
+            PARTITION BY province, municipality
+            ORDER BY company_count DESC, zipcode
+        ) AS zipcode_rank
+    FROM municipalities
+),
+bucketed AS (
+    SELECT
+        province,
+        CASE WHEN municipality_rank <= 20 THEN municipality ELSE 'Other municipalities' END AS municipality,
+        CASE
+            WHEN municipality_rank <= 20 AND zipcode_rank <= 10 THEN zipcode
+            ELSE 'Other zipcodes'
+        END AS zipcode,
+        company_count
+    FROM ranked
+)
+SELECT
+    province,
+    municipality,
+    zipcode,
+    SUM(company_count) AS company_count
+FROM bucketed
+GROUP BY province, municipality, zipcode
+ORDER BY company_count DESC;
+
+--Personal query below (rewritten to read the materialized enterprise_facts table,
+--built by scripts/enterprise_facts.py; start_year is NULL for malformed StartDates):
+        --1. sector growth yoy trends(2000-2025)
+        --2. Overall growth by industry
+        --3. calculate recent 10 years average growth rate by industry
+        --4. Indentify the rapid rising emerging industries(industries that appeared in large numbers after 2000)
+        --5. Invisible champion anlysis: industries with over-average-growth but moderate scale
+        --6. Cruel Industry Analysis(High-growth,high-elimination,fiercely competitive industries)
+        --7. Comprehensive Comparison: Invisible Champion vs Cruel Industry Characteristics Comparison
+
+--Create nacecode yoy industrial growth CTE
+WITH sector_yearly_growth AS(
+    SELECT
+        start_year AS year,
+        nace_code,
+        sector_name,
+        COUNT(DISTINCT enterprise_number) AS new_companies
+    FROM enterprise_facts
+    WHERE
+        start_year BETWEEN 2000 AND 2025
+        AND nace_code IS NOT NULL
+    GROUP BY
+        start_year, nace_code, sector_name
+),
+-- calculate yoy CTE
+sector_growth AS(
+    SELECT
+        year,
+        nace_code,
+        sector_name,
+        new_companies,
+        LAG(new_companies) OVER (
+            PARTITION BY nace_code
+            ORDER BY year
+        ) AS prev_year_count
+        FROM sector_yearly_growth
+)
+-- Results
+SELECT
+    g.year,
+    g.nace_code,
+    g.sector_name,
+    g.new_companies,
+    g.prev_year_count,
+-- calculate yoy rate
+    CASE
+        WHEN g.prev_year_count IS NULL THEN NULL
+        WHEN g.prev_year_count = 0 THEN NULL
+        ELSE ROUND(
+            (g.new_companies - g.prev_year_count) * 100.0 / g.prev_year_count,
+            2
+        )
+    END AS yoy_growth,
+    CASE
+        WHEN g.prev_year_count IS NULL THEN 'New Sector'
+        WHEN g.new_companies > g.prev_year_count THEN 'Growth'
+        WHEN g.new_companies < g.prev_year_count THEN 'Decline'
+        ELSE 'Stable'
+    END AS growth_category
+FROM sector_growth g
+WHERE g.year >= 1970
+ORDER BY g.year DESC;
+
+
+-- 2. Overall growth by industry 1970 vs 2025
+WITH sector_period_data AS (
+    SELECT
+        sector_name,
+        start_year AS year,
+        COUNT(DISTINCT enterprise_number) AS new_companies
+    FROM enterprise_facts
+    WHERE start_year IN (1970, 1980, 1990, 2000, 2010, 2020, 2025)
+    GROUP BY sector_name, start_year
+),
+sector_comparison AS (
+    SELECT
+        sector_name,
+        SUM(CASE WHEN year = 1970 THEN new_companies ELSE 0 END) AS companies_1970,
+        SUM(CASE WHEN year = 1980 THEN new_companies ELSE 0 END) AS companies_1980,
+        SUM(CASE WHEN year = 1990 THEN new_companies ELSE 0 END) AS companies_1990,
+        SUM(CASE WHEN year = 2000 THEN new_companies ELSE 0 END) AS companies_2000,
+        SUM(CASE WHEN year = 2010 THEN new_companies ELSE 0 END) AS companies_2010,
+        SUM(CASE WHEN year = 2020 THEN new_companies ELSE 0 END) AS companies_2020,
+        SUM(CASE WHEN year = 2025 THEN new_companies ELSE 0 END) AS companies_2025,
+        SUM(new_companies) AS total_companies
+    FROM sector_period_data
+    GROUP BY sector_name
+)
+SELECT
+    sector_name,
+    companies_1970,
+    companies_2025,
+    total_companies,
+    CASE
+        WHEN companies_1970 = 0 THEN 'New Sector (No 1970 data)'
+        ELSE ROUND(
+            (companies_2025 - companies_1970) * 100.0 / companies_1970,
+            2
+        )
+    END AS growth_rate_1970_2025,
+    -- calculate companies CAGR (Compound Annual Growth Rate)
+    CASE
+        WHEN companies_1970 > 0 THEN
+            ROUND(
+                (POWER(CAST(companies_2025 AS REAL) / companies_1970, 1.0/54) - 1) * 100,
+                2
+            )
+        ELSE NULL
+    END AS cagr_1970_2025
+FROM sector_comparison
+WHERE total_companies >= 10  -- drop industries have less than 10 companies
+ORDER BY
+    CASE
+        WHEN companies_1970 > 0 THEN
+            (POWER(CAST(companies_2025 AS REAL) / companies_1970, 1.0/54) - 1) * 100
+        ELSE -999
+    END DESC
+LIMIT 15;
+
+-- 3. calculate recent 10 years average growth rate by industry
+WITH recent_growth AS (
+    SELECT
+        sector_name,
+        start_year AS year,
+        COUNT(DISTINCT enterprise_number) AS new_companies
+    FROM enterprise_facts
+    WHERE start_year BETWEEN 2015 AND 2025
+    GROUP BY sector_name, start_year
+),
+yearly_growth AS (
+    SELECT
+        sector_name,
+        year,
+        new_companies,
+        LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year) AS prev_year,
+        CASE
+            WHEN LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year) > 0 THEN
+                ROUND(
+                    (new_companies - LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year)) * 100.0 /
+                    LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year),
+                    2
+                )
+            ELSE NULL
+        END AS yoy_growth
+    FROM recent_growth
+)
+SELECT
+    sector_name,
+    COUNT(year) AS years_with_data,
+    SUM(new_companies) AS total_new_companies_2015_2025,
+    ROUND(AVG(new_companies), 1) AS avg_annual_new_companies,
+    ROUND(AVG(yoy_growth), 2) AS avg_yoy_growth_rate,
+    MIN(yoy_growth) AS min_growth_rate,
+    MAX(yoy_growth) AS max_growth_rate
+FROM yearly_growth
+WHERE yoy_growth IS NOT NULL
+GROUP BY sector_name
+HAVING COUNT(year) >= 5  -- at least 5 years date
+    AND SUM(new_companies) >= 50  -- at least 50 companies
+ORDER BY avg_yoy_growth_rate DESC
+LIMIT 15;
+
+-- 4. Indentify the rapid rising emerging industries(industries that appeared in large numbers after 2000)
+WITH emerging_sectors AS (
+    SELECT
+        sector_name,
+        start_year AS year,
+        COUNT(DISTINCT enterprise_number) AS new_companies
+    FROM enterprise_facts
+    WHERE start_year BETWEEN 1990 AND 2025
+    GROUP BY sector_name, start_year
+)
+SELECT
+    sector_name,
+    SUM(CASE WHEN year BETWEEN 1990 AND 1999 THEN new_companies ELSE 0 END) AS companies_1990s,
+    SUM(CASE WHEN year BETWEEN 2000 AND 2009 THEN new_companies ELSE 0 END) AS companies_2000s,
+    SUM(CASE WHEN year BETWEEN 2010 AND 2019 THEN new_companies ELSE 0 END) AS companies_2010s,
+    SUM(CASE WHEN year BETWEEN 2020 AND 2025 THEN new_companies ELSE 0 END) AS companies_2020s,
+    SUM(new_companies) AS total_companies,
+    -- Calculate the proportion of companies after 2000
+    ROUND(
+        SUM(CASE WHEN year >= 2000 THEN new_companies ELSE 0 END) * 100.0 /
+        SUM(new_companies),
+        1
+    ) AS post_2000_percentage
+FROM emerging_sectors
+GROUP BY sector_name
+HAVING SUM(new_companies) >= 100  -- at least 100 companies
+ORDER BY post_2000_percentage DESC, companies_2020s DESC
+LIMIT 15;
+
+
+-- 5. Invisible champion anlysis: industries with over-average-growth but moderate scale
+WITH sector_stats AS (
+    SELECT
+        sector_name,
+        start_year AS year,
+        COUNT(DISTINCT enterprise_number) AS new_companies
+    FROM enterprise_facts
+    WHERE start_year BETWEEN 2015 AND 2025
+    GROUP BY sector_name, start_year
+),
+sector_growth AS (
+    SELECT
+        sector_name,
+        year,
+        new_companies,
+        LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year) AS prev_year,
+        CASE
+            WHEN LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year) > 0 THEN
+                ROUND(
+                    (new_companies - LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year)) * 100.0 /
+                    LAG(new_companies) OVER (PARTITION BY sector_name ORDER BY year),
+                    2
+                )
+            ELSE NULL
+        END AS yoy_growth
+    FROM sector_stats
+),
+sector_summary AS (
+    SELECT
+        sector_name,
+        COUNT(year) AS years_with_data,
+        SUM(new_companies) AS total_new_companies,
+        ROUND(AVG(new_companies), 1) AS avg_annual_new_companies,
+        ROUND(AVG(yoy_growth), 2) AS avg_yoy_growth_rate,
+        ROUND(SQRT(AVG(yoy_growth * yoy_growth) - AVG(yoy_growth) * AVG(yoy_growth)), 2
+) AS growth_volatility
+    FROM sector_growth
+    WHERE yoy_growth IS NOT NULL
+    GROUP BY sector_name
+    HAVING COUNT(year) >= 5
+),
+market_averages AS (
+    SELECT
+        AVG(avg_annual_new_companies) AS market_avg_companies,
+        AVG(avg_yoy_growth_rate) AS market_avg_growth
+    FROM sector_summary
+    WHERE total_new_companies >= 50
+)
+SELECT
+    s.sector_name,
+    s.total_new_companies,
+    s.avg_annual_new_companies,
+    s.avg_yoy_growth_rate,
+    s.growth_volatility,
+    m.market_avg_companies,
+    m.market_avg_growth,
+    -- Invisible champion index
+    CASE
+        WHEN s.avg_yoy_growth_rate > m.market_avg_growth
+        AND s.avg_annual_new_companies BETWEEN m.market_avg_companies * 0.3 AND m.market_avg_companies * 1.5
+        AND s.growth_volatility < 50  -- the growth is relatively stable
+        THEN '🏆 Invisible champion'
+        WHEN s.avg_yoy_growth_rate > m.market_avg_growth * 1.5
+        THEN '🚀 High speed growth'
+        WHEN s.avg_annual_new_companies > m.market_avg_companies * 2
+        THEN '🏭 scale giants'
+        ELSE '📊 ordinary industries'
+    END AS sector_category,
+    -- Invisible champion score(grwoth rate weight 60%,stability weight 40%)
+    ROUND(
+        (s.avg_yoy_growth_rate / m.market_avg_growth * 0.6) +
+        ((100 - COALESCE(s.growth_volatility, 50)) / 100 * 0.4),
+        2
+    ) AS hidden_champion_score
+FROM sector_summary s
+CROSS JOIN market_averages m
+WHERE s.total_new_companies >= 50
+ORDER BY
+    CASE WHEN s.avg_yoy_growth_rate > m.market_avg_growth
+        AND s.avg_annual_new_companies BETWEEN m.market_avg_companies * 0.3 AND m.market_avg_companies * 1.5
+        AND s.growth_volatility < 50 THEN 1 ELSE 2 END,
+    hidden_champion_score DESC
+LIMIT 20;
+
+-- 6. Cruel Industry Analysis(High-growth,high-elimination,fiercely competitive industries)
+--    activity_rows weights the SUMs so they match the row counts of the original activity join
+WITH active_enterprises AS (
+    -- get data of activate componies
+    SELECT
+        sector_name,
+        COUNT(DISTINCT enterprise_number) AS total_enterprises,
+        -- classify by "Status"
+        SUM(CASE WHEN status = 'AC' THEN activity_rows ELSE 0 END) AS active_count,
+        SUM(CASE WHEN status IN ('ST', 'CE') THEN activity_rows ELSE 0 END) AS ceased_count,
+        -- classify by "StartDate"
+        SUM(CASE WHEN start_year >= 2020 THEN activity_rows ELSE 0 END) AS recent_enterprises,
+        SUM(CASE WHEN start_year BETWEEN 2015 AND 2019 THEN activity_rows ELSE 0 END) AS mid_period_enterprises
+    FROM enterprise_facts
+    WHERE start_year >= 2010  -- focus on last 15 years data
+    GROUP BY sector_name
+),
+recent_growth AS (
+    -- get recent growth data
+    SELECT
+        sector_name,
+        SUM(CASE WHEN start_year BETWEEN 2020 AND 2025 THEN activity_rows ELSE 0 END) AS new_2020_2025,
+        SUM(CASE WHEN start_year BETWEEN 2015 AND 2019 THEN activity_rows ELSE 0 END) AS new_2015_2019
+    FROM enterprise_facts
+    WHERE start_year BETWEEN 2015 AND 2025
+    GROUP BY sector_name
+)
+SELECT
+    ae.sector_name,
+    ae.total_enterprises,
+    ae.active_count,
+    ae.ceased_count,
+    ae.recent_enterprises,
+    rg.new_2020_2025,
+    rg.new_2015_2019,
+    -- calculate important index
+    ROUND(ae.ceased_count * 100.0 / ae.total_enterprises, 2) AS cessation_rate,
+    ROUND(ae.recent_enterprises * 100.0 / ae.total_enterprises, 2) AS recent_entry_rate,
+    CASE
+        WHEN rg.new_2015_2019 > 0 THEN
+            ROUND((rg.new_2020_2025 - rg.new_2015_2019) * 100.0 / rg.new_2015_2019, 2)
+        ELSE NULL
+    END AS growth_acceleration,
+    -- Cruelity index = (shutdown rate * 0.4) + (new entry rate * 0.3) + (growth acceleration/10 * 0.3)
+    ROUND(
+        (ae.ceased_count * 100.0 / ae.total_enterprises * 0.4) +
+        (ae.recent_enterprises * 100.0 / ae.total_enterprises * 0.3) +
+        (CASE
+            WHEN rg.new_2015_2019 > 0 THEN
+                ((rg.new_2020_2025 - rg.new_2015_2019) * 100.0 / rg.new_2015_2019 / 10 * 0.3)
+            ELSE 0
+        END),
+        2
+    ) AS battleground_index,
+    -- industry classification
+    CASE
+        WHEN ae.ceased_count * 100.0 / ae.total_enterprises > 15
+        AND ae.recent_enterprises * 100.0 / ae.total_enterprises > 25
+        THEN '⚔️ Cruel industry'
+        WHEN ae.ceased_count * 100.0 / ae.total_enterprises > 20
+        THEN '💀 High elimination'
+        WHEN ae.recent_enterprises * 100.0 / ae.total_enterprises > 30
+        THEN '🌊 New popular'
+        WHEN ae.ceased_count * 100.0 / ae.total_enterprises < 5
+        THEN '🛡️ Stable fortress'
+        ELSE '📈 Conventional competition'
+    END AS competition_category
+FROM active_enterprises ae
+LEFT JOIN recent_growth rg ON ae.sector_name = rg.sector_name
+WHERE ae.total_enterprises >= 100  -- Industries with too small filter samples
+ORDER BY battleground_index DESC
+LIMIT 20;
+
+-- 7. Comprehensive Comparison: Invisible Champion vs Cruel Industry Characteristics Comparison
+WITH sector_classification AS (
+    SELECT
+        sector_name,
+        COUNT(DISTINCT enterprise_number) AS total_enterprises,
+        SUM(CASE WHEN status IN ('ST', 'CE') THEN activity_rows ELSE 0 END) AS ceased_count,
+        SUM(CASE WHEN start_year >= 2020 THEN activity_rows ELSE 0 END) AS recent_entries,
+        -- row-weighted mean, equal to AVG() over the original activity join
+        SUM(activity_rows * (JULIANDAY('2025-12-31') - JULIANDAY(start_date)) / 365.25) /
+            SUM(CASE WHEN JULIANDAY(start_date) IS NOT NULL THEN activity_rows END) AS avg_company_age
+    FROM enterprise_facts
+    WHERE start_year IS NOT NULL
+    GROUP BY sector_name
+    HAVING COUNT(DISTINCT enterprise_number) >= 50
+)
+SELECT
+    sector_name,
+    total_enterprises,
+    ROUND(ceased_count * 100.0 / total_enterprises, 2) as cessation_rate,
+    ROUND(recent_entries * 100.0 / total_enterprises, 2) as recent_entry_rate,
+    ROUND(avg_company_age, 1) as avg_company_age,
+    -- Industry type judgement
+    CASE
+        WHEN ceased_count * 100.0 / total_enterprises > 15
+        AND recent_entries * 100.0 / total_enterprises > 25
+        THEN '⚔️ Cruel Industry'
+        WHEN ceased_count * 100.0 / total_enterprises < 8
+        AND recent_entries * 100.0 / total_enterprises BETWEEN 10 AND 20
+        AND avg_company_age > 10
+        THEN '🏆 Invisible Champion'
+        WHEN recent_entries * 100.0 / total_enterprises > 30
+        THEN '🌊 New popular Industry'
+        WHEN avg_company_age > 20
+        THEN '🏛️ Traditional stability'
+        ELSE '📊 Conventional industry'
+    END AS industry_archetype
+FROM sector_classification
+ORDER BY
+    CASE
+        WHEN ceased_count * 100.0 / total_enterprises > 15
+        AND recent_entries * 100.0 / total_enterprises > 25 THEN 1
+        WHEN ceased_count * 100.0 / total_enterprises < 8
+        AND recent_entries * 100.0 / total_enterprises BETWEEN 10 AND 20 THEN 2
+        ELSE 3
+    END,
+    cessation_rate DESC;
@@ -0,0 +1,427 @@
+"""
+This module replaces the seven repeated enterprise ⨝ activity ⨝ nace_mapping
+scans of the "Personal query" section of queries/queries.sql with a single scan.
+
+The scan produces a sector × year × status count cube (pandas-backed). Since an
+enterprise has exactly one start year and one status, distinct-enterprise
+counts are additive over the cube cells, so every sector/year-window metric of
+overall_growth, recent_growth, emerging_industries, invisible_champions,
+cruel_industries and industry_archetypes can be derived from it without
+touching the database again.
+
+Cube measures
+    enterprises : COUNT(DISTINCT EnterpriseNumber) in the cell
+    join_rows   : rows of the enterprise ⨝ activity join in the cell
+                  (what the SUM(CASE ...) counters of queries 6 and 7 count)
+    age_sum     : sum of the company age at 2025-12-31 over the join rows
+    age_rows    : join rows with a computable age
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from columnar import require_pyarrow, write_arrow_frame
+from datasets import DATA_DIR, DATA_FORMATS, dataset_path
+from enterprise_facts import FACTS_TABLE, VALID_START_DATE_SQL
+from query_runner import QUERIES_PATH, connect_readonly, load_queries
+
+CUBE_COLUMNS = ['sector_name', 'year', 'status', 'enterprises', 'join_rows', 'age_sum', 'age_rows']
+
+# Datasets derived from the cube
+ENGINE_DATASETS = [
+    'overall_growth', 'recent_growth', 'emerging_industries',
+    'invisible_champions', 'cruel_industries', 'industry_archetypes'
+]
+
+_CUBE_FROM_JOIN_SQL = f"""
+SELECT
+    sector_name,
+    year,
+    status,
+    COUNT(DISTINCT enterprise_number),
+    COUNT(*),
+    SUM(age),
+    COUNT(age)
+FROM (
+    SELECT
+        CASE
+            WHEN a.NaceCode IS NULL THEN 'No NACE Code Available'
+            ELSE COALESCE(m.sector_name, 'Unknown Sector')
+        END AS sector_name,
+        CAST(SUBSTR(e.StartDate, 7, 4) AS INTEGER) AS year,
+        e.Status AS status,
+        e.EnterpriseNumber AS enterprise_number,
+        (JULIANDAY('2025-12-31') - JULIANDAY(
+            SUBSTR(e.StartDate, 7, 4) || '-' || SUBSTR(e.StartDate, 4, 2) || '-' || SUBSTR(e.StartDate, 1, 2)
+        )) / 365.25 AS age
+    FROM enterprise e
+    LEFT JOIN activity a ON e.EnterpriseNumber = a.EntityNumber
+    LEFT JOIN nace_mapping m ON a.NaceCode = m.nace_code
+    WHERE {VALID_START_DATE_SQL}
+)
+GROUP BY sector_name, year, status;
+"""
+
+_CUBE_FROM_FACTS_SQL = f"""
+SELECT
+    sector_name,
+    start_year,
+    status,
+    COUNT(DISTINCT enterprise_number),
+    SUM(activity_rows),
+    SUM(activity_rows * (JULIANDAY('2025-12-31') - JULIANDAY(start_date)) / 365.25),
+    SUM(CASE WHEN JULIANDAY(start_date) IS NOT NULL THEN activity_rows ELSE 0 END)
+FROM {FACTS_TABLE}
+WHERE start_year IS NOT NULL
+GROUP BY sector_name, start_year, status;
+"""
+
+
+# -----------------------------------------------------------------------------
+# 1. SQLite-compatible arithmetic helpers
+# -----------------------------------------------------------------------------
+# ROUND() is evaluated by the SQLite library itself: its rounding works on the
+# binary double (and changed between SQLite releases), so no Python port of it
+# is guaranteed to agree with the SQL output on half-way cases.
+_ROUND_CONN = sqlite3.connect(':memory:', check_same_thread=False)
+_ROUND_LOCK = threading.Lock()
+
+
+def sql_round(value, digits: int):
+    """Round with SQLite's own ROUND(), so the result matches the SQL output exactly."""
+    if value is None or pd.isna(value):
+        return np.nan
+    with _ROUND_LOCK:
+        return _ROUND_CONN.execute("SELECT ROUND(?, ?);", (float(value), digits)).fetchone()[0]
+
+
+def _round_series(series: pd.Series, digits: int) -> pd.Series:
+    return series.map(lambda v: sql_round(v, digits)).astype(float)
+
+
+def _sql_avg(values: pd.Series) -> float:
+    """AVG() with the sequential summation SQLite uses (NULLs ignored)."""
+    values = [v for v in values if not pd.isna(v)]
+    return sum(values) / len(values) if values else np.nan
+
+
+# -----------------------------------------------------------------------------
+# 2. Build the cube with a single scan
+# -----------------------------------------------------------------------------
+def build_cube(conn: sqlite3.Connection, source: str = 'join',
+               queries_path: str = QUERIES_PATH) -> pd.DataFrame:
+    """
+    Scan the database once and return the sector × year × status cube.
+
+    Parameters
+        conn : sqlite3.Connection
+            Open connection to the KBO database.
+        source : str, optional
+            ``'join'`` to scan enterprise ⨝ activity ⨝ nace_mapping (default) or
+            ``'facts'`` to scan the materialized enterprise_facts table.
+        queries_path : str, optional
+            SQL file providing the ``nace_mapping`` definition (``'join'`` only).
+    """
+    if source == 'facts':
+        sql = _CUBE_FROM_FACTS_SQL
+    elif source == 'join':
+        setup, _ = load_queries(queries_path)
+        conn.execute(setup['nace_mapping'])
+        sql = _CUBE_FROM_JOIN_SQL
+    else:
+        raise ValueError(f"Unknown cube source: {source}")
+
+    cube = pd.DataFrame(conn.execute(sql).fetchall(), columns=CUBE_COLUMNS)
+    cube['status'] = cube['status'].fillna('')
+    cube['age_sum'] = cube['age_sum'].astype(float)
+    return cube
+
+
+def _sector_year(cube: pd.DataFrame, first_year: int, last_year: int) -> pd.DataFrame:
+    """Distinct new companies per (sector, year) within a year window, ordered like SQLite."""
+    window = cube[cube['year'].between(first_year, last_year)]
+    return (window.groupby(['sector_name', 'year'], as_index=False)['enterprises'].sum()
+            .rename(columns={'enterprises': 'new_companies'})
+            .sort_values(['sector_name', 'year'], kind='stable')
+            .reset_index(drop=True))
+
+
+def _with_yoy(sector_year: pd.DataFrame) -> pd.DataFrame:
+    """Add the LAG-based prev_year / yoy_growth columns per sector."""
+    df = sector_year.copy()
+    df['prev_year'] = df.groupby('sector_name')['new_companies'].shift(1)
+    raw = (df['new_companies'] - df['prev_year']) * 100.0 / df['prev_year']
+    df['yoy_growth'] = _round_series(raw.where(df['prev_year'] > 0), 2)
+    return df
+
+
+def _nullable_int(series: pd.Series) -> pd.Series:
+    return series.round().astype('Int64')
+
+
+# -----------------------------------------------------------------------------
+# 3. Derive the datasets
+# -----------------------------------------------------------------------------
+def derive_overall_growth(cube: pd.DataFrame) -> pd.DataFrame:
+    """Query 2: overall growth by industry 1970 vs 2025."""
+    years = [1970, 1980, 1990, 2000, 2010, 2020, 2025]
+    sy = _sector_year(cube, 1970, 2025)
+    sy = sy[sy['year'].isin(years)]
+    pivot = sy.pivot_table(index='sector_name', columns='year', values='new_companies',
+                           aggfunc='sum', fill_value=0).reindex(columns=years, fill_value=0)
+    df = pd.DataFrame({
+        'sector_name': pivot.index,
+        'companies_1970': pivot[1970].to_numpy(),
+        'companies_2025': pivot[2025].to_numpy(),
+        'total_companies': pivot.sum(axis=1).to_numpy(),
+    })
+    df = df[df['total_companies'] >= 10]
+
+    c1970 = df['companies_1970'].astype(float)
+    c2025 = df['companies_2025'].astype(float)
+    growth = _round_series((c2025 - c1970) * 100.0 / c1970.where(c1970 != 0), 2)
+    df['growth_rate_1970_2025'] = growth.astype(object).where(c1970 != 0, 'New Sector (No 1970 data)')
+    cagr_raw = ((c2025 / c1970.where(c1970 > 0)) ** (1.0 / 54) - 1) * 100
+    df['cagr_1970_2025'] = _round_series(cagr_raw, 2)
+
+    order = cagr_raw.fillna(-999)
+    df = df.assign(_order=order).sort_values('_order', ascending=False, kind='stable')
+    return df.drop(columns='_order').head(15).reset_index(drop=True)
+
+
+def _yoy_summary(cube: pd.DataFrame) -> pd.DataFrame:
+    """Per-sector summary of the 2015-2025 yoy growth (shared by queries 3 and 5)."""
+    growth = _with_yoy(_sector_year(cube, 2015, 2025))
+    growth = growth[growth['yoy_growth'].notna()]
+    rows = []
+    for sector, grp in growth.groupby('sector_name', sort=True):
+        yoy = grp['yoy_growth']
+        avg_yoy = _sql_avg(yoy)
+        variance = _sql_avg(yoy * yoy) - avg_yoy * avg_yoy
+        rows.append({
+            'sector_name': sector,
+            'years_with_data': len(grp),
+            'total_new_companies': int(grp['new_companies'].sum()),
+            'avg_annual_new_companies': sql_round(_sql_avg(grp['new_companies']), 1),
+            'avg_yoy_growth_rate': sql_round(avg_yoy, 2),
+            'min_growth_rate': yoy.min(),
+            'max_growth_rate': yoy.max(),
+            'growth_volatility': sql_round(np.sqrt(variance), 2) if variance >= 0 else np.nan,
+        })
+    columns = ['sector_name', 'years_with_data', 'total_new_companies', 'avg_annual_new_companies',
+               'avg_yoy_growth_rate', 'min_growth_rate', 'max_growth_rate', 'growth_volatility']
+    return pd.DataFrame(rows, columns=columns)
+
+
+def derive_recent_growth(cube: pd.DataFrame) -> pd.DataFrame:
+    """Query 3: recent 10 years average growth rate by industry."""
+    df = _yoy_summary(cube)
+    df = df[(df['years_with_data'] >= 5) & (df['total_new_companies'] >= 50)]
+    df = df.rename(columns={'total_new_companies': 'total_new_companies_2015_2025'})
+    df = df.sort_values('avg_yoy_growth_rate', ascending=False, kind='stable').head(15)
+    return df[['sector_name', 'years_with_data', 'total_new_companies_2015_2025',
+               'avg_annual_new_companies', 'avg_yoy_growth_rate',
+               'min_growth_rate', 'max_growth_rate']].reset_index(drop=True)
+
+
+def derive_emerging_industries(cube: pd.DataFrame) -> pd.DataFrame:
+    """Query 4: industries that appeared in large numbers after 2000."""
+    sy = _sector_year(cube, 1990, 2025)
+    decades = {'companies_1990s': (1990, 1999), 'companies_2000s': (2000, 2009),
+               'companies_2010s': (2010, 2019), 'companies_2020s': (2020, 2025)}
+    grouped = sy.groupby('sector_name', sort=True)
+    df = pd.DataFrame({
+        name: grouped.apply(lambda g, lo=lo, hi=hi: g.loc[g['year'].between(lo, hi), 'new_companies'].sum(),
+                            include_groups=False)
+        for name, (lo, hi) in decades.items()
+    })
+    df['total_companies'] = grouped['new_companies'].sum()
+    post_2000 = grouped.apply(lambda g: g.loc[g['year'] >= 2000, 'new_companies'].sum(), include_groups=False)
+    df['post_2000_percentage'] = _round_series(post_2000 * 100.0 / df['total_companies'], 1)
+    df = df[df['total_companies'] >= 100].reset_index()
+    df = df.sort_values(['post_2000_percentage', 'companies_2020s'], ascending=False, kind='stable')
+    return df.head(15).reset_index(drop=True)
+
+
+def derive_invisible_champions(cube: pd.DataFrame) -> pd.DataFrame:
+    """Query 5: industries with over-average growth but moderate scale."""
+    summary = _yoy_summary(cube)
+    summary = summary[summary['years_with_data'] >= 5]
+    sized = summary[summary['total_new_companies'] >= 50]
+    market_avg_companies = _sql_avg(sized['avg_annual_new_companies'])
+    market_avg_growth = _sql_avg(sized['avg_yoy_growth_rate'])
+
+    df = sized[['sector_name', 'total_new_companies', 'avg_annual_new_companies',
+                'avg_yoy_growth_rate', 'growth_volatility']].copy()
+    df['market_avg_companies'] = market_avg_companies
+    df['market_avg_growth'] = market_avg_growth
+
+    champion = ((df['avg_yoy_growth_rate'] > market_avg_growth)
+                & df['avg_annual_new_companies'].between(market_avg_companies * 0.3,
+                                                         market_avg_companies * 1.5)
+                & (df['growth_volatility'] < 50))
+    df['sector_category'] = np.select(
+        [champion,
+         df['avg_yoy_growth_rate'] > market_avg_growth * 1.5,
+         df['avg_annual_new_companies'] > market_avg_companies * 2],
+        ['🏆 Invisible champion', '🚀 High speed growth', '🏭 scale giants'],
+        default='📊 ordinary industries')
+    # COALESCE(volatility, 50) is an integer in SQLite, so (100 - 50) / 100 is 0
+    stability = ((100 - df['growth_volatility']) / 100 * 0.4).fillna(0)
+    df['hidden_champion_score'] = _round_series(
+        df['avg_yoy_growth_rate'] / market_avg_growth * 0.6 + stability, 2)
+
+    df = df.assign(_rank=np.where(champion, 1, 2))
+    df = df.sort_values(['_rank', 'hidden_champion_score'], ascending=[True, False], kind='stable')
+    return df.drop(columns='_rank').head(20).reset_index(drop=True)
+
+
+def _status_counts(cube: pd.DataFrame) -> pd.DataFrame:
+    """Per-sector enterprise and join-row counters over a (pre-filtered) cube."""
+    ceased = cube['status'].isin(['ST', 'CE'])
+    return pd.DataFrame({
+        'total_enterprises': cube.groupby('sector_name')['enterprises'].sum(),
+        'active_count': cube['join_rows'].where(cube['status'] == 'AC', 0).groupby(cube['sector_name']).sum(),
+        'ceased_count': cube['join_rows'].where(ceased, 0).groupby(cube['sector_name']).sum(),
+        'recent_enterprises': cube['join_rows'].where(cube['year'] >= 2020, 0).groupby(cube['sector_name']).sum(),
+    })
+
+
+def derive_cruel_industries(cube: pd.DataFrame) -> pd.DataFrame:
+    """Query 6: high-growth, high-elimination, fiercely competitive industries."""
+    ae = _status_counts(cube[cube['year'] >= 2010])
+    recent = cube[cube['year'].between(2015, 2025)]
+    rg = pd.DataFrame({
+        'new_2020_2025': recent['join_rows'].where(recent['year'] >= 2020, 0).groupby(recent['sector_name']).sum(),
+        'new_2015_2019': recent['join_rows'].where(recent['year'] <= 2019, 0).groupby(recent['sector_name']).sum(),
+    })
+    df = ae.join(rg, how='left').rename_axis('sector_name').reset_index()
+    df = df[df['total_enterprises'] >= 100].copy()
+
+    total = df['total_enterprises']
+    ceased_rate = df['ceased_count'] * 100.0 / total
+    recent_rate = df['recent_enterprises'] * 100.0 / total
+    new_2015 = df['new_2015_2019'].astype(float)
+    acceleration = ((df['new_2020_2025'] - new_2015) * 100.0 / new_2015).where(new_2015 > 0)
+
+    df['cessation_rate'] = _round_series(ceased_rate, 2)
+    df['recent_entry_rate'] = _round_series(recent_rate, 2)
+    df['growth_acceleration'] = _round_series(acceleration, 2)
+    df['battleground_index'] = _round_series(
+        ceased_rate * 0.4 + recent_rate * 0.3 + (acceleration / 10 * 0.3).fillna(0), 2)
+    df['competition_category'] = np.select(
+        [(ceased_rate > 15) & (recent_rate > 25), ceased_rate > 20, recent_rate > 30, ceased_rate < 5],
+        ['⚔️ Cruel industry', '💀 High elimination', '🌊 New popular', '🛡️ Stable fortress'],
+        default='📈 Conventional competition')
+    df['new_2020_2025'] = _nullable_int(df['new_2020_2025'])
+    df['new_2015_2019'] = _nullable_int(df['new_2015_2019'])
+
+    df = df.sort_values('battleground_index', ascending=False, kind='stable').head(20)
+    return df.reset_index(drop=True)
+
+
+def derive_industry_archetypes(cube: pd.DataFrame) -> pd.DataFrame:
+    """Query 7: invisible champion vs cruel industry characteristics."""
+    counts = _status_counts(cube)
+    age_sum = cube.groupby('sector_name')['age_sum'].sum()
+    age_rows = cube.groupby('sector_name')['age_rows'].sum()
+    counts['avg_company_age'] = age_sum / age_rows.where(age_rows > 0)
+    df = counts[counts['total_enterprises'] >= 50].rename_axis('sector_name').reset_index()
+
+    total = df['total_enterprises']
+    ceased_rate = df['ceased_count'] * 100.0 / total
+    recent_rate = df['recent_enterprises'] * 100.0 / total
+    age = df['avg_company_age']
+    cruel = (ceased_rate > 15) & (recent_rate > 25)
+    champion = (ceased_rate < 8) & recent_rate.between(10, 20)
+
+    out = pd.DataFrame({
+        'sector_name': df['sector_name'],
+        'total_enterprises': total,
+        'cessation_rate': _round_series(ceased_rate, 2),
+        'recent_entry_rate': _round_series(recent_rate, 2),
+        'avg_company_age': _round_series(age, 1),
+        'industry_archetype': np.select(
+            [cruel, champion & (age > 10), recent_rate > 30, age > 20],
+            ['⚔️ Cruel Industry', '🏆 Invisible Champion', '🌊 New popular Industry',
+             '🏛️ Traditional stability'],
+            default='📊 Conventional industry'),
+        '_rank': np.select([cruel, champion], [1, 2], default=3),
+    })
+    out = out.sort_values(['_rank', 'cessation_rate'], ascending=[True, False], kind='stable')
+    return out.drop(columns='_rank').reset_index(drop=True)
+
+
+DERIVATIONS = {
+    'overall_growth': derive_overall_growth,
+    'recent_growth': derive_recent_growth,
+    'emerging_industries': derive_emerging_industries,
+    'invisible_champions': derive_invisible_champions,
+    'cruel_industries': derive_cruel_industries,
+    'industry_archetypes': derive_industry_archetypes,
+}
+
+
+# -----------------------------------------------------------------------------
+# 4. Run the engine end to end
+# -----------------------------------------------------------------------------
+def run_engine(db_path: str, data_dir: str = DATA_DIR, source: str = 'join',
+               formats: tuple[str, ...] = ('csv',)) -> dict[str, pd.DataFrame]:
+    """
+    Build the cube with one scan and write the six derived datasets to ``data_dir``
+    in each of ``formats`` ('csv' and/or 'arrow').
+
+    Returns
+        dict[str, pd.DataFrame]
+            Derived DataFrame per dataset name.
+    """
+    if 'arrow' in formats:
+        require_pyarrow()
+    os.makedirs(data_dir, exist_ok=True)
+    conn = connect_readonly(db_path)
+    try:
+        start = time.perf_counter()
+        cube = build_cube(conn, source)
+        print(f"✅ Built cube: {len(cube):,} cells ({time.perf_counter() - start:.2f}s)")
+    finally:
+        conn.close()
+
+    results: dict[str, pd.DataFrame] = {}
+    for name, derive in DERIVATIONS.items():
+        start = time.perf_counter()
+        df = derive(cube)
+        for fmt in formats:
+            path = dataset_path(name, fmt, data_dir)
+            if fmt == 'arrow':
+                write_arrow_frame(df, path, name)
+            else:
+                df.to_csv(path, index=False)
+        results[name] = df
+        print(f"✅ {name}: {len(df):,} rows -> {', '.join(formats)} ({time.perf_counter() - start:.2f}s)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive the sector analyses from a single-scan count cube.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Output folder (default: data)")
+    parser.add_argument('--source', choices=['join', 'facts'], default='join',
+                        help="Scan the raw join or the enterprise_facts table")
+    parser.add_argument('--format', nargs='+', choices=DATA_FORMATS, default=['csv'], dest='formats',
+                        help="Output format(s): csv and/or arrow")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    run_engine(args.db_path, args.data_dir, args.source, tuple(args.formats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,582 @@
+"""
+This module serves the datasets of queries/queries.sql and their charts from
+a long-running local HTTP service, so dashboards do not rerun the pipeline
+(or rescan the KBO database) on every page load.
+
+The service keeps a small pool of read-only SQLite connections with a large
+mmap_size and page cache, so repeated scans read pages straight from memory.
+Every statement keeps its hard-coded year window and minimum-company
+thresholds (the HAVING / WHERE literals) as defaults, but they are rewritten
+into bound parameters once at startup, so a request can ask for another
+window or threshold without any string formatting of user input.
+
+Results are kept in an LRU cache keyed by the snapshot id of the database
+(from the ``meta`` table), the dataset and its resolved parameters. A new
+snapshot written over the database file is detected from the file itself:
+connections are reopened and entries of the previous snapshot are dropped.
+Identical requests arriving while a query runs share that query.
+
+Endpoints (GET only):
+    /                       datasets, their parameters and defaults
+    /datasets/<name>        query result as JSON (``?format=csv`` for CSV)
+    /charts/<name>          rendered chart page (``?format=json`` for the plotly figure)
+    /dashboard              every chart on one page
+    /plotly.min.js          plotly.js bundle the chart pages point to
+    /stats                  cache and pool statistics
+
+Parameters are passed in the query string, e.g.
+``/charts/recent_growth?first_year=2018&min_companies=200``.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from datasets import DATA_FILES
+from enterprise_facts import get_snapshot_id
+from query_runner import QUERIES_PATH, connect_readonly, load_queries
+from visualization import CHART_BUILDERS, DASHBOARD_TEMPLATE, set_html_mode, standardize_column_names
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8050
+POOL_SIZE = 4
+CACHE_ENTRIES = 256
+MMAP_SIZE_MIB = 1024   # per database file, shared by every connection through the OS page cache
+PAGE_CACHE_MIB = 128   # per connection
+RENDER_THREADS = 2
+REQUEST_TIMEOUT = 30
+
+# Dataset -> parameter -> (default, pattern of the hard-coded literal in its
+# statement; group 1 is the literal replaced by the bound parameter). The
+# patterns fit both queries.sql and queries_facts.sql.
+QUERY_PARAMETERS: dict[str, dict[str, tuple[int, str]]] = {
+    'sector_growth': {
+        'first_year': (2000, r'BETWEEN (2000) AND 2025'),
+        'last_year': (2025, r'BETWEEN 2000 AND (2025)'),
+    },
+    'recent_growth': {
+        'first_year': (2015, r'BETWEEN (2015) AND 2025'),
+        'last_year': (2025, r'BETWEEN 2015 AND (2025)'),
+        'min_years': (5, r'HAVING COUNT\(year\) >= (5)'),
+        'min_companies': (50, r'SUM\(new_companies\) >= (50)'),
+    },
+    'emerging_industries': {
+        'first_year': (1990, r'BETWEEN (1990) AND 2025'),
+        'last_year': (2025, r'BETWEEN 1990 AND (2025)'),
+        'min_companies': (100, r'HAVING SUM\(new_companies\) >= (100)'),
+    },
+    'invisible_champions': {
+        'first_year': (2015, r'BETWEEN (2015) AND 2025'),
+        'last_year': (2025, r'BETWEEN 2015 AND (2025)'),
+        'min_years': (5, r'HAVING COUNT\(year\) >= (5)'),
+        'min_companies': (50, r'total_new_companies >= (50)'),
+    },
+    'cruel_industries': {
+        'min_companies': (100, r'total_enterprises >= (100)'),
+    },
+    'industry_archetypes': {
+        'min_companies': (50, r'HAVING COUNT\(DISTINCT [\w.]+\) >= (50)'),
+    },
+}
+
+
+# -----------------------------------------------------------------------------
+# 1. Query parameters
+# -----------------------------------------------------------------------------
+def parameterize(name: str, sql: str) -> str:
+    """
+    Replace the hard-coded literals of one statement with ``:parameter`` placeholders.
+
+    Every pattern is matched on the original statement, so a parameter never
+    sees the placeholder of another one.
+
+    Raises
+        ValueError
+            If a pattern no longer matches the statement (queries.sql changed).
+    """
+    spans: list[tuple[int, int, str]] = []
+    for param, (_, pattern) in QUERY_PARAMETERS.get(name, {}).items():
+        matches = list(re.finditer(pattern, sql))
+        if not matches:
+            raise ValueError(f"{name}: no literal for parameter {param} (pattern {pattern!r})")
+        spans += [(m.start(1), m.end(1), param) for m in matches]
+    for start, end, param in sorted(spans, reverse=True):
+        sql = f"{sql[:start]}:{param}{sql[end:]}"
+    return sql
+
+
+def resolve_parameters(name: str, raw: dict[str, str]) -> dict[str, int]:
+    """
+    Validate request parameters of a dataset and fill in the defaults.
+
+    Raises
+        ValueError
+            For an unknown parameter, a value that is not an integer or an
+            empty year window.
+    """
+    defaults = QUERY_PARAMETERS.get(name, {})
+    unknown = [param for param in raw if param not in defaults]
+    if unknown:
+        raise ValueError(f"Unknown parameter(s) for {name}: {', '.join(unknown)}")
+    params = {param: default for param, (default, _) in defaults.items()}
+    for param, value in raw.items():
+        try:
+            params[param] = int(value)
+        except ValueError:
+            raise ValueError(f"{param} must be an integer, got {value!r}") from None
+        if params[param] < 0:
+            raise ValueError(f"{param} must not be negative")
+    if params.get('first_year', 0) > params.get('last_year', 0):
+        raise ValueError("first_year must not be after last_year")
+    return params
+
+
+# -----------------------------------------------------------------------------
+# 2. Read-only connection pool
+# -----------------------------------------------------------------------------
+class ConnectionPool:
+    """Read-only connections on the KBO database, tuned for repeated scans."""
+
+    def __init__(self, db_path: str, queries_path: str = QUERIES_PATH,
+                 mmap_size_mib: int = MMAP_SIZE_MIB, page_cache_mib: int = PAGE_CACHE_MIB):
+        self.db_path = db_path
+        self.mmap_size = mmap_size_mib * 1024 * 1024
+        self.page_cache_kib = page_cache_mib * 1024
+        self.setup, queries = load_queries(queries_path)
+        self.queries = {name: parameterize(name, sql) for name, sql in queries.items()}
+        # LIFO: the most recently used connection has the warmest page cache
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._signature: tuple | None = None
+        self._snapshot = ''
+        self._generation = 0
+        self.opened = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between the executor threads, never used by two at once
+        conn = connect_readonly(self.db_path, check_same_thread=False)
+        conn.execute(f"PRAGMA mmap_size = {self.mmap_size};")
+        conn.execute(f"PRAGMA cache_size = -{self.page_cache_kib};")
+        conn.execute("PRAGMA temp_store = MEMORY;")
+        self.opened += 1
+        return conn
+
+    def snapshot_id(self) -> str:
+        """
+        Return the snapshot id of the database file, reopening the pool if the file changed.
+
+        A file without a ``meta`` table is identified by its inode, size and mtime.
+        """
+        st = os.stat(self.db_path)
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if signature != self._signature:
+                conn = self._connect()
+                try:
+                    self._snapshot = get_snapshot_id(conn) or 'file:{}:{}:{}'.format(*signature)
+                finally:
+                    conn.close()
+                self._signature = signature
+                self._generation += 1
+            return self._snapshot
+
+    def _acquire(self) -> tuple[int, sqlite3.Connection, set[str]]:
+        # Idle connections opened on a previous version of the file still read the old pages
+        while True:
+            try:
+                generation, conn, created = self._idle.get_nowait()
+            except queue.Empty:
+                return self._generation, self._connect(), set()
+            if generation == self._generation:
+                return generation, conn, created
+            conn.close()
+
+    def execute(self, name: str, params: dict[str, int]) -> tuple[list[str], list[tuple]]:
+        """
+        Run the statement of dataset ``name`` with bound ``params`` on an idle connection.
+
+        Returns
+            tuple[list[str], list[tuple]]
+                Column names and rows of the result.
+        """
+        generation, conn, created = self._acquire()
+        try:
+            sql = self.queries[name]
+            # Helper tables are TEMP tables: created once per connection, on first use
+            for table, create_sql in self.setup.items():
+                if table not in created and re.search(rf'\b{table}\b', sql):
+                    conn.execute(create_sql)
+                    created.add(table)
+            cursor = conn.execute(sql, params)
+            columns = [col[0] for col in cursor.description]
+            rows = cursor.fetchall()
+            cursor.close()
+            return columns, rows
+        finally:
+            if generation == self._generation:
+                self._idle.put((generation, conn, created))
+            else:
+                conn.close()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait()[1].close()
+            except queue.Empty:
+                return
+
+
+# -----------------------------------------------------------------------------
+# 3. Result cache
+# -----------------------------------------------------------------------------
+class ResultCache:
+    """LRU of computed results; only touched from the event loop thread, so no lock."""
+
+    def __init__(self, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: tuple, value) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def retain(self, snapshot_id: str) -> int:
+        """Drop the entries of every other snapshot; return how many were dropped."""
+        stale = [key for key in self._entries if key[0] != snapshot_id]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> dict:
+        return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                'hits': self.hits, 'misses': self.misses}
+
+
+# -----------------------------------------------------------------------------
+# 4. Datasets and charts
+# -----------------------------------------------------------------------------
+def render_chart_body(name: str, columns: list[str], rows: list[tuple], fmt: str) -> str | None:
+    """
+    Build the chart of one dataset result (runs in an executor thread).
+
+    Parameters
+        fmt : str
+            'html' for a page using /plotly.min.js, 'fragment' for a bare
+            <div> (dashboard), 'json' for the plotly figure.
+
+    Returns
+        str | None
+            The rendered chart, ``None`` if the dataset lacks the chart's columns.
+    """
+    df = standardize_column_names(pd.DataFrame.from_records(rows, columns=columns))
+    fig = CHART_BUILDERS[name](df)
+    if fig is None:
+        return None
+    if fmt == 'json':
+        return fig.to_json()
+    if fmt == 'fragment':
+        return fig.to_html(full_html=False, include_plotlyjs=False, default_height='600px')
+    return fig.to_html(include_plotlyjs='/plotly.min.js', default_height='600px')
+
+
+class AnalyticsService:
+    """Cached, deduplicated access to the datasets and charts of one database."""
+
+    def __init__(self, pool: ConnectionPool, cache: ResultCache, pool_size: int = POOL_SIZE):
+        self.pool = pool
+        self.cache = cache
+        # Separate threads for charts, so rendering a cached result never waits behind a long scan
+        self.query_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='query')
+        self.render_executor = ThreadPoolExecutor(max_workers=RENDER_THREADS, thread_name_prefix='render')
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._snapshot = None
+
+    def snapshot_id(self) -> str:
+        # A stat() of the file; the meta table is only read again when the file changed
+        snapshot = self.pool.snapshot_id()
+        if snapshot != self._snapshot:
+            if self._snapshot is not None:
+                dropped = self.cache.retain(snapshot)
+                print(f"New snapshot {snapshot!r}: dropped {dropped} cached result(s)")
+            self._snapshot = snapshot
+        return snapshot
+
+    async def _cached(self, key: tuple, executor: ThreadPoolExecutor, func, *args) -> tuple[object, bool]:
+        """Return ``(value, cached)``; concurrent misses on the same key share one computation."""
+        value = self.cache.get(key)
+        if value is not None:
+            return value, True
+        if key in self._inflight:
+            return await asyncio.shield(self._inflight[key]), False
+        future = asyncio.get_running_loop().run_in_executor(executor, func, *args)
+        self._inflight[key] = future
+        try:
+            value = await future
+        finally:
+            del self._inflight[key]
+        self.cache.put(key, value)
+        return value, False
+
+    async def dataset(self, name: str, params: dict[str, int]) -> tuple[dict, bool]:
+        snapshot = self.snapshot_id()
+        key = (snapshot, 'dataset', name, tuple(sorted(params.items())))
+
+        def query():
+            start = time.perf_counter()
+            columns, rows = self.pool.execute(name, params)
+            print(f"Queried {name} {params}: {len(rows):,} rows ({time.perf_counter() - start:.2f}s)")
+            return columns, rows
+
+        (columns, rows), cached = await self._cached(key, self.query_executor, query)
+        result = {'dataset': name, 'snapshot_id': snapshot, 'parameters': params,
+                  'columns': columns, 'rows': rows}
+        return result, cached
+
+    async def chart(self, name: str, params: dict[str, int], fmt: str) -> tuple[str | None, bool]:
+        result, data_cached = await self.dataset(name, params)
+        key = (result['snapshot_id'], 'chart', name, tuple(sorted(params.items())), fmt)
+        # A cached None (chart not available) is not told apart from a miss: it is cheap to rebuild
+        body, cached = await self._cached(key, self.render_executor, render_chart_body,
+                                          name, result['columns'], result['rows'], fmt)
+        return body, cached and data_cached
+
+    async def warm(self) -> None:
+        """Run every query and render every chart (page and dashboard) with the default parameters."""
+        start = time.perf_counter()
+        await asyncio.gather(*(self.chart(name, resolve_parameters(name, {}), fmt)
+                               for name in CHART_BUILDERS for fmt in ('html', 'fragment')),
+                             return_exceptions=True)
+        print(f"✅ Warmed {len(CHART_BUILDERS)} datasets and charts ({time.perf_counter() - start:.2f}s)")
+
+    def close(self) -> None:
+        self.query_executor.shutdown(wait=False, cancel_futures=True)
+        self.render_executor.shutdown(wait=False, cancel_futures=True)
+        self.pool.close()
+
+
+# -----------------------------------------------------------------------------
+# 5. HTTP front end
+# -----------------------------------------------------------------------------
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error'}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def json_body(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def csv_body(columns: list[str], rows: list[tuple]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+class AnalyticsServer:
+    """Minimal HTTP/1.1 server (GET only, one request per connection) on asyncio streams."""
+
+    def __init__(self, service: AnalyticsService):
+        self.service = service
+        self.plotlyjs = get_plotlyjs().encode('utf-8')
+
+    async def route(self, path: str, query: dict[str, str]) -> tuple[bytes, str, bool]:
+        """Return ``(body, content type, cached)`` for a request."""
+        parts = [unquote(part) for part in path.strip('/').split('/') if part]
+        fmt = query.pop('format', None)
+        if not parts:
+            index = {name: {param: default for param, (default, _) in QUERY_PARAMETERS.get(name, {}).items()}
+                     for name in DATA_FILES}
+            return json_body({'snapshot_id': self.service.snapshot_id(), 'datasets': index,
+                              'charts': list(CHART_BUILDERS)}), 'application/json', False
+        if parts == ['plotly.min.js']:
+            return self.plotlyjs, 'application/javascript', True
+        if parts == ['stats']:
+            return json_body({'cache': self.service.cache.stats(), 'pool_connections': self.service.pool.opened,
+                              'snapshot_id': self.service._snapshot}), 'application/json', False
+        if parts == ['dashboard']:
+            return await self.dashboard(query)
+        if len(parts) != 2 or parts[0] not in ('datasets', 'charts') or parts[1] not in DATA_FILES:
+            raise HttpError(404, f"Unknown path: {path}")
+
+        kind, name = parts
+        try:
+            params = resolve_parameters(name, query)
+        except ValueError as e:
+            raise HttpError(400, str(e)) from None
+        if kind == 'datasets':
+            if fmt not in (None, 'json', 'csv'):
+                raise HttpError(400, f"Unknown dataset format: {fmt}")
+            result, cached = await self.service.dataset(name, params)
+            if fmt == 'csv':
+                return csv_body(result['columns'], result['rows']), 'text/csv; charset=utf-8', cached
+            return json_body(result), 'application/json', cached
+
+        if fmt not in (None, 'html', 'json'):
+            raise HttpError(400, f"Unknown chart format: {fmt}")
+        if name not in CHART_BUILDERS:
+            raise HttpError(404, f"No chart for {name}")
+        body, cached = await self.service.chart(name, params, fmt or 'html')
+        if body is None:
+            raise HttpError(404, f"The {name} result does not have the columns its chart needs")
+        content_type = 'application/json' if fmt == 'json' else 'text/html; charset=utf-8'
+        return body.encode('utf-8'), content_type, cached
+
+    async def dashboard(self, query: dict[str, str]) -> tuple[bytes, str, bool]:
+        """Every chart on one page; each dataset takes the parameters it knows."""
+        unknown = [param for param in query
+                   if not any(param in params for params in QUERY_PARAMETERS.values())]
+        if unknown:
+            raise HttpError(400, f"Unknown parameter(s): {', '.join(unknown)}")
+        requests = []
+        for name in CHART_BUILDERS:
+            raw = {param: value for param, value in query.items() if param in QUERY_PARAMETERS.get(name, {})}
+            try:
+                requests.append(self.service.chart(name, resolve_parameters(name, raw), 'fragment'))
+            except ValueError as e:
+                raise HttpError(400, f"{name}: {e}") from None
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        charts = [f'<div class="chart">{body}</div>' for body, _ in
+                  (r for r in results if not isinstance(r, Exception)) if body is not None]
+        cached = all(not isinstance(r, Exception) and r[1] for r in results)
+        page = DASHBOARD_TEMPLATE.format(plotlyjs='/plotly.min.js', charts='\n'.join(charts))
+        return page.encode('utf-8'), 'text/html; charset=utf-8', cached
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        start = time.perf_counter()
+        status, cached, method, target = 200, False, '', ''
+        try:
+            request_line = (await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)).decode('latin-1')
+            while (await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)) not in (b'\r\n', b'\n', b''):
+                pass  # headers are not used
+        except (ValueError, asyncio.TimeoutError, ConnectionError):
+            # Line over the stream limit, silent or vanished client: nothing to answer
+            writer.close()
+            return
+        try:
+            try:
+                method, target, _ = request_line.split(' ', 2)
+            except ValueError:
+                raise HttpError(400, f"Malformed request line: {request_line.strip()!r}") from None
+            if method != 'GET':
+                raise HttpError(405, f"Method not allowed: {method}")
+            url = urlsplit(target)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            body, content_type, cached = await self.route(url.path, query)
+        except HttpError as e:
+            status, body, content_type = e.status, json_body({'error': str(e)}), 'application/json'
+        except Exception as e:  # a failing query or chart must not stop the service
+            status, body, content_type = 500, json_body({'error': str(e)}), 'application/json'
+
+        headers = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+                   f"Content-Type: {content_type}",
+                   f"Content-Length: {len(body)}",
+                   f"X-Cache: {'hit' if cached else 'miss'}",
+                   "Connection: close"]
+        if target == '/plotly.min.js':
+            headers.append("Cache-Control: max-age=86400")
+        try:
+            writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+        print(f"{status} {method} {target} {'hit' if cached else 'miss'} "
+              f"{(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+async def serve(db_path: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                queries_path: str = QUERIES_PATH, pool_size: int = POOL_SIZE,
+                cache_entries: int = CACHE_ENTRIES, mmap_size_mib: int = MMAP_SIZE_MIB,
+                page_cache_mib: int = PAGE_CACHE_MIB, warm: bool = False) -> None:
+    """
+    Run the analytics service until it is interrupted.
+
+    Parameters
+        db_path : str
+            Path to the KBO SQLite database (opened read-only).
+        pool_size : int, optional
+            Query threads, and so at most this many connections (default: POOL_SIZE).
+        cache_entries : int, optional
+            Results and rendered charts kept in the LRU cache (default: CACHE_ENTRIES).
+        warm : bool, optional
+            Run every query and render every chart before accepting requests.
+    """
+    set_html_mode('figure')
+    pool = ConnectionPool(db_path, queries_path, mmap_size_mib, page_cache_mib)
+    service = AnalyticsService(pool, ResultCache(cache_entries), pool_size)
+    try:
+        if warm:
+            await service.warm()
+        server = await asyncio.start_server(AnalyticsServer(service).handle, host, port)
+        print(f"✅ Serving {db_path} on http://{host}:{port}/ "
+              f"({pool_size} connections, mmap {mmap_size_mib} MiB, page cache {page_cache_mib} MiB each)")
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the query results and charts from a warm, cached SQLite pool.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"Interface to listen on (default: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument('--queries', default=QUERIES_PATH, help="SQL file to serve")
+    parser.add_argument('--pool-size', type=int, default=POOL_SIZE,
+                        help=f"Read-only connections / worker threads (default: {POOL_SIZE})")
+    parser.add_argument('--cache-entries', type=int, default=CACHE_ENTRIES,
+                        help=f"Results and charts kept in the LRU cache (default: {CACHE_ENTRIES})")
+    parser.add_argument('--mmap-mib', type=int, default=MMAP_SIZE_MIB,
+                        help=f"PRAGMA mmap_size in MiB (default: {MMAP_SIZE_MIB})")
+    parser.add_argument('--page-cache-mib', type=int, default=PAGE_CACHE_MIB,
+                        help=f"PRAGMA cache_size per connection in MiB (default: {PAGE_CACHE_MIB})")
+    parser.add_argument('--warm', action='store_true',
+                        help="Run every query and render every chart before serving")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    try:
+        asyncio.run(serve(args.db_path, args.host, args.port, args.queries, args.pool_size,
+                          args.cache_entries, args.mmap_mib, args.page_cache_mib, args.warm))
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+This module benchmarks the query workload and the charts on synthetic
+KBO-shaped databases (see synthetic_kbo.py), so a change to queries/queries.sql
+or scripts/visualization.py can be measured without the real kbo_database.db.
+
+For each scale (a percentage of the documented row counts) the synthetic
+database is generated once and reused. Every named statement of the SQL file
+is timed ``repeat`` times. The results are then exported to a scratch folder
+and every visualize_* function is timed on them (data loading and rendering
+separately).
+
+Each run writes benchmarks/results/<label>.json and .md. Pass a previous
+JSON report as ``--baseline`` to get a side-by-side comparison; statements
+or charts slower than the threshold are listed as regressions and make the
+command exit with status 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from query_runner import QUERIES_PATH, connect_readonly, load_queries, run_queries
+from synthetic_kbo import generate_database
+
+BENCHMARK_DIR = 'benchmarks'
+DEFAULT_REPEAT = 3
+REGRESSION_THRESHOLD = 0.10     # relative slow-down reported as a regression
+MIN_DELTA_SECONDS = 0.005       # ignore differences below timer noise
+
+
+# -----------------------------------------------------------------------------
+# 1. Databases
+# -----------------------------------------------------------------------------
+def synthetic_db_path(scale: float, seed: int, bench_dir: str = BENCHMARK_DIR) -> str:
+    """File name of the synthetic database for one scale and seed."""
+    return os.path.join(bench_dir, f'kbo_synthetic_{scale:g}pct_seed{seed}.db')
+
+
+def ensure_database(scale: float, seed: int, bench_dir: str = BENCHMARK_DIR,
+                    regenerate: bool = False) -> str:
+    """Generate the synthetic database unless it already exists; return its path."""
+    db_path = synthetic_db_path(scale, seed, bench_dir)
+    if regenerate or not os.path.exists(db_path):
+        print(f"Generating {db_path} ({scale:g}% of the documented row counts)...")
+        generate_database(db_path, scale, seed)
+    return db_path
+
+
+def table_row_counts(db_path: str) -> dict[str, int]:
+    conn = connect_readonly(db_path)
+    try:
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table' ORDER BY name")]
+        return {t: conn.execute(f"SELECT COUNT(*) FROM [{t}]").fetchone()[0] for t in tables}
+    finally:
+        conn.close()
+
+
+# -----------------------------------------------------------------------------
+# 2. Timings
+# -----------------------------------------------------------------------------
+def _summary(runs: list[float], **extra) -> dict:
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs, **extra}
+
+
+def time_queries(db_path: str, queries_path: str = QUERIES_PATH,
+                 repeat: int = DEFAULT_REPEAT) -> dict[str, dict]:
+    """
+    Time every set-up and result statement of ``queries_path``.
+
+    Set-up statements run once, on first use, like in the query runner; result
+    statements run ``repeat`` times with all rows fetched.
+
+    Returns
+        dict[str, dict]
+            Per statement ``{'min', 'median', 'runs', 'rows'}`` in seconds.
+    """
+    setup, queries = load_queries(queries_path)
+    timings: dict[str, dict] = {}
+    conn = connect_readonly(db_path)
+    try:
+        for name, sql in queries.items():
+            for table, create_sql in setup.items():
+                if f'setup:{table}' not in timings and re.search(rf'\b{table}\b', sql):
+                    start = time.perf_counter()
+                    conn.execute(create_sql)
+                    timings[f'setup:{table}'] = _summary([time.perf_counter() - start], rows=None)
+            runs, rows = [], 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                cursor = conn.execute(sql)
+                rows = 0
+                while batch := cursor.fetchmany(10_000):
+                    rows += len(batch)
+                runs.append(time.perf_counter() - start)
+            timings[name] = _summary(runs, rows=rows)
+            print(f"  {name:<24} {timings[name]['median']:8.3f}s  ({rows:,} rows)")
+    finally:
+        conn.close()
+    return timings
+
+
+def time_charts(db_path: str, queries_path: str = QUERIES_PATH,
+                repeat: int = DEFAULT_REPEAT) -> dict[str, dict]:
+    """
+    Export the results of ``db_path`` to a scratch folder and time every chart.
+
+    Charts are written to the scratch folder, never to the repository's plots/.
+
+    Returns
+        dict[str, dict]
+            Per chart ``{'min', 'median', 'runs', 'load_seconds', 'status'}``;
+            the run times cover rendering (HTML and PNG) only.
+    """
+    cwd = os.getcwd()
+    timings: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory(prefix='kbo_bench_') as workdir:
+        queries_path = os.path.abspath(queries_path)
+        os.chdir(workdir)
+        try:
+            run_queries(db_path, data_dir='data', queries_path=queries_path)
+            os.makedirs('plots', exist_ok=True)
+            import visualization  # save_plot writes relative to the working directory
+            visualization.start_kaleido()
+            for name, builder in visualization.CHART_BUILDERS.items():
+                start = time.perf_counter()
+                df = visualization.load_dataset(name)
+                load_seconds = time.perf_counter() - start
+                runs, status = [], 'skipped'
+                for _ in range(repeat if df is not None else 0):
+                    start = time.perf_counter()
+                    try:
+                        status = 'ok' if builder(df.copy()) is not None else 'skipped'
+                    except Exception as e:
+                        status = f'failed: {e}'
+                    runs.append(time.perf_counter() - start)
+                timings[name] = _summary(runs or [0.0], load_seconds=load_seconds, status=status)
+                print(f"  {name:<24} {timings[name]['median']:8.3f}s  ({status})")
+        finally:
+            os.chdir(cwd)
+    return timings
+
+
+# -----------------------------------------------------------------------------
+# 3. Reports and comparison
+# -----------------------------------------------------------------------------
+def _git_commit() -> str | None:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare_reports(current: dict, baseline: dict,
+                    threshold: float = REGRESSION_THRESHOLD) -> list[dict]:
+    """
+    Compare the ``min`` timings of two reports, per scale, statement and chart.
+
+    Returns
+        list[dict]
+            ``{'scale', 'kind', 'name', 'before', 'after', 'change', 'regression'}``
+            for every entry present in both reports.
+    """
+    rows = []
+    for scale, run in current['runs'].items():
+        base_run = baseline.get('runs', {}).get(scale)
+        if not base_run:
+            continue
+        for kind in ('queries', 'charts'):
+            for name, timing in run.get(kind, {}).items():
+                base = base_run.get(kind, {}).get(name)
+                if not base:
+                    continue
+                before, after = base['min'], timing['min']
+                change = (after - before) / before if before else 0.0
+                regression = change > threshold and after - before > MIN_DELTA_SECONDS
+                rows.append({'scale': scale, 'kind': kind, 'name': name, 'before': before,
+                             'after': after, 'change': change, 'regression': regression})
+    return rows
+
+
+def write_report(report: dict, output_dir: str, comparison: list[dict] | None = None) -> tuple[str, str]:
+    """Write ``<label>.json`` and ``<label>.md`` to ``output_dir``; return both paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, f"{report['label']}.json")
+    md_path = os.path.join(output_dir, f"{report['label']}.md")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    with open(md_path, 'w', encoding='utf-8') as f:
+        f.write(f"# Benchmark `{report['label']}`\n\n")
+        f.write(f"**Generated on**: {report['created']}\n")
+        f.write(f"**Commit**: `{report['git_commit']}`\n")
+        f.write(f"**Python / SQLite**: {report['python']} / {report['sqlite']}\n")
+        f.write(f"**Seed / Repeat**: {report['seed']} / {report['repeat']}\n\n")
+        for scale, run in report['runs'].items():
+            f.write(f"## Scale {scale}\n\n")
+            rows = ', '.join(f"{table} {count:,}" for table, count in run['rows'].items())
+            f.write(f"**Rows**: {rows}\n\n")
+            f.write("| Statement | Min (s) | Median (s) | Rows |\n")
+            f.write("|-----------|---------|------------|------|\n")
+            for name, t in run['queries'].items():
+                rows = '' if t['rows'] is None else f"{t['rows']:,}"
+                f.write(f"| `{name}` | {t['min']:.3f} | {t['median']:.3f} | {rows} |\n")
+            if run.get('charts'):
+                f.write("\n| Chart | Load (s) | Render min (s) | Render median (s) | Status |\n")
+                f.write("|-------|----------|----------------|-------------------|--------|\n")
+                for name, t in run['charts'].items():
+                    f.write(f"| `{name}` | {t['load_seconds']:.3f} | {t['min']:.3f} | "
+                            f"{t['median']:.3f} | {t['status']} |\n")
+            f.write("\n")
+        if comparison:
+            f.write(f"## Comparison with `{report['baseline']}`\n\n")
+            f.write("| Scale | Kind | Name | Before (s) | After (s) | Change |\n")
+            f.write("|-------|------|------|------------|-----------|--------|\n")
+            for c in comparison:
+                flag = ' ⚠️' if c['regression'] else ''
+                f.write(f"| {c['scale']} | {c['kind']} | `{c['name']}` | {c['before']:.3f} | "
+                        f"{c['after']:.3f} | {c['change']:+.1%}{flag} |\n")
+    return json_path, md_path
+
+
+def run_benchmark(scales: list[float], seed: int = 42, repeat: int = DEFAULT_REPEAT,
+                  queries_path: str = QUERIES_PATH, charts: bool = True,
+                  bench_dir: str = BENCHMARK_DIR, label: str | None = None,
+                  regenerate: bool = False) -> dict:
+    """
+    Benchmark the workload at every scale and return the report.
+
+    Parameters
+        scales : list[float]
+            Percentages of the documented row counts, e.g. ``[1, 10, 100]``.
+        seed : int, optional
+            Seed of the synthetic databases.
+        repeat : int, optional
+            Runs per statement and per chart.
+        queries_path : str, optional
+            SQL workload (default: 'queries/queries.sql').
+        charts : bool, optional
+            Also time the visualize_* functions.
+        bench_dir : str, optional
+            Folder for the synthetic databases and results/ (default: 'benchmarks').
+        label : str | None, optional
+            Report name (default: a timestamp).
+        regenerate : bool, optional
+            Rebuild the synthetic databases even if they exist.
+    """
+    report = {
+        'label': label or datetime.now().strftime('%Y%m%d-%H%M%S'),
+        'created': f"{datetime.now():%Y-%m-%d %H:%M:%S}",
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'seed': seed,
+        'repeat': repeat,
+        'queries': queries_path,
+        'runs': {},
+    }
+    for scale in scales:
+        db_path = os.path.abspath(ensure_database(scale, seed, bench_dir, regenerate))
+        run = {'database': db_path, 'rows': table_row_counts(db_path)}
+        print(f"Timing {queries_path} at {scale:g}%...")
+        run['queries'] = time_queries(db_path, queries_path, repeat)
+        if charts:
+            print(f"Timing the charts at {scale:g}%...")
+            run['charts'] = time_charts(db_path, queries_path, repeat)
+        report['runs'][f'{scale:g}%'] = run
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the queries and charts on synthetic KBO databases.")
+    parser.add_argument('--scale', type=float, nargs='+', default=[1.0],
+                        help="Percentages of the documented row counts (default: 1)")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the synthetic databases")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Runs per statement and chart")
+    parser.add_argument('--queries', default=QUERIES_PATH, help="SQL workload to time")
+    parser.add_argument('--no-charts', action='store_true', help="Time the queries only")
+    parser.add_argument('--label', help="Report name (default: a timestamp)")
+    parser.add_argument('--baseline', help="Previous JSON report to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Relative slow-down reported as a regression (default: 0.10)")
+    parser.add_argument('--output-dir', default=BENCHMARK_DIR,
+                        help="Folder for the databases and results/ (default: benchmarks)")
+    parser.add_argument('--regenerate', action='store_true', help="Rebuild the synthetic databases")
+    args = parser.parse_args()
+
+    # Checked before the (long) run; a CI job must not pass without its comparison
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read baseline report {args.baseline}: {e}")
+            sys.exit(1)
+
+    report = run_benchmark(args.scale, args.seed, args.repeat, args.queries, not args.no_charts,
+                           args.output_dir, args.label, args.regenerate)
+    comparison = None
+    if baseline is not None:
+        report['baseline'] = baseline['label']
+        comparison = compare_reports(report, baseline, args.threshold)
+    json_path, md_path = write_report(report, os.path.join(args.output_dir, 'results'), comparison)
+    print(f"✅ Benchmark report written to {json_path} and {md_path}")
+
+    regressions = [c for c in comparison or [] if c['regression']]
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against {baseline['label']}:")
+        for c in regressions:
+            print(f"  {c['scale']} {c['kind']} {c['name']}: {c['before']:.3f}s -> {c['after']:.3f}s "
+                  f"({c['change']:+.1%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
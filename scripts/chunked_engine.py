@@ -0,0 +1,266 @@
+"""
+This module rebuilds sector_growth.csv out of core, without running the
+sector_growth query of queries/queries.sql as a single statement.
+
+The enterprise table is cut into EnterpriseNumber ranges of a fixed number of
+enterprises. For each range, a worker process reads the matching enterprise
+and activity rows in EntityNumber order (both through their indexes),
+merge-joins them with NumPy and counts the distinct enterprises per
+(year, nace_code) into a small years × codes matrix. The parent only sums
+these matrices, so memory stays bounded by one chunk per worker plus the
+final count grid, whatever the size of the database.
+
+The LAG-based columns, sector names and output format are computed exactly
+like the incremental refresh does, so the file matches the SQL output.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from columnar import require_pyarrow, write_arrow_frame
+from datasets import DATA_DIR, DATA_FORMATS, dataset_path
+from enterprise_facts import VALID_START_DATE_SQL
+from incremental_refresh import growth_columns, sector_names
+from query_runner import QUERIES_PATH, connect_readonly
+
+# Enterprises per chunk: bounds the rows a worker holds at once
+CHUNK_SIZE = 50_000
+
+# Year window of the sector_growth query
+FIRST_YEAR = 2000
+LAST_YEAR = 2025
+
+_ENTERPRISE_CHUNK_SQL = f"""
+SELECT e.EnterpriseNumber, CAST(SUBSTR(e.StartDate, 7, 4) AS INTEGER) AS year
+FROM enterprise e
+WHERE e.EnterpriseNumber >= ? AND {{upper}}
+    AND {VALID_START_DATE_SQL}
+    AND year BETWEEN {FIRST_YEAR} AND {LAST_YEAR}
+ORDER BY e.EnterpriseNumber;
+"""
+
+_ACTIVITY_CHUNK_SQL = """
+SELECT a.EntityNumber, a.NaceCode
+FROM activity a
+WHERE a.EntityNumber >= ? AND {upper}
+    AND a.NaceCode IS NOT NULL
+ORDER BY a.EntityNumber;
+"""
+
+
+# -----------------------------------------------------------------------------
+# 1. Chunk boundaries
+# -----------------------------------------------------------------------------
+def chunk_bounds(db_path: str, chunk_size: int = CHUNK_SIZE) -> list[tuple[str, str, bool]]:
+    """
+    Split the EnterpriseNumber key space into ranges of about ``chunk_size`` enterprises.
+
+    Returns
+        list[tuple[str, str, bool]]
+            ``(lo, hi, last)`` per chunk: ``[lo, hi)`` for every chunk but the
+            last one, which is ``[lo, hi]`` so activity rows of establishments
+            (numbered after every enterprise) are never read.
+    """
+    conn = connect_readonly(db_path)
+    try:
+        cursor = conn.execute(
+            "SELECT EnterpriseNumber FROM enterprise "
+            "WHERE EnterpriseNumber IS NOT NULL ORDER BY EnterpriseNumber;"
+        )
+        starts: list[str] = []
+        last_key = None
+        while True:
+            batch = cursor.fetchmany(chunk_size)
+            if not batch:
+                break
+            starts.append(batch[0][0])
+            last_key = batch[-1][0]
+    finally:
+        conn.close()
+
+    # Half-open ranges keep duplicated numbers at a boundary in a single chunk
+    starts = list(dict.fromkeys(starts))
+    bounds = [(lo, hi, False) for lo, hi in zip(starts, starts[1:])]
+    if starts:
+        bounds.append((starts[-1], last_key, True))
+    return bounds
+
+
+# -----------------------------------------------------------------------------
+# 2. Per-chunk merge join (runs in the worker processes)
+# -----------------------------------------------------------------------------
+def merge_join(ent_keys: np.ndarray, act_keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Inner-join two sorted key arrays.
+
+    Returns
+        tuple[np.ndarray, np.ndarray]
+            Matching row indices into ``ent_keys`` and ``act_keys`` (duplicated
+            keys on both sides produce every pair, like an SQL join).
+    """
+    left = np.searchsorted(ent_keys, act_keys, side='left')
+    right = np.searchsorted(ent_keys, act_keys, side='right')
+    matches = right - left
+    act_idx = np.repeat(np.arange(len(act_keys)), matches)
+    offsets = np.arange(matches.sum()) - np.repeat(np.cumsum(matches) - matches, matches)
+    return np.repeat(left, matches) + offsets, act_idx
+
+
+def _process_chunk(task: tuple[str, str, str, bool]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Count distinct enterprises per (year, nace_code) for one EnterpriseNumber range.
+
+    Returns
+        tuple[np.ndarray, np.ndarray]
+            Sorted NACE codes of the chunk and the matching
+            ``(LAST_YEAR - FIRST_YEAR + 1) × len(codes)`` count matrix.
+    """
+    db_path, lo, hi, last = task
+    upper = '{} <= ?' if last else '{} < ?'
+    conn = connect_readonly(db_path)
+    try:
+        ent_rows = conn.execute(
+            _ENTERPRISE_CHUNK_SQL.format(upper=upper.format('e.EnterpriseNumber')), (lo, hi)
+        ).fetchall()
+        act_rows = conn.execute(
+            _ACTIVITY_CHUNK_SQL.format(upper=upper.format('a.EntityNumber')), (lo, hi)
+        ).fetchall()
+    finally:
+        conn.close()
+
+    n_years = LAST_YEAR - FIRST_YEAR + 1
+    if not ent_rows or not act_rows:
+        return np.empty(0, dtype=np.int64), np.zeros((n_years, 0), dtype=np.int64)
+
+    ent_keys = np.array([row[0] for row in ent_rows])
+    ent_years = np.fromiter((row[1] for row in ent_rows), dtype=np.int64, count=len(ent_rows))
+    act_keys = np.array([row[0] for row in act_rows])
+    act_codes = np.fromiter((row[1] for row in act_rows), dtype=np.int64, count=len(act_rows))
+    del ent_rows, act_rows
+
+    ent_idx, act_idx = merge_join(ent_keys, act_keys)
+    codes, code_idx = np.unique(act_codes[act_idx], return_inverse=True)
+
+    # COUNT(DISTINCT EnterpriseNumber): one id per distinct number (rows are sorted)
+    key_id = np.concatenate(([0], np.cumsum(ent_keys[1:] != ent_keys[:-1])))[ent_idx]
+    cell = (ent_years[ent_idx] - FIRST_YEAR) * len(codes) + code_idx
+    pairs = np.unique(key_id * (n_years * len(codes)) + cell)
+    counts = np.bincount(pairs % (n_years * len(codes)), minlength=n_years * len(codes))
+    return codes, counts.reshape(n_years, len(codes))
+
+
+# -----------------------------------------------------------------------------
+# 3. Accumulate the chunks and finish the dataset
+# -----------------------------------------------------------------------------
+def _accumulate(total_codes: np.ndarray, total: np.ndarray,
+                codes: np.ndarray, counts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Add a chunk matrix into the running (codes, counts) grid, widening it to new codes."""
+    if not len(codes):
+        return total_codes, total
+    merged_codes = np.union1d(total_codes, codes)
+    if len(merged_codes) != len(total_codes):
+        widened = np.zeros((total.shape[0], len(merged_codes)), dtype=np.int64)
+        widened[:, np.searchsorted(merged_codes, total_codes)] = total
+        total_codes, total = merged_codes, widened
+    total[:, np.searchsorted(total_codes, codes)] += counts
+    return total_codes, total
+
+
+def count_sector_years(db_path: str, chunk_size: int = CHUNK_SIZE,
+                       workers: int = 1) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stream the database chunk by chunk and return the (codes, years × codes) count grid.
+
+    Parameters
+        db_path : str
+            Path to the KBO SQLite database.
+        chunk_size : int, optional
+            Enterprises per chunk (default: CHUNK_SIZE).
+        workers : int, optional
+            Worker processes; 1 processes the chunks inline (default: 1).
+    """
+    tasks = [(db_path, lo, hi, last) for lo, hi, last in chunk_bounds(db_path, chunk_size)]
+    total_codes = np.empty(0, dtype=np.int64)
+    total = np.zeros((LAST_YEAR - FIRST_YEAR + 1, 0), dtype=np.int64)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for codes, counts in pool.map(_process_chunk, tasks):
+                total_codes, total = _accumulate(total_codes, total, codes, counts)
+    else:
+        for task in tasks:
+            total_codes, total = _accumulate(total_codes, total, *_process_chunk(task))
+    print(f"✅ Counted {len(tasks)} chunk(s) of up to {chunk_size:,} enterprises")
+    return total_codes, total
+
+
+def build_sector_growth(codes: np.ndarray, counts: np.ndarray,
+                        queries_path: str = QUERIES_PATH) -> pd.DataFrame:
+    """Turn the count grid into the sector_growth dataset (same columns and order as the SQL)."""
+    year_idx, code_idx = np.nonzero(counts)
+    df = pd.DataFrame({
+        'year': year_idx + FIRST_YEAR,
+        'nace_code': codes[code_idx],
+        'new_companies': counts[year_idx, code_idx],
+    })
+    df['sector_name'] = df['nace_code'].map(sector_names(codes.tolist(), queries_path))
+    df = growth_columns(df)
+    df = df[['year', 'nace_code', 'sector_name', 'new_companies',
+             'prev_year_count', 'yoy_growth', 'growth_category']]
+    df['prev_year_count'] = df['prev_year_count'].astype('Int64')
+    return df.sort_values(['year', 'nace_code'], ascending=[False, True]).reset_index(drop=True)
+
+
+# -----------------------------------------------------------------------------
+# 4. Run the engine end to end
+# -----------------------------------------------------------------------------
+def run_chunked(db_path: str, data_dir: str = DATA_DIR, chunk_size: int = CHUNK_SIZE,
+                workers: int = 1, formats: tuple[str, ...] = ('csv',)) -> pd.DataFrame:
+    """
+    Rebuild sector_growth in ``data_dir`` with the chunked engine, in each of ``formats``.
+
+    Returns
+        pd.DataFrame
+            The sector_growth dataset.
+    """
+    if 'arrow' in formats:
+        require_pyarrow()
+    os.makedirs(data_dir, exist_ok=True)
+    start = time.perf_counter()
+    codes, counts = count_sector_years(db_path, chunk_size, workers)
+    df = build_sector_growth(codes, counts)
+    for fmt in formats:
+        path = dataset_path('sector_growth', fmt, data_dir)
+        if fmt == 'arrow':
+            write_arrow_frame(df, path, 'sector_growth')
+        else:
+            df.to_csv(path, index=False, lineterminator='\n')
+    print(f"✅ sector_growth: {len(df):,} rows -> {', '.join(formats)} "
+          f"({time.perf_counter() - start:.2f}s)")
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild sector_growth with the chunked out-of-core engine.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Output folder (default: data)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help=f"Enterprises per chunk (default: {CHUNK_SIZE:,})")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (default: number of CPUs)")
+    parser.add_argument('--format', nargs='+', choices=DATA_FORMATS, default=['csv'], dest='formats',
+                        help="Output format(s): csv and/or arrow")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    run_chunked(args.db_path, args.data_dir, args.chunk_size, args.workers, tuple(args.formats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+This module reads and writes the analysis datasets in Arrow IPC format, the
+typed, memory-mappable alternative to the CSV hand-off between the query
+stage and the visualization stage.
+
+Column types come from DATASET_SCHEMAS (category columns are stored as
+strings and turned back into categories on read), so zipcodes stay strings,
+years stay integers and nullable counts stay integers across the round trip.
+pyarrow is an optional dependency: it is only needed when the Arrow format is
+requested.
+"""
+
+import pandas as pd
+
+from datasets import DATASET_SCHEMAS, standardize_name
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc  # noqa: F401
+except ImportError:
+    pa = None
+
+# Errors of a failed Arrow conversion or write, to catch next to sqlite3.Error
+ARROW_ERRORS = (pa.ArrowException,) if pa is not None else ()
+
+# pandas dtype of the schema registry -> Arrow storage type name
+_ARROW_TYPE_NAMES = {
+    'int16': 'int16', 'Int16': 'int16',
+    'int32': 'int32', 'Int32': 'int32',
+    'float32': 'float32', 'float64': 'float64',
+    'string': 'string', 'category': 'string',
+}
+
+
+def require_pyarrow() -> None:
+    """Raise a helpful error when the Arrow format is used without pyarrow."""
+    if pa is None:
+        raise ImportError("The Arrow format requires pyarrow: pip install pyarrow")
+
+
+def _target_type(name: str, column: str):
+    """Arrow type declared for ``column`` of dataset ``name``, ``None`` to infer it."""
+    dtype = DATASET_SCHEMAS.get(name, {}).get('dtypes', {}).get(standardize_name(column))
+    return getattr(pa, _ARROW_TYPE_NAMES[dtype])() if dtype else None
+
+
+def _to_array(values, target=None):
+    """Build an Arrow array from Python or pandas values, cast to ``target`` when declared."""
+    if target is not None and pa.types.is_string(target):
+        return pa.array([None if pd.isna(v) else str(v) for v in values], pa.string())
+    try:
+        array = pa.Array.from_pandas(values) if isinstance(values, pd.Series) else pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed column (e.g. a rate or the text 'New Sector (No 1970 data)'): keep it as text
+        return pa.array([None if pd.isna(v) else str(v) for v in values], pa.string())
+    return array.cast(target) if target is not None else array
+
+
+class ArrowBatchWriter:
+    """
+    Streams row batches (lists of tuples) into an Arrow IPC file.
+
+    The schema is fixed by the registry, or inferred from the data for
+    undeclared columns. An undeclared column that is all NULL so far has no
+    type yet, so batches are held back until every column has one (or the
+    file is closed) and the file is only opened then. Batches are pushed with
+    :meth:`write`, so the same cursor batches can feed another writer (e.g.
+    the CSV export) as well.
+    """
+
+    def __init__(self, path: str, name: str, columns: list[str]):
+        require_pyarrow()
+        self.path = path
+        self.columns = columns
+        self.types = [_target_type(name, col) for col in columns]
+        self.pending: list[list] = []
+        self.schema = None
+        self.writer = None
+        self.rows = 0
+
+    def _open(self) -> None:
+        """Fix the schema (still untyped columns stay null), open the file and flush held batches."""
+        self.schema = pa.schema([pa.field(col, t or pa.null()) for col, t in zip(self.columns, self.types)])
+        self.writer = pa.ipc.new_file(self.path, self.schema)
+        for arrays in self.pending:
+            arrays = [array.cast(field.type) for array, field in zip(arrays, self.schema)]
+            self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.pending = []
+
+    def write(self, batch: list[tuple]) -> None:
+        values = list(zip(*batch)) if batch else [[] for _ in self.columns]
+        if self.writer is None:
+            arrays = [_to_array(list(v), t) for v, t in zip(values, self.types)]
+            self.pending.append(arrays)
+            self.types = [t if t is not None or pa.types.is_null(array.type) else array.type
+                          for t, array in zip(self.types, arrays)]
+            if all(t is not None for t in self.types):
+                self._open()
+        else:
+            arrays = [_to_array(list(v), field.type) for v, field in zip(values, self.schema)]
+            self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.rows += len(batch)
+
+    def close(self) -> int:
+        """Finish the file (a typed, empty one if no batch came) and return the rows written."""
+        if self.writer is None:
+            self._open()
+        self.writer.close()
+        return self.rows
+
+
+def write_arrow_frame(df: pd.DataFrame, path: str, name: str) -> None:
+    """Write a DataFrame to an Arrow IPC file with the registry types of ``name``."""
+    require_pyarrow()
+    arrays = [_to_array(df[col], _target_type(name, col)) for col in df.columns]
+    table = pa.Table.from_arrays(arrays, names=list(df.columns))
+    with pa.ipc.new_file(path, table.schema) as writer:
+        writer.write_table(table)
+
+
+def arrow_column_names(path: str) -> list[str]:
+    """Column names of an Arrow IPC file, read from its footer only."""
+    require_pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def read_arrow(path: str, columns: list[str] | None = None,
+               dtypes: dict[str, str] | None = None) -> pd.DataFrame:
+    """
+    Memory-map an Arrow IPC file and return the selected columns as a DataFrame.
+
+    Parameters
+        path : str
+            Arrow IPC file.
+        columns : list[str] | None, optional
+            Columns to load (default: all).
+        dtypes : dict[str, str] | None, optional
+            pandas dtypes to apply, keyed by standardized column name
+            (e.g. turns stored strings back into categories).
+    """
+    require_pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        df = table.to_pandas()
+    for col in df.columns:
+        dtype = (dtypes or {}).get(standardize_name(col))
+        if dtype:
+            df[col] = df[col].astype(dtype)
+    return df
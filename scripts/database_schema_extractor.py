@@ -1,13 +1,84 @@
 """
 This module extracts the complete schema (tables, columns, indexes, foreign keys)
 from a SQLite database and writes it to a human-readable Markdown report.
+
+Row counts come in three modes: exact (COUNT(*) per table, run concurrently on
+separate read-only connections), estimate (read from sqlite_stat1, optionally
+running ANALYZE first) and none.
 """
 
+import argparse
 import sqlite3
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
+from query_runner import connect_readonly
+
+COUNT_MODES = ('exact', 'estimate', 'none')
+
+# Rows sampled per index by ANALYZE in estimate mode (PRAGMA analysis_limit)
+ANALYSIS_LIMIT = 1000
+
+
+def _count_table(db_path: str, table: str) -> int:
+    """COUNT(*) of one table on its own read-only connection."""
+    conn = connect_readonly(db_path)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM [{table}];").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def count_rows_exact(db_path: str, tables: list[str], workers: int = 4) -> dict[str, int]:
+    """
+    Count the rows of every table concurrently, one read-only connection per table.
+
+    sqlite3 releases the GIL while a statement runs, so the full-table scans
+    overlap in threads.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        counts = pool.map(lambda table: _count_table(db_path, table), tables)
+        return dict(zip(tables, counts))
+
+
+def analyze_tables(db_path: str, tables: list[str], limit: int = ANALYSIS_LIMIT) -> bool:
+    """
+    Run a sampled ANALYZE on ``tables`` so sqlite_stat1 holds row estimates.
+
+    Needs write access to the database file; returns ``False`` (and leaves
+    the file untouched) when it is read-only.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute(f"PRAGMA analysis_limit={int(limit)};")
+        for table in tables:
+            conn.execute(f"ANALYZE [{table}];")
+        conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"❌ ANALYZE failed, using the existing statistics: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def estimate_row_counts(conn: sqlite3.Connection, tables: list[str]) -> dict[str, int | None]:
+    """Row estimates from sqlite_stat1 (first number of ``stat``), ``None`` for tables without statistics."""
+    estimates: dict[str, int | None] = {table: None for table in tables}
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1';"
+    ).fetchone()
+    if not has_stats:
+        return estimates
+    for tbl, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1;"):
+        if tbl in estimates and stat:
+            estimates[tbl] = int(stat.split()[0])
+    return estimates
+
+
+def get_database_schema(db_path: str, output_dir: str = 'docs', counts: str = 'exact',
+                        analyze: bool = False, workers: int = 4) -> str | None:
     """
     Extract every table-definition detail from a SQLite database and
     persist it to a Markdown file.
@@ -17,6 +88,14 @@ def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
             Absolute or relative path to the SQLite file.
         output_dir : str, optional
             Directory in which the report will be created (default: 'docs').
+        counts : str, optional
+            Row count mode: 'exact' (concurrent COUNT(*)), 'estimate'
+            (sqlite_stat1) or 'none' (default: 'exact').
+        analyze : bool, optional
+            In estimate mode, run a sampled ANALYZE on tables missing from
+            sqlite_stat1 first (writes to the database file).
+        workers : int, optional
+            Concurrent connections used by the exact mode (default: 4).
 
     Returns
         str | None
@@ -26,6 +105,8 @@ def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
     # -------------------------------------------------------------------------
     # 1. Prepare the output directory and file
     # -------------------------------------------------------------------------
+    if counts not in COUNT_MODES:
+        raise ValueError(f"Unknown count mode: {counts}")
     os.makedirs(output_dir, exist_ok=True)        # Create if it does not exist
     output_file = os.path.join(output_dir, 'database_structure.md')
 
@@ -46,6 +127,21 @@ def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
         )
         tables: list[str] = [row[0] for row in cursor.fetchall()]
 
+        # ---------------------------------------------------------------------
+        # 3b. Row counts, exact or estimated, before writing anything
+        # ---------------------------------------------------------------------
+        row_counts: dict[str, int | None] = {}
+        if counts == 'exact':
+            row_counts = count_rows_exact(db_path, tables, workers)
+        elif counts == 'estimate':
+            analyzed = False
+            if analyze:
+                missing = [t for t, n in estimate_row_counts(conn, tables).items() if n is None]
+                analyzed = bool(missing) and analyze_tables(db_path, missing)
+            row_counts = estimate_row_counts(conn, tables)
+            if analyzed:  # ANALYZE writes no statistics row for an empty table
+                row_counts.update({t: row_counts[t] or 0 for t in missing})
+
         # ---------------------------------------------------------------------
         # 4. Write the Markdown report
         # ---------------------------------------------------------------------
@@ -54,7 +150,11 @@ def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
             f.write("# Database Structure Report\n\n")
             f.write(f"**Database**: `{os.path.basename(db_path)}`\n")
             f.write(f"**Generated on**: {datetime.now():%Y-%m-%d %H:%M:%S}\n")
-            f.write(f"**Total Tables**: {len(tables)}\n\n")
+            f.write(f"**Total Tables**: {len(tables)}\n")
+            count_label = {'exact': 'exact (COUNT(*))',
+                           'estimate': 'estimated from sqlite_stat1, marked with ~',
+                           'none': 'not counted'}[counts]
+            f.write(f"**Row Counts**: {count_label}\n\n")
 
             # 4.2 Table of contents
             f.write("## Table of Contents\n")
@@ -69,9 +169,14 @@ def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
                 f.write(f"## Table: `{table_name}`\n\n")
 
                 # --- Row count -------------------------------------------------
-                cursor.execute(f"SELECT COUNT(*) FROM [{table_name}];")
-                row_count: int = cursor.fetchone()[0]
-                f.write(f"**Row Count**: {row_count:,}\n\n")
+                if counts == 'exact':
+                    f.write(f"**Row Count**: {row_counts[table_name]:,}\n\n")
+                elif counts == 'estimate':
+                    estimate = row_counts[table_name]
+                    if estimate is None:
+                        f.write("**Row Count**: unknown (no statistics, use --analyze)\n\n")
+                    else:
+                        f.write(f"**Row Count**: ~{estimate:,} (estimate)\n\n")
 
                 # --- Column definitions ---------------------------------------
                 cursor.execute(f"PRAGMA table_info([{table_name}]);")
@@ -131,13 +236,26 @@ def get_database_schema(db_path: str, output_dir: str = 'docs') -> str | None:
 # -----------------------------------------------------------------------------
 # 6. Stand-alone usage
 # -----------------------------------------------------------------------------
-if __name__ == "__main__":
-    # Path to the database file
-    db_path = r"C:\Users\cloris\Desktop\kbo_database.db"
+def main():
+    parser = argparse.ArgumentParser(description="Write the schema of a SQLite database to docs/database_structure.md.")
+    parser.add_argument('db_path', help="Path to the SQLite database")
+    parser.add_argument('--output-dir', default='docs', help="Report folder (default: docs)")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--estimate', action='store_const', const='estimate', dest='counts',
+                       help="Estimate row counts from sqlite_stat1 instead of counting")
+    group.add_argument('--no-counts', action='store_const', const='none', dest='counts',
+                       help="Skip row counts entirely")
+    parser.add_argument('--analyze', action='store_true',
+                        help="With --estimate: run a sampled ANALYZE on tables without statistics")
+    parser.add_argument('--workers', type=int, default=4,
+                        help="Concurrent read-only connections for exact counts (default: 4)")
+    parser.set_defaults(counts='exact')
+    args = parser.parse_args()
 
     # Proceed only if the file exists
-    if os.path.exists(db_path):
-        report_path = get_database_schema(db_path)
+    if os.path.exists(args.db_path):
+        report_path = get_database_schema(args.db_path, args.output_dir, args.counts,
+                                          args.analyze, args.workers)
         if report_path:
             abs_path = os.path.abspath(report_path)
             print(f"Report saved to: {abs_path}")
@@ -145,6 +263,10 @@ if __name__ == "__main__":
             # import webbrowser
             # webbrowser.open(f"file://{abs_path}")
     else:
-        print(f"❌ Database file not found: {db_path}")
+        print(f"❌ Database file not found: {args.db_path}")
         print(f"Current directory: {os.getcwd()}")
-        print(f"Files in directory: {os.listdir(os.path.dirname(db_path) or os.getcwd())}")
\ No newline at end of file
+        print(f"Files in directory: {os.listdir(os.path.dirname(args.db_path) or os.getcwd())}")
+
+
+if __name__ == "__main__":
+    main()
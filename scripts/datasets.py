@@ -0,0 +1,193 @@
+"""
+This module is the single registry of the analysis datasets shared by the
+query stage (queries/queries.sql) and the visualization stage.
+
+The order of DATA_FILES follows the order of the result-producing statements
+in queries/queries.sql, so the query runner can pair them up by position.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Folder holding the analysis result files
+DATA_DIR = 'data'
+
+# Interchange formats: CSV (export) and Arrow IPC (typed, memory-mappable)
+DATA_FORMATS = ('csv', 'arrow')
+
+# Dataset name -> CSV file name (in queries.sql statement order)
+DATA_FILES: dict[str, str] = {
+    'juridical_form': 'juridical_form.csv',
+    'company_status': 'company_status.csv',
+    'company_age': 'company_age.csv',
+    'creation_trends': 'creation_trends.csv',
+    'geo_distribution': 'geo_distribution.csv',
+    'sector_growth': 'sector_growth.csv',
+    'overall_growth': 'overall_growth.csv',
+    'recent_growth': 'recent_growth.csv',
+    'emerging_industries': 'emerging_industries.csv',
+    'invisible_champions': 'invisible_champions.csv',
+    'cruel_industries': 'cruel_industries.csv',
+    'industry_archetypes': 'industry_archetypes.csv'
+}
+
+# Dataset name -> column dtypes (standardized column names) and the columns the
+# chart actually reads. Columns missing from a file are simply not loaded.
+DATASET_SCHEMAS: dict[str, dict] = {
+    'juridical_form': {
+        'dtypes': {'juridicalform': 'float32', 'company_count': 'int32', 'percentage': 'float32'},
+        'usecols': ['juridicalform', 'percentage'],
+    },
+    'company_status': {
+        'dtypes': {'status': 'category', 'count': 'int32'},
+        'usecols': ['status', 'count'],
+    },
+    'company_age': {
+        # avg_company_age is printed as bar text, so it keeps full precision
+        'dtypes': {'nacecode': 'int32', 'avg_company_age': 'float64'},
+        'usecols': ['nacecode', 'avg_company_age'],
+    },
+    'creation_trends': {
+        'dtypes': {'year': 'Int16', 'new_companies': 'int32', 'prev_year': 'Int32', 'yoy_change': 'float32'},
+        'usecols': ['year', 'new_companies', 'yoy_change'],
+    },
+    'geo_distribution': {
+        'dtypes': {'province': 'category', 'municipality': 'string', 'zipcode': 'string',
+                   'company_count': 'int32'},
+        'usecols': ['province', 'municipality', 'zipcode', 'company_count'],
+    },
+    'sector_growth': {
+        'dtypes': {'year': 'int16', 'nace_code': 'int32', 'sector_name': 'category',
+                   'new_companies': 'int32', 'prev_year_count': 'Int32', 'yoy_growth': 'float32',
+                   'growth_category': 'category'},
+        'usecols': ['year', 'sector_name', 'yoy_growth'],
+    },
+    'overall_growth': {
+        'dtypes': {'sector_name': 'category', 'companies_1970': 'int32', 'companies_1980': 'int32',
+                   'companies_1990': 'int32', 'companies_2000': 'int32', 'companies_2010': 'int32',
+                   'companies_2020': 'int32', 'companies_2025': 'int32', 'total_companies': 'int32',
+                   'growth_rate_1970_2025': 'string', 'cagr_1970_2025': 'float32'},
+        'usecols': ['sector_name', 'companies_1970', 'companies_1980', 'companies_1990',
+                    'companies_2000', 'companies_2010', 'companies_2020', 'companies_2025'],
+    },
+    'recent_growth': {
+        'dtypes': {'sector_name': 'category', 'years_with_data': 'int16',
+                   'total_new_companies_2015_2025': 'int32', 'avg_annual_new_companies': 'float32',
+                   'avg_yoy_growth_rate': 'float32', 'min_growth_rate': 'float32',
+                   'max_growth_rate': 'float32'},
+        'usecols': ['sector_name', 'avg_yoy_growth_rate', 'min_growth_rate', 'max_growth_rate'],
+    },
+    'emerging_industries': {
+        'dtypes': {'sector_name': 'category', 'companies_1990s': 'int32', 'companies_2000s': 'int32',
+                   'companies_2010s': 'int32', 'companies_2020s': 'int32', 'total_companies': 'int32',
+                   'post_2000_percentage': 'float32'},
+        'usecols': ['sector_name', 'post_2000_percentage', 'companies_1990s', 'companies_2000s',
+                    'companies_2010s', 'companies_2020s'],
+    },
+    'invisible_champions': {
+        'dtypes': {'sector_name': 'category', 'total_new_companies': 'int32',
+                   'avg_annual_new_companies': 'float32', 'avg_yoy_growth_rate': 'float32',
+                   'growth_volatility': 'float32', 'market_avg_companies': 'float32',
+                   'market_avg_growth': 'float32', 'sector_category': 'category',
+                   'hidden_champion_score': 'float32'},
+        'usecols': ['sector_name', 'avg_annual_new_companies', 'avg_yoy_growth_rate',
+                    'total_new_companies', 'market_avg_companies', 'market_avg_growth',
+                    'sector_category'],
+    },
+    'cruel_industries': {
+        'dtypes': {'sector_name': 'category', 'total_enterprises': 'int32', 'active_count': 'int32',
+                   'ceased_count': 'int32', 'recent_enterprises': 'int32', 'new_2020_2025': 'Int32',
+                   'new_2015_2019': 'Int32', 'cessation_rate': 'float32', 'recent_entry_rate': 'float32',
+                   'growth_acceleration': 'float32', 'battleground_index': 'float32',
+                   'competition_category': 'category'},
+        'usecols': ['sector_name', 'cessation_rate', 'recent_entry_rate', 'total_enterprises',
+                    'competition_category'],
+    },
+    'industry_archetypes': {
+        'dtypes': {'sector_name': 'category', 'total_enterprises': 'int32', 'cessation_rate': 'float32',
+                   'recent_entry_rate': 'float32', 'avg_company_age': 'float32',
+                   'industry_archetype': 'category'},
+        'usecols': ['industry_archetype', 'cessation_rate', 'recent_entry_rate', 'avg_company_age'],
+    },
+}
+
+
+def dataset_path(name: str, fmt: str = 'csv', data_dir: str = DATA_DIR) -> str:
+    """Path of a dataset file in the given interchange format ('csv' or 'arrow')."""
+    if fmt not in DATA_FORMATS:
+        raise ValueError(f"Unknown data format: {fmt}")
+    stem, _ = os.path.splitext(DATA_FILES[name])
+    return os.path.join(data_dir, f'{stem}.{fmt}')
+
+
+@lru_cache(maxsize=None)
+def standardize_name(col: str) -> str:
+    """Lower-case a column name, turn runs of non-word characters and underscores into one '_', trim."""
+    return re.sub(r'[\W_]+', '_', col.lower()).strip('_')
+
+
+# Belgian zipcode ranges (exclusive upper bound) -> province, as in the
+# geo_zipcodes table of queries/queries.sql, and the rollup sizes of its query 5
+GEO_PROVINCE_BOUNDS = [
+    (1300, 'Brussels-Capital Region'), (1500, 'Walloon Brabant'), (2000, 'Flemish Brabant'),
+    (3000, 'Antwerp'), (3500, 'Flemish Brabant'), (4000, 'Limburg'), (5000, 'Liège'),
+    (6000, 'Namur'), (6600, 'Hainaut'), (7000, 'Luxembourg'), (8000, 'Hainaut'),
+    (9000, 'West Flanders'), (10000, 'East Flanders'),
+]
+GEO_TOP_MUNICIPALITIES = 20
+GEO_TOP_ZIPCODES = 10
+
+
+def geo_rollup_from_flat(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Turn a legacy flat geo_distribution export (zipcode, company_count) into the
+    province › municipality › zipcode rollup, until the file is regenerated.
+
+    The flat export has no municipality names or countries, so each zipcode is
+    its own municipality, and zipcodes that are not 4-digit Belgian ones go to
+    'Unknown' (foreign addresses cannot be told apart).
+
+    Parameters
+        df : pd.DataFrame
+            Flat export with standardized ``zipcode`` and ``company_count`` columns.
+
+    Returns
+        pd.DataFrame
+            Columns province, municipality, zipcode, company_count, largest first.
+    """
+    zipcode = (df['zipcode'].astype('string').fillna('').str.strip().str.upper()
+               .str.replace(' ', '', regex=False).str.replace('B-', '', regex=False))
+    belgian = zipcode.str.fullmatch(r'[1-9][0-9]{3}').fillna(False).to_numpy(dtype=bool)
+    bounds = np.array([bound for bound, _ in GEO_PROVINCE_BOUNDS])
+    names = np.array([name for _, name in GEO_PROVINCE_BOUNDS] + ['Unknown'], dtype=object)
+    codes = pd.to_numeric(zipcode.where(belgian), errors='coerce').fillna(0).to_numpy()
+    index = np.where(belgian, np.searchsorted(bounds, codes, side='right'), len(bounds))
+    flat = pd.DataFrame({
+        'province': names[index],
+        'zipcode': np.where(belgian, zipcode.to_numpy(dtype=object), 'Unknown'),
+        'company_count': df['company_count'].to_numpy(dtype=np.int64),
+    })
+    flat['municipality'] = flat['zipcode']
+    flat = flat.groupby(['province', 'municipality', 'zipcode'], as_index=False)['company_count'].sum()
+
+    # Same ranking and 'Other' buckets as the SQL rollup
+    flat['municipality_count'] = flat.groupby(['province', 'municipality'])['company_count'].transform('sum')
+    municipalities = (flat[['province', 'municipality', 'municipality_count']].drop_duplicates()
+                      .sort_values(['province', 'municipality_count', 'municipality'],
+                                   ascending=[True, False, True]))
+    municipalities['municipality_rank'] = municipalities.groupby('province').cumcount() + 1
+    flat = flat.merge(municipalities[['province', 'municipality', 'municipality_rank']],
+                      on=['province', 'municipality'])
+    flat = flat.sort_values(['province', 'municipality', 'company_count', 'zipcode'],
+                            ascending=[True, True, False, True])
+    flat['zipcode_rank'] = flat.groupby(['province', 'municipality']).cumcount() + 1
+    top_municipality = flat['municipality_rank'] <= GEO_TOP_MUNICIPALITIES
+    flat['zipcode'] = flat['zipcode'].where(top_municipality & (flat['zipcode_rank'] <= GEO_TOP_ZIPCODES),
+                                            'Other zipcodes')
+    flat['municipality'] = flat['municipality'].where(top_municipality, 'Other municipalities')
+    rollup = flat.groupby(['province', 'municipality', 'zipcode'], as_index=False)['company_count'].sum()
+    return rollup.sort_values('company_count', ascending=False, kind='stable').reset_index(drop=True)
@@ -0,0 +1,194 @@
+"""
+This module materializes the ``enterprise_facts`` staging table inside the KBO
+SQLite database: one compact, indexed row per (enterprise, NACE code) pair with
+the start date already parsed and the NACE division / sector already derived.
+
+The table is rebuilt only when the snapshot recorded in the ``meta`` table
+changes, so the queries in queries/queries_facts.sql can read it instead of
+re-parsing ``StartDate`` and re-deriving the division on every run.
+
+Columns
+    enterprise_number : TEXT     -- enterprise.EnterpriseNumber
+    start_year        : INTEGER  -- NULL unless StartDate is a valid dd-mm-yyyy string
+    start_date        : TEXT     -- ISO yyyy-mm-dd (same validity rule)
+    status            : TEXT
+    juridical_form    : REAL
+    nace_code         : INTEGER  -- NULL for enterprises without a NACE code
+    nace_division     : INTEGER
+    sector_name       : TEXT     -- nace_mapping sector, or 'No NACE Code Available'
+    activity_rows     : INTEGER  -- activity rows collapsed into this pair
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from query_runner import QUERIES_PATH, load_queries
+
+FACTS_TABLE = 'enterprise_facts'
+FACTS_INFO_TABLE = 'enterprise_facts_info'
+
+# Same validity rule as the "Personal query" section of queries.sql
+VALID_START_DATE_SQL = """
+    e.StartDate IS NOT NULL
+    AND e.StartDate != ''
+    AND LENGTH(e.StartDate) = 10
+    AND SUBSTR(e.StartDate, 3, 1) = '-'
+    AND SUBSTR(e.StartDate, 6, 1) = '-'
+"""
+
+_CREATE_FACTS_SQL = f"""
+CREATE TABLE {FACTS_TABLE} (
+    enterprise_number TEXT NOT NULL,
+    start_year        INTEGER,
+    start_date        TEXT,
+    status            TEXT,
+    juridical_form    REAL,
+    nace_code         INTEGER,
+    nace_division     INTEGER,
+    sector_name       TEXT NOT NULL,
+    activity_rows     INTEGER NOT NULL
+);
+"""
+
+# activity is collapsed to one row per (EntityNumber, NaceCode); activity_rows keeps
+# the multiplicity so SUM(...) over the original LEFT JOIN can still be reproduced.
+_INSERT_FACTS_SQL = f"""
+INSERT INTO {FACTS_TABLE}
+SELECT
+    e.EnterpriseNumber,
+    CASE WHEN {VALID_START_DATE_SQL} THEN CAST(SUBSTR(e.StartDate, 7, 4) AS INTEGER) END,
+    CASE WHEN {VALID_START_DATE_SQL}
+        THEN SUBSTR(e.StartDate, 7, 4) || '-' || SUBSTR(e.StartDate, 4, 2) || '-' || SUBSTR(e.StartDate, 1, 2)
+    END,
+    e.Status,
+    e.JuridicalForm,
+    a.NaceCode,
+    CAST(SUBSTR('00' || CAST(a.NaceCode AS TEXT), -4, 2) AS INTEGER),
+    CASE
+        WHEN a.NaceCode IS NULL THEN 'No NACE Code Available'
+        ELSE COALESCE(m.sector_name, 'Unknown Sector')
+    END,
+    COALESCE(a.activity_rows, 1)
+FROM enterprise e
+LEFT JOIN (
+    SELECT EntityNumber, NaceCode, COUNT(*) AS activity_rows
+    FROM activity
+    GROUP BY EntityNumber, NaceCode
+) a ON e.EnterpriseNumber = a.EntityNumber
+LEFT JOIN nace_mapping m ON a.NaceCode = m.nace_code;
+"""
+
+_CREATE_INDEXES_SQL = [
+    f"CREATE INDEX {FACTS_TABLE}_year_idx ON {FACTS_TABLE} (start_year, sector_name, enterprise_number);",
+    f"CREATE INDEX {FACTS_TABLE}_nace_idx ON {FACTS_TABLE} (nace_code, start_year, enterprise_number);",
+]
+
+
+def get_snapshot_id(conn: sqlite3.Connection, schema: str = 'main') -> str:
+    """
+    Build an identifier of the KBO snapshot from the ``meta`` table.
+
+    Parameters
+        conn : sqlite3.Connection
+            Connection on which the KBO database is open or attached.
+        schema : str, optional
+            Schema name of the KBO database on ``conn`` (default: 'main').
+
+    Returns
+        str
+            ``Variable=Value`` pairs joined by ``;`` (empty string if there is no meta table).
+    """
+    try:
+        rows = conn.execute(f"SELECT Variable, Value FROM {schema}.meta ORDER BY Variable;").fetchall()
+    except sqlite3.Error:
+        return ''
+    return ';'.join(f"{var}={val}" for var, val in rows)
+
+
+def get_built_snapshot(conn: sqlite3.Connection) -> str | None:
+    """Return the snapshot id the facts table was built from, ``None`` if it was never built."""
+    try:
+        row = conn.execute(f"SELECT snapshot_id FROM {FACTS_INFO_TABLE};").fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+def build_enterprise_facts(db_path: str, force: bool = False,
+                           queries_path: str = QUERIES_PATH) -> bool:
+    """
+    Materialize (or refresh) the ``enterprise_facts`` table in the KBO database.
+
+    Parameters
+        db_path : str
+            Path to the KBO SQLite file (opened read-write).
+        force : bool, optional
+            Rebuild even if the table already matches the current snapshot.
+        queries_path : str, optional
+            SQL file providing the ``nace_mapping`` definition.
+
+    Returns
+        bool
+            ``True`` if the table was (re)built, ``False`` if it was already up to date.
+    """
+    setup, _ = load_queries(queries_path)
+    # Autocommit mode: the rebuild manages its own transaction (sqlite3's implicit
+    # ones would commit DROP/CREATE TABLE on their own, before the INSERT)
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        snapshot_id = get_snapshot_id(conn)
+        if not force and get_built_snapshot(conn) == snapshot_id:
+            print(f"✅ {FACTS_TABLE} is up to date for snapshot '{snapshot_id}'")
+            return False
+
+        start = time.perf_counter()
+        # One transaction: readers keep seeing the previous table (and its info
+        # row) until COMMIT, and a failed rebuild leaves both untouched
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            conn.execute(setup['nace_mapping'])
+            conn.execute(f"DROP TABLE IF EXISTS {FACTS_TABLE};")
+            conn.execute(_CREATE_FACTS_SQL)
+            conn.execute(_INSERT_FACTS_SQL)
+            for index_sql in _CREATE_INDEXES_SQL:
+                conn.execute(index_sql)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {FACTS_INFO_TABLE} "
+                f"(snapshot_id TEXT, built_at TEXT, row_count INTEGER);"
+            )
+            conn.execute(f"DELETE FROM {FACTS_INFO_TABLE};")
+            row_count = conn.execute(f"SELECT COUNT(*) FROM {FACTS_TABLE};").fetchone()[0]
+            conn.execute(
+                f"INSERT INTO {FACTS_INFO_TABLE} VALUES (?, ?, ?);",
+                (snapshot_id, f"{datetime.now():%Y-%m-%d %H:%M:%S}", row_count),
+            )
+            conn.execute("DROP TABLE temp.nace_mapping;")
+        except BaseException:
+            conn.execute("ROLLBACK;")
+            raise
+        conn.execute("COMMIT;")
+        conn.execute(f"ANALYZE {FACTS_TABLE};")
+        print(f"✅ Built {FACTS_TABLE}: {row_count:,} rows "
+              f"({time.perf_counter() - start:.2f}s)")
+        return True
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize the enterprise_facts staging table.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--force', action='store_true', help="Rebuild even if the snapshot is unchanged")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    build_enterprise_facts(args.db_path, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,359 @@
+"""
+This module refreshes sector_growth.csv, creation_trends.csv and
+company_status.csv incrementally when a new KBO monthly snapshot arrives.
+
+A small SQLite state file keeps the last processed snapshot id (from the
+``meta`` table) and one fingerprint row per enterprise (status, StartDate and
+the distinct NACE codes of its activities). A refresh diffs the new snapshot
+against those fingerprints by EnterpriseNumber, turns the added / removed /
+changed enterprises into +1/-1 count deltas, and applies them to the affected
+cells only. The LAG-based columns are then recomputed just for the touched
+partitions (the touched NACE codes of sector_growth; creation_trends has a
+single partition).
+
+The first run (or ``--rebuild``) runs the three queries from queries.sql and
+records the fingerprints. ``--verify`` reruns them after the refresh and diffs
+their output against the refreshed files.
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from aggregation_engine import sql_round
+from datasets import DATA_DIR, DATA_FILES
+from enterprise_facts import VALID_START_DATE_SQL, get_snapshot_id
+from query_runner import QUERIES_PATH, load_queries, run_queries
+
+STATE_PATH = os.path.join(DATA_DIR, '.refresh_state.sqlite')
+INCREMENTAL_DATASETS = ['company_status', 'creation_trends', 'sector_growth']
+
+_STATE_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS snapshot (snapshot_id TEXT, processed_at TEXT);
+CREATE TABLE IF NOT EXISTS enterprise_state (
+    enterprise_number TEXT PRIMARY KEY,
+    status            TEXT,
+    start_date        TEXT,
+    nace_codes        TEXT  -- JSON array of the distinct non-NULL NACE codes
+);
+"""
+
+# One fingerprint per enterprise of the attached snapshot (activity is read through its index)
+_CURRENT_STATE_SQL = """
+CREATE TEMP TABLE current_state AS
+SELECT
+    e.EnterpriseNumber AS enterprise_number,
+    e.Status AS status,
+    e.StartDate AS start_date,
+    (
+        SELECT json_group_array(NaceCode)
+        FROM (
+            SELECT DISTINCT a.NaceCode
+            FROM kbo.activity a
+            WHERE a.EntityNumber = e.EnterpriseNumber AND a.NaceCode IS NOT NULL
+            ORDER BY a.NaceCode
+        )
+    ) AS nace_codes
+FROM kbo.enterprise e;
+"""
+
+_DIFFERS = """
+    c.status IS NOT s.status
+    OR c.start_date IS NOT s.start_date
+    OR c.nace_codes IS NOT s.nace_codes
+"""
+
+# Old fingerprints are subtracted, new ones added
+_CHANGES_SQL = f"""
+CREATE TEMP TABLE changes AS
+SELECT -1 AS sign, s.status, s.start_date, s.nace_codes
+FROM enterprise_state s
+LEFT JOIN current_state c ON c.enterprise_number = s.enterprise_number
+WHERE c.enterprise_number IS NULL OR {_DIFFERS}
+UNION ALL
+SELECT 1 AS sign, c.status, c.start_date, c.nace_codes
+FROM current_state c
+LEFT JOIN enterprise_state s ON s.enterprise_number = c.enterprise_number
+WHERE s.enterprise_number IS NULL OR {_DIFFERS};
+"""
+
+_STATUS_DELTA_SQL = """
+SELECT status, SUM(sign) FROM changes GROUP BY status HAVING SUM(sign) != 0;
+"""
+
+# Same year expression as query 4 (company creation trends)
+_YEAR_DELTA_SQL = """
+SELECT
+    STRFTIME('%Y',
+        SUBSTR(start_date, 7, 4) || '-' || SUBSTR(start_date, 4, 2) || '-' || SUBSTR(start_date, 1, 2)
+    ) AS year,
+    SUM(sign)
+FROM changes
+WHERE start_date IS NOT NULL
+GROUP BY year
+HAVING SUM(sign) != 0;
+"""
+
+# Same filters as the sector growth query
+_SECTOR_DELTA_SQL = f"""
+SELECT
+    CAST(SUBSTR(e.StartDate, 7, 4) AS INTEGER) AS year,
+    j.value AS nace_code,
+    SUM(e.sign)
+FROM (SELECT sign, start_date AS StartDate, nace_codes FROM changes) e, json_each(e.nace_codes) j
+WHERE {VALID_START_DATE_SQL}
+    AND CAST(SUBSTR(e.StartDate, 7, 4) AS INTEGER) BETWEEN 2000 AND 2025
+GROUP BY year, nace_code
+HAVING SUM(e.sign) != 0;
+"""
+
+
+# -----------------------------------------------------------------------------
+# 1. State file helpers
+# -----------------------------------------------------------------------------
+def open_state(state_path: str, db_path: str) -> sqlite3.Connection:
+    """Open the state file and attach the KBO database (read-only) as ``kbo``."""
+    os.makedirs(os.path.dirname(state_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(state_path)
+    conn.executescript(_STATE_SCHEMA_SQL)
+    conn.execute("ATTACH DATABASE ? AS kbo;", (Path(db_path).resolve().as_uri() + '?mode=ro',))
+    return conn
+
+
+def get_processed_snapshot(conn: sqlite3.Connection) -> str | None:
+    """Return the snapshot id of the last successful refresh, ``None`` if there was none."""
+    row = conn.execute("SELECT snapshot_id FROM snapshot;").fetchone()
+    return row[0] if row else None
+
+
+def _save_state(conn: sqlite3.Connection, snapshot_id: str, full: bool) -> None:
+    """Replace the fingerprints with ``current_state`` and record the snapshot."""
+    with conn:
+        if full:
+            conn.execute("DELETE FROM enterprise_state;")
+        else:
+            conn.execute("""
+                DELETE FROM enterprise_state
+                WHERE enterprise_number NOT IN (SELECT enterprise_number FROM current_state);
+            """)
+        conn.execute("INSERT OR REPLACE INTO enterprise_state SELECT * FROM current_state;")
+        conn.execute("DELETE FROM snapshot;")
+        conn.execute("INSERT INTO snapshot VALUES (?, ?);",
+                     (snapshot_id, f"{datetime.now():%Y-%m-%d %H:%M:%S}"))
+
+
+# -----------------------------------------------------------------------------
+# 2. Apply deltas to the CSV files
+# -----------------------------------------------------------------------------
+def sector_names(nace_codes: list[int], queries_path: str = QUERIES_PATH) -> dict[int, str]:
+    """Map NACE codes to sectors by running the nace_mapping statement on just these codes."""
+    setup, _ = load_queries(queries_path)
+    mem = sqlite3.connect(':memory:')
+    try:
+        mem.execute("CREATE TABLE activity (NaceCode INTEGER);")
+        mem.executemany("INSERT INTO activity VALUES (?);", [(code,) for code in nace_codes])
+        mem.execute(setup['nace_mapping'])
+        return dict(mem.execute("SELECT nace_code, sector_name FROM nace_mapping;").fetchall())
+    finally:
+        mem.close()
+
+
+def _apply_counts(df: pd.DataFrame, keys: list[str], value: str, deltas: pd.DataFrame) -> pd.DataFrame:
+    """Add ``deltas`` (keys + 'delta') to ``value``, appending new cells and dropping emptied ones."""
+    merged = df.merge(deltas, on=keys, how='outer')
+    merged[value] = merged[value].fillna(0) + merged['delta'].fillna(0)
+    merged = merged[merged[value] > 0].drop(columns='delta')
+    merged[value] = merged[value].astype('int64')
+    return merged
+
+
+def update_company_status(csv_path: str, deltas: list[tuple], out_path: str | None = None) -> None:
+    """Apply status deltas to company_status.csv (ORDER BY count DESC), writing to ``out_path`` or in place."""
+    df = pd.read_csv(csv_path, dtype={'Status': str}, keep_default_na=False)
+    delta_df = pd.DataFrame([(s or '', d) for s, d in deltas], columns=['Status', 'delta'])
+    df = _apply_counts(df, ['Status'], 'count', delta_df)
+    df = df.sort_values('count', ascending=False, kind='stable')
+    df.to_csv(out_path or csv_path, index=False, lineterminator='\n')
+
+
+def update_creation_trends(csv_path: str, deltas: list[tuple], out_path: str | None = None) -> None:
+    """Apply yearly deltas to creation_trends.csv and recompute the LAG columns (see update_company_status)."""
+    df = pd.read_csv(csv_path, dtype={'year': str}, keep_default_na=False,
+                     usecols=['year', 'new_companies'])
+    delta_df = pd.DataFrame([(y or '', d) for y, d in deltas], columns=['year', 'delta'])
+    df = _apply_counts(df, ['year'], 'new_companies', delta_df)
+    # ORDER BY year: a NULL year ('' here) sorts first, like in SQLite
+    df = df.sort_values('year', kind='stable').reset_index(drop=True)
+    prev = df['new_companies'].shift(1)
+    df['prev_year'] = prev.astype('Int64')
+    df['yoy_change'] = ((df['new_companies'] - prev) * 100.0 / prev).map(lambda v: sql_round(v, 2))
+    df.to_csv(out_path or csv_path, index=False, lineterminator='\n')
+
+
+def growth_columns(partitions: pd.DataFrame) -> pd.DataFrame:
+    """Recompute prev_year_count / yoy_growth / growth_category for whole nace_code partitions."""
+    partitions = partitions.sort_values(['nace_code', 'year'])
+    prev = partitions.groupby('nace_code')['new_companies'].shift(1)
+    partitions['prev_year_count'] = prev.astype('Int64')
+    partitions['yoy_growth'] = ((partitions['new_companies'] - prev) * 100.0 / prev.where(prev != 0)) \
+        .map(lambda v: sql_round(v, 2))
+    partitions['growth_category'] = np.select(
+        [prev.isna(), partitions['new_companies'] > prev, partitions['new_companies'] < prev],
+        ['New Sector', 'Growth', 'Decline'], default='Stable')
+    return partitions
+
+
+def update_sector_growth(csv_path: str, deltas: list[tuple], out_path: str | None = None) -> int:
+    """
+    Apply (year, nace_code) deltas to sector_growth.csv, recomputing only the touched partitions.
+
+    The result is written to ``out_path`` (default: in place).
+
+    Returns
+        int
+            Number of nace_code partitions recomputed.
+    """
+    df = pd.read_csv(csv_path)
+    columns = list(df.columns)
+    delta_df = pd.DataFrame(deltas, columns=['year', 'nace_code', 'delta'])
+    touched = set(delta_df['nace_code'])
+
+    untouched = df[~df['nace_code'].isin(touched)]
+    partitions = df[df['nace_code'].isin(touched)][['year', 'nace_code', 'sector_name', 'new_companies']]
+    partitions = _apply_counts(partitions, ['year', 'nace_code'], 'new_companies', delta_df)
+
+    missing = partitions['sector_name'].isna()
+    if missing.any():
+        names = sector_names(sorted(partitions.loc[missing, 'nace_code'].unique().tolist()))
+        partitions.loc[missing, 'sector_name'] = partitions.loc[missing, 'nace_code'].map(names)
+    partitions = growth_columns(partitions)
+
+    df = pd.concat([untouched, partitions[columns]], ignore_index=True)
+    df['prev_year_count'] = df['prev_year_count'].astype('Int64')
+    df = df.sort_values('year', ascending=False, kind='stable')
+    df.to_csv(out_path or csv_path, index=False, lineterminator='\n')
+    return len(touched)
+
+
+# -----------------------------------------------------------------------------
+# 3. Refresh entry point
+# -----------------------------------------------------------------------------
+def refresh(db_path: str, data_dir: str = DATA_DIR, state_path: str = STATE_PATH,
+            rebuild: bool = False) -> str:
+    """
+    Bring the three incremental datasets in ``data_dir`` up to date with ``db_path``.
+
+    Returns
+        str
+            ``'unchanged'``, ``'rebuilt'`` or ``'incremental'``.
+    """
+    start = time.perf_counter()
+    conn = open_state(state_path, db_path)
+    try:
+        snapshot_id = get_snapshot_id(conn, 'kbo')
+        previous = get_processed_snapshot(conn)
+        csv_paths = {name: os.path.join(data_dir, DATA_FILES[name]) for name in INCREMENTAL_DATASETS}
+        full = rebuild or previous is None or not all(os.path.exists(p) for p in csv_paths.values())
+
+        if not full and previous == snapshot_id:
+            print(f"✅ Snapshot '{snapshot_id}' already processed, nothing to do")
+            return 'unchanged'
+
+        conn.execute(_CURRENT_STATE_SQL)
+        conn.execute("CREATE INDEX temp.current_state_idx ON current_state (enterprise_number);")
+
+        if full:
+            run_queries(db_path, INCREMENTAL_DATASETS, data_dir)
+            _save_state(conn, snapshot_id, full=True)
+            print(f"✅ Full rebuild for snapshot '{snapshot_id}' ({time.perf_counter() - start:.2f}s)")
+            return 'rebuilt'
+
+        conn.execute(_CHANGES_SQL)
+        changed = conn.execute("SELECT COUNT(*) FROM changes;").fetchone()[0]
+        # Deltas are not idempotent: the three files are written next to the
+        # originals and swapped in only once all of them succeeded, and the
+        # snapshot is recorded last, so a failed run never applies them twice
+        tmp_paths = {name: f'{path}.tmp' for name, path in csv_paths.items()}
+        try:
+            update_company_status(csv_paths['company_status'], conn.execute(_STATUS_DELTA_SQL).fetchall(),
+                                  tmp_paths['company_status'])
+            update_creation_trends(csv_paths['creation_trends'], conn.execute(_YEAR_DELTA_SQL).fetchall(),
+                                   tmp_paths['creation_trends'])
+            partitions = update_sector_growth(csv_paths['sector_growth'],
+                                              conn.execute(_SECTOR_DELTA_SQL).fetchall(),
+                                              tmp_paths['sector_growth'])
+        except BaseException:
+            for tmp_path in tmp_paths.values():
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            raise
+        for name, tmp_path in tmp_paths.items():
+            os.replace(tmp_path, csv_paths[name])
+        _save_state(conn, snapshot_id, full=False)
+        print(f"✅ Incremental refresh '{previous}' -> '{snapshot_id}': {changed:,} fingerprint changes, "
+              f"{partitions:,} sector partitions recomputed ({time.perf_counter() - start:.2f}s)")
+        return 'incremental'
+    finally:
+        conn.close()
+
+
+def verify_refresh(db_path: str, data_dir: str = DATA_DIR) -> list[str]:
+    """
+    Diff the refreshed files of ``data_dir`` against a full rerun of their queries.
+
+    Rows are compared as sets of CSV lines: queries.sql orders sector_growth by
+    year only, so the order of the rows within a year is not fixed.
+
+    Returns
+        list[str]
+            One message per dataset whose rows differ (empty when they all match).
+    """
+    mismatches = []
+    with tempfile.TemporaryDirectory() as full_dir:
+        run_queries(db_path, INCREMENTAL_DATASETS, full_dir)
+        for name in INCREMENTAL_DATASETS:
+            with open(os.path.join(data_dir, DATA_FILES[name]), encoding='utf-8') as f:
+                refreshed = f.read().splitlines()
+            with open(os.path.join(full_dir, DATA_FILES[name]), encoding='utf-8') as f:
+                expected = f.read().splitlines()
+            if refreshed[:1] != expected[:1] or sorted(refreshed) != sorted(expected):
+                missing = len(set(expected) - set(refreshed))
+                extra = len(set(refreshed) - set(expected))
+                mismatches.append(f"{name}: {missing:,} rows missing, {extra:,} unexpected rows")
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Incrementally refresh sector_growth, creation_trends and company_status.")
+    parser.add_argument('db_path', help="Path to the new KBO SQLite snapshot")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Folder holding the CSV files (default: data)")
+    parser.add_argument('--state', default=STATE_PATH, help="State file of the last processed snapshot")
+    parser.add_argument('--rebuild', action='store_true', help="Recompute everything from scratch")
+    parser.add_argument('--verify', action='store_true',
+                        help="Diff the refreshed files against a full rerun of the queries")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    refresh(args.db_path, args.data_dir, args.state, args.rebuild)
+    if args.verify:
+        mismatches = verify_refresh(args.db_path, args.data_dir)
+        for message in mismatches:
+            print(f"❌ {message}")
+        if mismatches:
+            sys.exit(1)
+        print("✅ Refreshed files match a full rebuild")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,509 @@
+"""
+This module is an index advisor for the KBO database, driven by the workload in
+queries/queries.sql.
+
+Every statement is run through EXPLAIN QUERY PLAN. Full table scans, index
+lookups that still read the table, automatic indexes and temp B-trees
+(GROUP BY / DISTINCT / ORDER BY / count(DISTINCT)) are flagged. From the
+flagged table accesses the advisor proposes covering indexes (lookup key
+first, then the other columns the statement reads from that table) and
+expression indexes for the ``CAST(SUBSTR(...) AS INTEGER)`` year filters.
+
+With ``--apply`` the proposals are created on a copy of the database (the
+original is never written), and every statement is timed before and after.
+The findings are written to docs/index_advice.md.
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from query_runner import QUERIES_PATH, connect_readonly, load_queries
+
+# "SCAN e", "SEARCH a USING INDEX EntityNumber (EntityNumber=?)", older "SCAN TABLE enterprise AS e"
+_ACCESS_RE = re.compile(
+    r'^(SCAN|SEARCH) (?:TABLE )?(\w+)(?: AS (\w+))?'
+    r'(?: USING ((?:COVERING |AUTOMATIC (?:PARTIAL )?(?:COVERING )?)?(?:INDEX|INTEGER PRIMARY KEY))\b)?'
+    r'[^(]*(?:\((.*)\))?'
+)
+# "FROM enterprise e", "JOIN activity AS a", "FROM enterprise"
+_TABLE_REF_RE = re.compile(r'\b(?:FROM|JOIN)\s+\[?(\w+)\]?(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+# Year filters such as CAST(SUBSTR(e.StartDate, 7, 4) AS INTEGER) BETWEEN 2000 AND 2025
+_YEAR_FILTER_RE = re.compile(
+    r'CAST\(\s*SUBSTR\(\s*(?:(\w+)\.)?(\w+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)\s+AS\s+INTEGER\s*\)'
+    r'\s*(?:BETWEEN|IN\b|[<>]=?|=)',
+    re.IGNORECASE,
+)
+_SQL_KEYWORDS = {'on', 'where', 'group', 'order', 'left', 'inner', 'join', 'limit', 'having',
+                 'union', 'using', 'natural', 'cross', 'outer', 'window'}
+
+REPORT_FILE = 'index_advice.md'
+DEFAULT_REPEAT = 3
+SLOWDOWN_THRESHOLD = 0.10     # relative slow-down of the best run reported after indexing
+
+
+@dataclass
+class IndexProposal:
+    table: str
+    columns: list[str]                       # plain column names or SQL expressions
+    reason: str
+    queries: list[str] = field(default_factory=list)
+    chosen: bool | None = None               # used by any plan on the indexed copy
+
+    @property
+    def name(self) -> str:
+        parts = [re.sub(r'\W+', '_', col.lower()).strip('_') for col in self.columns]
+        name = f"idx_{self.table.lower()}_{'_'.join(parts)}"
+        if len(name) > 60:  # keep long expression names short but distinct
+            name = f"{name[:51]}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+        return name
+
+    @property
+    def sql(self) -> str:
+        return f"CREATE INDEX IF NOT EXISTS [{self.name}] ON [{self.table}] ({', '.join(self.columns)});"
+
+
+# -----------------------------------------------------------------------------
+# 1. Query plans
+# -----------------------------------------------------------------------------
+def explain_plan(conn: sqlite3.Connection, sql: str) -> list[tuple[int, int, str]]:
+    """EXPLAIN QUERY PLAN rows of ``sql`` as ``(id, parent, detail)``."""
+    return [(row[0], row[1], row[3]) for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def format_plan_tree(plan: list[tuple[int, int, str]]) -> str:
+    """Render EXPLAIN QUERY PLAN rows as an indented tree, like the sqlite3 shell."""
+    depth: dict[int, int] = {0: -1}
+    lines = []
+    for node_id, parent, detail in plan:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append(f"{'   ' * depth[node_id]}|--{detail}")
+    return '\n'.join(lines)
+
+
+def strip_literals(sql: str) -> str:
+    """Remove ``--`` comments and the content of string literals, for column matching."""
+    sql = re.sub(r"'(?:[^']|'')*'", "''", sql)
+    return re.sub(r'--[^\n]*', '', sql)
+
+
+def table_aliases(sql: str, tables: set[str]) -> dict[str, str]:
+    """Map every alias (and bare name) used for a real table in ``sql`` to that table."""
+    aliases: dict[str, str] = {}
+    for table, alias in _TABLE_REF_RE.findall(sql):
+        if table in tables:
+            aliases[table] = table
+            if alias and alias.lower() not in _SQL_KEYWORDS:
+                aliases[alias] = table
+    return aliases
+
+
+def referenced_columns(sql: str, table: str, aliases: dict[str, str],
+                       columns: dict[str, list[str]]) -> list[str]:
+    """
+    Columns of ``table`` that ``sql`` reads, in order of first appearance.
+
+    Qualified references (``e.StartDate``) always count; bare names count only
+    when no other table of the statement has a column with that name.
+    """
+    own = {col.lower(): col for col in columns[table]}
+    others = {col.lower() for t in set(aliases.values()) if t != table for col in columns[t]}
+    own_aliases = {alias.lower() for alias, t in aliases.items() if t == table}
+    found: dict[str, int] = {}
+    for match in re.finditer(r'\b(?:(\w+)\.)?(\w+)\b', sql):
+        qualifier, name = match.group(1), match.group(2).lower()
+        if name not in own:
+            continue
+        if (qualifier and qualifier.lower() in own_aliases) or (not qualifier and name not in others):
+            found.setdefault(own[name], match.start())
+    return sorted(found, key=found.get)
+
+
+# -----------------------------------------------------------------------------
+# 2. Findings and proposals
+# -----------------------------------------------------------------------------
+def find_issues(plan: list[tuple[int, int, str]], aliases: dict[str, str]) -> list[dict]:
+    """
+    Flag the plan steps worth an index.
+
+    Returns
+        list[dict]
+            ``{'kind', 'detail', 'table', 'keys'}`` per flagged step; ``table``
+            is ``None`` for steps on CTEs, subqueries and temp tables.
+    """
+    issues = []
+    for _, _, detail in plan:
+        if detail.startswith('USE TEMP B-TREE'):
+            issues.append({'kind': 'temp b-tree', 'detail': detail, 'table': None, 'keys': []})
+            continue
+        match = _ACCESS_RE.match(detail)
+        if not match:
+            continue
+        op, name, alias, using, constraint = match.groups()
+        table = aliases.get(alias or name)
+        keys = re.findall(r'(\w+)=\?', constraint or '')
+        if using is None:
+            if op == 'SEARCH':  # rowid lookup
+                continue
+            kind = 'full scan'
+        elif using.startswith('AUTOMATIC'):
+            kind = 'automatic index'
+        elif using.startswith('COVERING') or using.endswith('PRIMARY KEY'):
+            continue
+        else:
+            kind = 'lookup + table read' if op == 'SEARCH' else 'index scan + table read'
+        issues.append({'kind': kind, 'detail': detail, 'table': table, 'keys': keys})
+    return issues
+
+
+def existing_indexes(conn: sqlite3.Connection) -> dict[str, list[list[str]]]:
+    """Leading columns of every index, per table (expression columns appear as ``None``)."""
+    indexes: dict[str, list[list[str]]] = {}
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+    for table in tables:
+        for row in conn.execute(f"PRAGMA index_list([{table}])"):
+            cols = [info[2] for info in conn.execute(f"PRAGMA index_info([{row[1]}])")]
+            indexes.setdefault(table, []).append(cols)
+    return indexes
+
+
+def propose_indexes(sql: str, issues: list[dict], aliases: dict[str, str],
+                    columns: dict[str, list[str]]) -> list[IndexProposal]:
+    """Covering indexes for the flagged table accesses, expression indexes for year filters."""
+    proposals = []
+    for issue in issues:
+        table = issue['table']
+        if table is None:
+            continue
+        keys = [col for col in issue['keys'] if col in columns[table]]
+        used = referenced_columns(sql, table, aliases, columns)
+        cols = keys + [col for col in used if col not in keys]
+        if not cols:
+            continue
+        if len(cols) >= len(columns[table]):
+            # Covering every column would duplicate the table: index the key only
+            if issue['kind'] == 'automatic index' or not keys:
+                continue
+            cols = keys
+        proposals.append(IndexProposal(table, cols, f"{issue['kind']}: {issue['detail']}"))
+
+    for alias, column, start, length in set(_YEAR_FILTER_RE.findall(sql)):
+        table = aliases.get(alias) if alias else next(
+            (t for t in set(aliases.values()) if column in columns[t]), None)
+        if table is None or column not in columns[table]:
+            continue
+        expression = f"CAST(SUBSTR({column}, {start}, {length}) AS INTEGER)"
+        used = referenced_columns(sql, table, aliases, columns)
+        extra = [col for col in columns[table] if col in used]
+        proposals.append(IndexProposal(table, [expression] + extra,
+                                       f"year filter on {alias + '.' if alias else ''}{column}"))
+    return proposals
+
+
+def merge_proposals(proposals: list[IndexProposal],
+                    existing: dict[str, list[list[str]]]) -> list[IndexProposal]:
+    """
+    Fold every proposal into a wider one on the same table with the same
+    leading column that already holds all of its columns, and drop the ones
+    an existing index already starts with.
+    """
+    merged: list[IndexProposal] = []
+    for proposal in sorted(proposals, key=lambda p: -len(p.columns)):
+        lowered = [c.lower() for c in proposal.columns]
+        covered_by = next((m for m in merged if m.table == proposal.table
+                           and m.columns[0].lower() == lowered[0]
+                           and set(lowered) <= {c.lower() for c in m.columns}), None)
+        if covered_by is not None:
+            covered_by.queries = sorted(set(covered_by.queries + proposal.queries))
+            continue
+        if any([c.lower() for c in idx[:len(lowered)] if c] == lowered
+               for idx in existing.get(proposal.table, [])):
+            continue
+        merged.append(proposal)
+    return sorted(merged, key=lambda p: (p.table, p.name))
+
+
+def analyze_workload(conn: sqlite3.Connection, setup: dict[str, str],
+                     queries: dict[str, str]) -> tuple[dict[str, dict], list[IndexProposal]]:
+    """
+    EXPLAIN every set-up and result statement on ``conn`` and collect the proposals.
+
+    Set-up statements (TEMP tables) are executed once so the statements that
+    use them can be explained.
+
+    Returns
+        tuple[dict[str, dict], list[IndexProposal]]
+            Per statement ``{'plan', 'issues'}``, and the merged proposals.
+    """
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    columns = {t: [row[1] for row in conn.execute(f"PRAGMA table_info([{t}])")] for t in tables}
+    statements = {f'setup:{table}': sql for table, sql in setup.items()} | queries
+
+    analysis: dict[str, dict] = {}
+    proposals: list[IndexProposal] = []
+    for name, sql in statements.items():
+        text = strip_literals(sql)
+        aliases = table_aliases(text, tables)
+        plan = explain_plan(conn, sql)
+        issues = find_issues(plan, aliases)
+        analysis[name] = {'plan': plan, 'issues': issues}
+        for proposal in propose_indexes(text, issues, aliases, columns):
+            proposal.queries = [name]
+            proposals.append(proposal)
+        if name.startswith('setup:'):
+            conn.execute(sql)
+    return analysis, merge_proposals(proposals, existing_indexes(conn))
+
+
+# -----------------------------------------------------------------------------
+# 3. Applying proposals to a copy and timing the workload
+# -----------------------------------------------------------------------------
+def apply_to_copy(db_path: str, copy_path: str, proposals: list[IndexProposal]) -> dict[str, float]:
+    """
+    Copy the database with the online backup API, create the proposed indexes
+    on the copy and ANALYZE it.
+
+    Returns
+        dict[str, float]
+            Build time in seconds per index name.
+    """
+    if os.path.abspath(copy_path) == os.path.abspath(db_path):
+        raise ValueError("The copy must not be the original database")
+    source = connect_readonly(db_path)
+    target = sqlite3.connect(copy_path)
+    try:
+        source.backup(target)
+        build_times = {}
+        for proposal in proposals:
+            start = time.perf_counter()
+            target.execute(proposal.sql)
+            build_times[proposal.name] = time.perf_counter() - start
+            print(f"✅ Created {proposal.name} ({build_times[proposal.name]:.2f}s)")
+        target.execute("ANALYZE;")
+        target.commit()
+        return build_times
+    finally:
+        source.close()
+        target.close()
+
+
+def _time_statement(conn: sqlite3.Connection, sql: str, repeat: int, reset_sql: str | None = None) -> dict:
+    """
+    Run ``sql`` once to warm the page cache, then ``repeat`` timed times with all rows fetched.
+
+    ``reset_sql`` runs untimed before every run (drops a set-up table so it can be created again).
+    """
+    runs: list[float] = []
+    rows = 0
+    for run in range(repeat + 1):
+        if reset_sql:
+            conn.execute(reset_sql)
+        start = time.perf_counter()
+        cursor = conn.execute(sql)
+        rows = 0
+        while batch := cursor.fetchmany(10_000):
+            rows += len(batch)
+        if run:  # run 0 is the warm-up
+            runs.append(time.perf_counter() - start)
+    return {'min': min(runs), 'median': statistics.median(runs), 'runs': runs, 'rows': rows}
+
+
+def time_workload(db_path: str, setup: dict[str, str], queries: dict[str, str],
+                  repeat: int = DEFAULT_REPEAT) -> dict[str, dict]:
+    """
+    Time every statement on a fresh read-only connection: one warm-up run, then ``repeat`` runs.
+
+    Both databases are timed with a warm page cache, so the comparison is
+    not biased towards whichever runs second.
+
+    Returns
+        dict[str, dict]
+            Per statement ``{'min', 'median', 'runs', 'rows', 'plan'}`` in seconds.
+
+    Raises
+        ValueError
+            If ``repeat`` is below 1.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    conn = connect_readonly(db_path)
+    timings: dict[str, dict] = {}
+    try:
+        # Set-up tables are dropped before each run so they can be created again
+        statements = {f'setup:{table}': (sql, f"DROP TABLE IF EXISTS temp.{table};")
+                      for table, sql in setup.items()}
+        statements |= {name: (sql, None) for name, sql in queries.items()}
+        for name, (sql, reset_sql) in statements.items():
+            plan = explain_plan(conn, sql)
+            timings[name] = _time_statement(conn, sql, repeat, reset_sql) | {'plan': plan}
+            print(f"  {name:<28} {timings[name]['min']:8.3f}s min  {timings[name]['median']:8.3f}s median")
+    finally:
+        conn.close()
+    return timings
+
+
+def find_slowdowns(before: dict[str, dict], after: dict[str, dict],
+                   threshold: float = SLOWDOWN_THRESHOLD) -> list[str]:
+    """Statements whose best run got more than ``threshold`` (relative) slower on the indexed copy."""
+    return [name for name in before if after[name]['min'] > before[name]['min'] * (1 + threshold)]
+
+
+# -----------------------------------------------------------------------------
+# 4. Report
+# -----------------------------------------------------------------------------
+def write_report(path: str, db_path: str, analysis: dict[str, dict], proposals: list[IndexProposal],
+                 before: dict[str, dict] | None = None, after: dict[str, dict] | None = None,
+                 build_times: dict[str, float] | None = None) -> None:
+    """Write the findings, the proposed DDL and the timings to a Markdown file."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Index Advice\n\n")
+        f.write(f"**Database**: `{os.path.basename(db_path)}`\n")
+        f.write(f"**Generated on**: {datetime.now():%Y-%m-%d %H:%M:%S}\n\n")
+
+        f.write("## Proposed Indexes\n\n")
+        if not proposals:
+            f.write("No index proposals.\n\n")
+        for proposal in proposals:
+            build = f" (built in {build_times[proposal.name]:.2f}s)" if build_times else ''
+            f.write(f"- `{proposal.sql}`{build}\n")
+            f.write(f"  - {proposal.reason}\n")
+            f.write(f"  - Used by: {', '.join(proposal.queries)}\n")
+            if proposal.chosen is not None:
+                f.write(f"  - Chosen by the planner on the copy: {'yes' if proposal.chosen else 'no'}\n")
+        f.write("\n")
+
+        if before and after:
+            f.write("## Timings\n\n")
+            runs = len(before[next(iter(before))]['runs'])
+            f.write(f"Best and median of {runs} runs after a warm-up run.\n\n")
+            f.write("| Statement | Before min (s) | Before median (s) | After min (s) | After median (s) | Speed-up |\n")
+            f.write("|-----------|----------------|-------------------|---------------|------------------|----------|\n")
+            for name in before:
+                b, a = before[name], after[name]
+                speedup = b['min'] / a['min'] if a['min'] else float('inf')
+                f.write(f"| `{name}` | {b['min']:.3f} | {b['median']:.3f} | {a['min']:.3f} | {a['median']:.3f} "
+                        f"| {speedup:.1f}× |\n")
+            f.write("\n")
+
+        f.write("## Query Plans\n\n")
+        for name, info in analysis.items():
+            f.write(f"### `{name}`\n\n")
+            if info['issues']:
+                for issue in info['issues']:
+                    f.write(f"- **{issue['kind']}**: `{issue['detail']}`\n")
+            else:
+                f.write("- No issues\n")
+            f.write(f"\n```\n{format_plan_tree(info['plan'])}\n```\n\n")
+            if after:
+                f.write(f"After:\n\n```\n{format_plan_tree(after[name]['plan'])}\n```\n\n")
+
+
+def advise(db_path: str, queries_path: str = QUERIES_PATH, copy_path: str | None = None,
+           output_dir: str = 'docs', repeat: int = DEFAULT_REPEAT,
+           threshold: float = SLOWDOWN_THRESHOLD) -> list[IndexProposal]:
+    """
+    Analyze the workload, optionally apply the proposals to ``copy_path`` and
+    time it before and after, then write docs/index_advice.md.
+
+    Parameters
+        db_path : str
+            Path to the KBO SQLite file (opened read-only).
+        queries_path : str, optional
+            SQL workload (default: 'queries/queries.sql').
+        copy_path : str | None, optional
+            Where to create the indexed copy; ``None`` only analyzes.
+        output_dir : str, optional
+            Directory of the Markdown report (default: 'docs').
+        repeat : int, optional
+            Timed runs per statement, after one warm-up run (default: DEFAULT_REPEAT).
+        threshold : float, optional
+            Relative slow-down of the best run reported after indexing (default: 10%).
+
+    Returns
+        list[IndexProposal]
+            The merged index proposals.
+
+    Raises
+        ValueError
+            If ``repeat`` is below 1.
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, got {repeat}")
+    setup, queries = load_queries(queries_path)
+    conn = connect_readonly(db_path)
+    try:
+        analysis, proposals = analyze_workload(conn, setup, queries)
+    finally:
+        conn.close()
+
+    flagged = sum(len(info['issues']) for info in analysis.values())
+    print(f"Flagged {flagged} plan steps in {len(analysis)} statements, proposing {len(proposals)} indexes:")
+    for proposal in proposals:
+        print(f"  {proposal.sql}")
+
+    before = after = build_times = None
+    if copy_path and proposals:
+        print("Timing the workload on the original database...")
+        before = time_workload(db_path, setup, queries, repeat)
+        print(f"Building the indexes on {copy_path}...")
+        build_times = apply_to_copy(db_path, copy_path, proposals)
+        print("Timing the workload on the indexed copy...")
+        after = time_workload(copy_path, setup, queries, repeat)
+        details = [detail for t in after.values() for _, _, detail in t['plan']]
+        for proposal in proposals:
+            proposal.chosen = any(proposal.name in detail for detail in details)
+        unused = [p.name for p in proposals if not p.chosen]
+        if unused:
+            print(f"Not chosen by the planner (drop them): {', '.join(unused)}")
+        slower = find_slowdowns(before, after, threshold)
+        if slower:
+            print(f"Slower with the indexes (best run, > {threshold:.0%}): {', '.join(slower)}")
+        total_before = sum(t['min'] for t in before.values())
+        total_after = sum(t['min'] for t in after.values())
+        print(f"Workload: {total_before:.2f}s before, {total_after:.2f}s after")
+
+    report_path = os.path.join(output_dir, REPORT_FILE)
+    write_report(report_path, db_path, analysis, proposals, before, after, build_times)
+    print(f"✅ Index advice written to {report_path}")
+    return proposals
+
+
+def positive_int(value: str) -> int:
+    """argparse type for a count of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose indexes for the queries.sql workload.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--queries', default=QUERIES_PATH, help="SQL workload to analyze")
+    parser.add_argument('--apply', metavar='COPY_PATH',
+                        help="Build the proposed indexes on a copy at COPY_PATH and time the workload")
+    parser.add_argument('--output-dir', default='docs', help="Report folder (default: docs)")
+    parser.add_argument('--repeat', type=positive_int, default=DEFAULT_REPEAT,
+                        help=f"Timed runs per statement after a warm-up run (default: {DEFAULT_REPEAT})")
+    parser.add_argument('--threshold', type=float, default=SLOWDOWN_THRESHOLD,
+                        help=f"Relative slow-down reported after indexing (default: {SLOWDOWN_THRESHOLD})")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    advise(args.db_path, args.queries, args.apply, args.output_dir, args.repeat, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
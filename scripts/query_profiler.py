@@ -0,0 +1,409 @@
+"""
+This module runs queries/queries.sql in an instrumented mode and writes one
+profile per statement, to find out why a query is slow rather than only that
+it is slow.
+
+Per statement the profile records:
+    - wall time, rows returned and the statements seen by the trace callback;
+    - VM steps (exact from sqlite3_stmt_status, otherwise approximated by the
+      progress handler, which fires every PROGRESS_INTERVAL instructions);
+    - rows scanned by full table/index scans, sorts and automatic indexes;
+    - page-cache hits, misses, writes and spills of the connection;
+    - SQLite's heap high-water mark (sorters and in-memory temp B-trees);
+    - the EXPLAIN QUERY PLAN tree.
+
+For statements built from CTEs (WITH ...), every CTE is also run on its own
+to attribute the cost to the CTE that adds it, e.g. the repeated LAG windows
+in recent_growth.
+
+Python's sqlite3 module does not expose sqlite3_stmt_status/sqlite3_db_status,
+so those counters are read through ctypes from the SQLite library that
+_sqlite3 is linked against. When that is not possible (another Python
+implementation, a CPython version whose connection layout is not known, a
+statically linked build), the native counters are reported as ``None`` and
+only the portable measurements remain.
+"""
+
+import argparse
+import ctypes
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from datasets import DATA_FILES
+from index_advisor import explain_plan, format_plan_tree
+from query_runner import QUERIES_PATH, connect_readonly, load_queries
+
+PROFILE_DIR = 'profiles'
+PROGRESS_INTERVAL = 1000
+
+# sqlite3_stmt_status() counters (SQLITE_STMTSTATUS_*)
+STMT_COUNTERS = {'fullscan_steps': 1, 'sorts': 2, 'autoindexes': 3, 'vm_steps': 4,
+                 'bloom_filter_misses': 7, 'bloom_filter_hits': 8}
+# sqlite3_db_status() counters (SQLITE_DBSTATUS_*)
+DB_COUNTERS = {'cache_hits': 7, 'cache_misses': 8, 'cache_writes': 9, 'cache_spills': 12}
+_STATUS_MEMORY_USED = 0
+# CPython versions whose pysqlite_Connection starts with PyObject_HEAD followed by
+# the sqlite3* handle (checked in Modules/_sqlite/connection.h); outside this
+# range the handle is never read, since a wrong pointer would crash SQLite
+CONNECTION_LAYOUT_VERSIONS = ((3, 8), (3, 14))
+
+
+# -----------------------------------------------------------------------------
+# 1. Native SQLite counters
+# -----------------------------------------------------------------------------
+class NativeStats:
+    """sqlite3_stmt_status / sqlite3_db_status / sqlite3_status64 for one connection."""
+
+    def __init__(self, conn: sqlite3.Connection, db_path: str):
+        self.lib = None
+        self.db = None
+        try:
+            import _sqlite3
+            low, high = CONNECTION_LAYOUT_VERSIONS
+            if sys.implementation.name != 'cpython' or not low <= sys.version_info[:2] < high:
+                return
+            lib = ctypes.CDLL(_sqlite3.__file__)
+            lib.sqlite3_db_filename.restype = ctypes.c_char_p
+            lib.sqlite3_db_filename.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+            lib.sqlite3_next_stmt.restype = ctypes.c_void_p
+            lib.sqlite3_next_stmt.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+            lib.sqlite3_sql.restype = ctypes.c_char_p
+            lib.sqlite3_sql.argtypes = [ctypes.c_void_p]
+            lib.sqlite3_stmt_status.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+            lib.sqlite3_db_status.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int),
+                                              ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+            lib.sqlite3_status64.argtypes = [ctypes.c_int, ctypes.POINTER(ctypes.c_int64),
+                                             ctypes.POINTER(ctypes.c_int64), ctypes.c_int]
+        except (ImportError, OSError, AttributeError):
+            return
+        # CPython's connection object starts with PyObject_HEAD followed by the sqlite3* handle;
+        # the handle is only trusted if SQLite reports the expected file for it
+        db = ctypes.c_void_p.from_address(id(conn) + object.__basicsize__).value
+        if db and lib.sqlite3_db_filename(db, b'main') == os.path.abspath(db_path).encode():
+            self.lib, self.db = lib, db
+
+    @property
+    def available(self) -> bool:
+        return self.db is not None
+
+    def stmt_counters(self, sql: str) -> dict[str, int] | None:
+        """Counters of the prepared statement whose text is ``sql`` (they survive sqlite3_reset)."""
+        if not self.available:
+            return None
+        stmt = self.lib.sqlite3_next_stmt(self.db, None)
+        while stmt:
+            text = self.lib.sqlite3_sql(stmt)
+            if text is not None and text.decode('utf-8', 'replace').strip() == sql.strip():
+                return {name: self.lib.sqlite3_stmt_status(stmt, op, 0) for name, op in STMT_COUNTERS.items()}
+            stmt = self.lib.sqlite3_next_stmt(self.db, stmt)
+        return {name: 0 for name in STMT_COUNTERS}
+
+    def db_counters(self, reset: bool = False) -> dict[str, int] | None:
+        if not self.available:
+            return None
+        current, highwater = ctypes.c_int(), ctypes.c_int()
+        counters = {}
+        for name, op in DB_COUNTERS.items():
+            self.lib.sqlite3_db_status(self.db, op, ctypes.byref(current), ctypes.byref(highwater), int(reset))
+            counters[name] = current.value
+        return counters
+
+    def memory_highwater(self, reset: bool = False) -> int | None:
+        """Process-wide SQLite heap high-water mark in bytes."""
+        if not self.available:
+            return None
+        current, highwater = ctypes.c_int64(), ctypes.c_int64()
+        self.lib.sqlite3_status64(_STATUS_MEMORY_USED, ctypes.byref(current), ctypes.byref(highwater), int(reset))
+        return highwater.value
+
+
+# -----------------------------------------------------------------------------
+# 2. CTE splitting
+# -----------------------------------------------------------------------------
+def _skip_literal(sql: str, i: int) -> int:
+    """Index just past the string, quoted name or comment starting at ``sql[i]`` (``i`` if none)."""
+    if i >= len(sql):
+        return i
+    if sql.startswith('--', i):
+        end = sql.find('\n', i)
+        return len(sql) if end < 0 else end + 1
+    if sql.startswith('/*', i):
+        end = sql.find('*/', i + 2)
+        return len(sql) if end < 0 else end + 2
+    if sql[i] in '\'"`[':
+        close = ']' if sql[i] == '[' else sql[i]
+        end = sql.find(close, i + 1)
+        while end >= 0 and close != ']' and sql.startswith(close * 2, end):
+            end = sql.find(close, end + 2)  # doubled quote inside the literal
+        return len(sql) if end < 0 else end + 1
+    return i
+
+
+def _closing_paren(sql: str, start: int) -> int:
+    """Index of the parenthesis closing the one at ``sql[start]``."""
+    depth, i = 0, start
+    while i < len(sql):
+        skipped = _skip_literal(sql, i)
+        if skipped != i:
+            i = skipped
+            continue
+        if sql[i] == '(':
+            depth += 1
+        elif sql[i] == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError("Unbalanced parentheses in SQL statement")
+
+
+def _skip_blank(sql: str, i: int) -> int:
+    """Index of the first character at or after ``i`` that is not whitespace or a comment."""
+    while i < len(sql):
+        if sql[i].isspace():
+            i += 1
+        elif sql.startswith(('--', '/*'), i):
+            i = _skip_literal(sql, i)
+        else:
+            break
+    return i
+
+
+def split_ctes(sql: str) -> tuple[list[tuple[str, str]], str]:
+    """
+    Split ``WITH a AS (...), b AS (...) SELECT ...`` into its CTEs and main statement.
+
+    Returns
+        tuple[list[tuple[str, str]], str]
+            ``([(name, definition), ...], main_statement)`` where ``definition``
+            is the text after ``WITH`` that declares the CTE; ``([], sql)`` for
+            statements without a WITH clause.
+    """
+    i = _skip_blank(sql, 0)
+    head = re.compile(r'WITH\s+(?:RECURSIVE\s+)?', re.IGNORECASE).match(sql, i)
+    if not head:
+        return [], sql
+    ctes, i = [], head.end()
+    name_re = re.compile(r'(\w+)\s*(\([^)]*\))?\s*AS\s*(?:NOT\s+)?(?:MATERIALIZED\s*)?(?=\()', re.IGNORECASE)
+    while True:
+        match = name_re.match(sql, i)
+        if not match:
+            raise ValueError(f"Cannot parse the CTE starting at: {sql[i:i + 40]!r}")
+        end = _closing_paren(sql, match.end())
+        ctes.append((match.group(1), sql[match.start():end + 1].strip()))
+        i = _skip_blank(sql, end + 1)
+        if i < len(sql) and sql[i] == ',':
+            i = _skip_blank(sql, i + 1)
+            continue
+        return ctes, sql[i:].strip()
+
+
+# -----------------------------------------------------------------------------
+# 3. Profiling
+# -----------------------------------------------------------------------------
+def profile_statement(conn: sqlite3.Connection, native: NativeStats, sql: str) -> dict:
+    """
+    Execute ``sql`` once, fetch every row and return its measurements.
+
+    Returns
+        dict
+            ``seconds``, ``rows_returned``, ``vm_steps`` (exact or approximate, see
+            ``vm_steps_exact``), ``progress_callbacks``, the statement counters
+            (``fullscan_steps``, ``sorts``, ``autoindexes``, ...), the cache
+            counters with ``cache_hit_rate``, ``memory_highwater`` and ``trace``.
+    """
+    callbacks = 0
+    trace: list[dict] = []
+    start = time.perf_counter()
+
+    def on_progress():
+        nonlocal callbacks
+        callbacks += 1
+        return 0  # never interrupt
+
+    def on_trace(statement):
+        trace.append({'at_ms': round((time.perf_counter() - start) * 1000, 3),
+                      'sql': ' '.join(statement.split())[:200]})
+
+    stmt_before = native.stmt_counters(sql)
+    native.db_counters(reset=True)
+    native.memory_highwater(reset=True)
+    conn.set_progress_handler(on_progress, PROGRESS_INTERVAL)
+    conn.set_trace_callback(on_trace)
+    start = time.perf_counter()
+    try:
+        cursor = conn.execute(sql)
+        rows = 0
+        while batch := cursor.fetchmany(10_000):
+            rows += len(batch)
+        seconds = time.perf_counter() - start
+    finally:
+        conn.set_progress_handler(None, 0)
+        conn.set_trace_callback(None)
+
+    profile = {'seconds': seconds, 'rows_returned': rows, 'progress_callbacks': callbacks,
+               'vm_steps': callbacks * PROGRESS_INTERVAL, 'vm_steps_exact': False}
+    stmt_after = native.stmt_counters(sql)
+    if stmt_after is not None:
+        profile.update({name: stmt_after[name] - stmt_before[name] for name in STMT_COUNTERS})
+        profile['vm_steps_exact'] = True
+    else:
+        profile.update({name: None for name in STMT_COUNTERS if name != 'vm_steps'})
+    cache = native.db_counters()
+    profile.update(cache or {name: None for name in DB_COUNTERS})
+    lookups = (cache['cache_hits'] + cache['cache_misses']) if cache else 0
+    profile['cache_hit_rate'] = cache['cache_hits'] / lookups if lookups else None
+    profile['memory_highwater'] = native.memory_highwater()
+    profile['trace'] = trace
+    return profile
+
+
+def profile_ctes(conn: sqlite3.Connection, native: NativeStats, sql: str) -> list[dict]:
+    """
+    Run every CTE of ``sql`` on its own (with the CTEs it may depend on) and
+    attribute its cost.
+
+    ``self_vm_steps`` is the CTE's own cost: its cumulative VM steps minus
+    those of the earlier CTEs it references directly (approximate when two
+    of them share a dependency).
+    """
+    ctes, _ = split_ctes(sql)
+    results: list[dict] = []
+    names = [name for name, _ in ctes]
+    for i, (name, definition) in enumerate(ctes):
+        probe = f"WITH {', '.join(d for _, d in ctes[:i + 1])} SELECT * FROM {name}"
+        profile = profile_statement(conn, native, probe)
+        body = definition[definition.index('('):]
+        depends_on = [dep for dep in names[:i] if re.search(rf'\b{dep}\b', body, re.IGNORECASE)]
+        dep_steps = sum(r['vm_steps'] for r in results if r['name'] in depends_on)
+        dep_seconds = sum(r['seconds'] for r in results if r['name'] in depends_on)
+        results.append({'name': name, 'depends_on': depends_on, 'seconds': profile['seconds'],
+                        'vm_steps': profile['vm_steps'], 'rows_returned': profile['rows_returned'],
+                        'self_vm_steps': max(profile['vm_steps'] - dep_steps, 0),
+                        'self_seconds': max(profile['seconds'] - dep_seconds, 0.0)})
+    return results
+
+
+def profile_queries(db_path: str, datasets: list[str] | None = None, queries_path: str = QUERIES_PATH,
+                    output_dir: str = PROFILE_DIR, ctes: bool = True) -> dict[str, dict]:
+    """
+    Profile the named statements of ``queries_path`` and write one text and
+    one JSON profile per statement to ``output_dir``.
+
+    Parameters
+        db_path : str
+            Path to the KBO SQLite file (opened read-only).
+        datasets : list[str] | None, optional
+            Statements to profile (default: all).
+        queries_path : str, optional
+            SQL file (default: 'queries/queries.sql').
+        output_dir : str, optional
+            Folder for the profiles (default: 'profiles').
+        ctes : bool, optional
+            Also run and attribute every CTE on its own.
+
+    Returns
+        dict[str, dict]
+            Profile per statement name (set-up statements as ``setup:<table>``).
+    """
+    setup, queries = load_queries(queries_path)
+    selected = datasets or list(queries)
+    os.makedirs(output_dir, exist_ok=True)
+    profiles: dict[str, dict] = {}
+    conn = connect_readonly(db_path)
+    try:
+        native = NativeStats(conn, db_path)
+        if not native.available:
+            print("Native SQLite counters unavailable, VM steps are approximated by the progress handler")
+        conn.execute("PRAGMA temp_store")  # warm the schema before the first measurement
+        settings = {pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+                    for pragma in ('temp_store', 'cache_size', 'page_size')}
+        statements = {}
+        for name in selected:
+            for table, create_sql in setup.items():
+                if f'setup:{table}' not in statements and re.search(rf'\b{table}\b', queries[name]):
+                    statements[f'setup:{table}'] = create_sql
+            statements[name] = queries[name]
+
+        for name, sql in statements.items():
+            plan = explain_plan(conn, sql)
+            profile = profile_statement(conn, native, sql)
+            profile['settings'] = settings
+            profile['plan'] = [{'id': node, 'parent': parent, 'detail': detail} for node, parent, detail in plan]
+            if ctes and not name.startswith('setup:'):
+                profile['ctes'] = profile_ctes(conn, native, sql)
+            profiles[name] = profile
+
+            text = format_profile(name, profile, plan)
+            print(text)
+            safe_name = name.replace(':', '_')
+            with open(os.path.join(output_dir, f'{safe_name}.txt'), 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+            with open(os.path.join(output_dir, f'{safe_name}.json'), 'w', encoding='utf-8') as f:
+                json.dump({'name': name, **profile}, f, indent=2)
+    finally:
+        conn.close()
+    print(f"✅ Wrote {len(profiles)} profiles to {output_dir}/")
+    return profiles
+
+
+# -----------------------------------------------------------------------------
+# 4. Text profile
+# -----------------------------------------------------------------------------
+def _fmt(value, spec: str = ',') -> str:
+    return 'n/a' if value is None else format(value, spec)
+
+
+def format_profile(name: str, profile: dict, plan: list[tuple[int, int, str]]) -> str:
+    """Human-readable profile of one statement."""
+    steps = f"{profile['vm_steps']:,}" + ('' if profile['vm_steps_exact'] else ' (approx.)')
+    lines = [
+        f"== {name} ==",
+        f"Wall time        {profile['seconds']:.3f}s",
+        f"VM steps         {steps}",
+        f"Rows returned    {profile['rows_returned']:,}",
+        f"Rows scanned     {_fmt(profile['fullscan_steps'])} (full-scan steps)",
+        f"Sorts            {_fmt(profile['sorts'])}, automatic indexes {_fmt(profile['autoindexes'])}",
+        f"Page cache       {_fmt(profile['cache_hits'])} hits, {_fmt(profile['cache_misses'])} misses, "
+        f"hit rate {_fmt(profile['cache_hit_rate'], '.1%')}, "
+        f"{_fmt(profile['cache_spills'])} spills",
+        f"SQLite heap peak {_fmt(profile['memory_highwater'] and profile['memory_highwater'] // 1024)} KiB "
+        f"(temp_store={profile['settings']['temp_store']})",
+        "Query plan:",
+        format_plan_tree(plan),
+    ]
+    if profile.get('ctes'):
+        total = max(sum(c['self_vm_steps'] for c in profile['ctes']), 1)
+        lines.append("CTEs (self cost = cumulative minus direct dependencies):")
+        for cte in profile['ctes']:
+            lines.append(f"  {cte['name']:<26} self {cte['self_seconds']:8.3f}s "
+                         f"{cte['self_vm_steps']:>14,} steps ({cte['self_vm_steps'] / total:6.1%})"
+                         f"  cumulative {cte['seconds']:.3f}s")
+        hot = max(profile['ctes'], key=lambda c: c['self_vm_steps'])
+        lines.append(f"Hot spot: {hot['name']}")
+    if len(profile['trace']) > 1:
+        lines.append(f"Traced statements: {len(profile['trace'])}")
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the statements of queries/queries.sql.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--only', nargs='+', metavar='DATASET', choices=list(DATA_FILES), help="Profile only these statements")
+    parser.add_argument('--queries', default=QUERIES_PATH, help="SQL file to profile")
+    parser.add_argument('--output-dir', default=PROFILE_DIR, help="Profile folder (default: profiles)")
+    parser.add_argument('--no-ctes', action='store_true', help="Do not profile the CTEs one by one")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    profile_queries(args.db_path, args.only, args.queries, args.output_dir, not args.no_ctes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+This module executes queries/queries.sql against the KBO SQLite database and
+streams every result set straight to its CSV file in data/ (and/or to a typed
+Arrow IPC file, see columnar.py).
+
+Each result-producing statement is paired with a dataset name from
+DATA_FILES (same order as in queries.sql). Set-up statements such as the
+TEMPORARY nace_mapping table are run once, on first use, on the shared
+connection.
+"""
+
+import argparse
+import csv
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+from columnar import ARROW_ERRORS, ArrowBatchWriter, require_pyarrow
+from datasets import DATA_DIR, DATA_FILES, DATA_FORMATS, dataset_path
+
+QUERIES_PATH = os.path.join('queries', 'queries.sql')
+DEFAULT_BATCH_SIZE = 10_000
+
+# Matches "CREATE [TEMP|TEMPORARY] TABLE <name>" to know what a set-up statement provides
+_CREATE_TABLE_RE = re.compile(
+    r'CREATE\s+(?:TEMP(?:ORARY)?\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?\[?(\w+)\]?',
+    re.IGNORECASE,
+)
+
+
+def _strip_comments(statement: str) -> str:
+    """Return the statement without its ``--`` comment lines (for classification only)."""
+    lines = [line for line in statement.splitlines() if not line.strip().startswith('--')]
+    return '\n'.join(lines).strip()
+
+
+def split_queries(sql_text: str) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Split the content of queries.sql into set-up and result-producing statements.
+
+    Parameters
+        sql_text : str
+            Full text of the SQL file.
+
+    Returns
+        tuple[dict[str, str], dict[str, str]]
+            ``(setup, queries)`` where ``setup`` maps created table name -> CREATE
+            statement and ``queries`` maps dataset name -> SELECT statement.
+    """
+    statements: list[str] = []
+    buffer: list[str] = []
+    for line in sql_text.splitlines(keepends=True):
+        buffer.append(line)
+        chunk = ''.join(buffer)
+        if sqlite3.complete_statement(chunk):
+            if _strip_comments(chunk):
+                statements.append(chunk.strip())
+            buffer = []
+    # A trailing statement without ';' is still a statement
+    tail = ''.join(buffer)
+    if _strip_comments(tail):
+        statements.append(tail.strip())
+
+    setup: dict[str, str] = {}
+    selects: list[str] = []
+    for stmt in statements:
+        match = _CREATE_TABLE_RE.match(_strip_comments(stmt))
+        if match:
+            setup[match.group(1)] = stmt
+        else:
+            selects.append(stmt)
+
+    if len(selects) != len(DATA_FILES):
+        raise ValueError(
+            f"Expected {len(DATA_FILES)} result statements in queries.sql, found {len(selects)}"
+        )
+    return setup, dict(zip(DATA_FILES, selects))
+
+
+def load_queries(queries_path: str = QUERIES_PATH) -> tuple[dict[str, str], dict[str, str]]:
+    """Read queries.sql from disk and split it (see :func:`split_queries`)."""
+    with open(queries_path, encoding='utf-8') as f:
+        return split_queries(f.read())
+
+
+def connect_readonly(db_path: str, **kwargs) -> sqlite3.Connection:
+    """Open the KBO database read-only (TEMP tables are still allowed); ``kwargs`` go to sqlite3.connect."""
+    uri = Path(db_path).resolve().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True, **kwargs)
+
+
+def export_query(conn: sqlite3.Connection, sql: str, paths: dict[str, str], name: str,
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    Execute ``sql`` once and write its result to every output in ``fetchmany`` batches.
+
+    Every output is written next to its path and moved into place only once
+    the whole result was written, so a failed query never leaves a partial file.
+
+    Parameters
+        paths : dict[str, str]
+            Output format ('csv' or 'arrow') -> file path. Each batch goes to
+            every writer, so asking for several formats does not rerun the query.
+        name : str
+            Dataset name, for the Arrow column types of the schema registry.
+
+    Returns
+        int
+            Number of data rows written (header excluded).
+    """
+    tmp_paths = {fmt: f'{path}.tmp' for fmt, path in paths.items()}
+    rows_written = 0
+    try:
+        cursor = conn.execute(sql)
+        header = [col[0] for col in cursor.description]
+        csv_file = None
+        arrow_writer = None
+        try:
+            writers = []
+            if 'csv' in paths:
+                csv_file = open(tmp_paths['csv'], 'w', encoding='utf-8', newline='')
+                csv_writer = csv.writer(csv_file, lineterminator='\n')
+                csv_writer.writerow(header)
+                writers.append(csv_writer.writerows)
+            if 'arrow' in paths:
+                arrow_writer = ArrowBatchWriter(tmp_paths['arrow'], name, header)
+                writers.append(arrow_writer.write)
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                for write in writers:
+                    write(batch)
+                rows_written += len(batch)
+        finally:
+            cursor.close()
+            if csv_file is not None:
+                csv_file.close()
+            if arrow_writer is not None:
+                arrow_writer.close()
+    except BaseException:
+        for tmp_path in tmp_paths.values():
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        raise
+    for fmt, tmp_path in tmp_paths.items():
+        os.replace(tmp_path, paths[fmt])
+    return rows_written
+
+
+def run_queries(db_path: str, datasets: list[str] | None = None, data_dir: str = DATA_DIR,
+                queries_path: str = QUERIES_PATH, batch_size: int = DEFAULT_BATCH_SIZE,
+                formats: tuple[str, ...] = ('csv',)) -> dict[str, dict]:
+    """
+    Run the named statements of queries.sql and write one file per dataset and format.
+
+    Parameters
+        db_path : str
+            Path to the KBO SQLite file.
+        datasets : list[str] | None, optional
+            Subset of dataset names to refresh (default: all of DATA_FILES).
+        data_dir : str, optional
+            Output folder for the CSV files (default: 'data').
+        queries_path : str, optional
+            Path to the SQL file (default: 'queries/queries.sql').
+        batch_size : int, optional
+            Rows fetched per ``fetchmany`` call.
+        formats : tuple[str, ...], optional
+            Output formats, any of DATA_FORMATS (default: CSV only). Each query
+            is executed once, whatever the number of formats.
+
+    Returns
+        dict[str, dict]
+            Per dataset: ``{'path', 'rows', 'seconds'}`` (``path`` is the last
+            format written), or ``{'error'}`` on failure.
+    """
+    unknown_formats = [fmt for fmt in formats if fmt not in DATA_FORMATS]
+    if unknown_formats:
+        raise ValueError(f"Unknown format(s): {', '.join(unknown_formats)}")
+    if 'arrow' in formats:
+        require_pyarrow()
+
+    setup, queries = load_queries(queries_path)
+    selected = datasets or list(DATA_FILES)
+    unknown = [name for name in selected if name not in queries]
+    if unknown:
+        raise ValueError(f"Unknown dataset(s): {', '.join(unknown)}")
+
+    os.makedirs(data_dir, exist_ok=True)
+    report: dict[str, dict] = {}
+    created: set[str] = set()
+    conn = connect_readonly(db_path)
+    try:
+        for name in selected:
+            sql = queries[name]
+            start = time.perf_counter()
+            try:
+                # Create the helper tables this query depends on, once per connection
+                for table, create_sql in setup.items():
+                    if table not in created and re.search(rf'\b{table}\b', sql):
+                        setup_start = time.perf_counter()
+                        conn.execute(create_sql)
+                        created.add(table)
+                        print(f"Created helper table {table} "
+                              f"({time.perf_counter() - setup_start:.2f}s)")
+                paths = {fmt: dataset_path(name, fmt, data_dir) for fmt in formats}
+                rows = export_query(conn, sql, paths, name, batch_size)
+                path = paths[formats[-1]]
+            except (sqlite3.Error, *ARROW_ERRORS) as e:
+                print(f"❌ {name}: {e}")
+                report[name] = {'error': str(e)}
+                continue
+            elapsed = time.perf_counter() - start
+            report[name] = {'path': path, 'rows': rows, 'seconds': elapsed}
+            print(f"✅ {name}: {rows:,} rows -> {', '.join(formats)} ({elapsed:.2f}s)")
+    finally:
+        conn.close()
+
+    total = sum(r.get('seconds', 0.0) for r in report.values())
+    print(f"Finished {len(report)} queries in {total:.2f}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queries/queries.sql and export the results.")
+    parser.add_argument('db_path', help="Path to the KBO SQLite database")
+    parser.add_argument('--only', nargs='+', metavar='DATASET', choices=list(DATA_FILES),
+                        help="Refresh only these datasets")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="Output folder (default: data)")
+    parser.add_argument('--queries', default=QUERIES_PATH, help="SQL file to execute")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per fetchmany batch")
+    parser.add_argument('--format', nargs='+', choices=DATA_FORMATS, default=['csv'], dest='formats',
+                        help="Output format(s): csv and/or arrow (typed, memory-mappable)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_path):
+        print(f"❌ Database file not found: {args.db_path}")
+        return
+    run_queries(args.db_path, args.only, args.data_dir, args.queries, args.batch_size,
+                tuple(args.formats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+This module generates a synthetic SQLite database with the shape of the KBO
+open-data file described in docs/database_structure.md, so the queries and the
+charts can be benchmarked without the real 2 GB-plus kbo_database.db.
+
+Tables, columns, types, indexes and the reference row counts are parsed from
+the structure report; ``scale`` is a percentage of those row counts. Value
+distributions follow the committed analysis results in data/ when they are
+present: StartDate years (creation_trends), JuridicalForm (juridical_form),
+NACE codes (sector_growth) and zipcodes (geo_distribution). StartDates are
+dd-mm-yyyy strings with a small share of NULLs, as in the real extract.
+"""
+
+import argparse
+import calendar
+import csv
+import os
+import re
+import sqlite3
+import time
+
+import numpy as np
+
+from datasets import DATA_DIR, DATA_FILES
+
+STRUCTURE_REPORT = os.path.join('docs', 'database_structure.md')
+INSERT_BATCH_SIZE = 100_000
+
+# Share of activity / address / denomination / contact rows that belong to an
+# enterprise (the rest belong to establishments)
+ENTERPRISE_SHARE = 0.6
+NULL_START_DATE_SHARE = 0.0005
+
+# Used when data/ has no committed results to sample from
+_FALLBACK_YEARS = {year: 1 + (year - 1950) ** 2 for year in range(1950, 2026)}
+_FALLBACK_FORMS = {None: 40, 610.0: 25, 14.0: 15, 15.0: 10, 17.0: 10}
+_FALLBACK_NACE = {code: 1 for code in (1110, 10110, 41201, 46900, 47110, 56101, 62010, 68201, 70220, 86210)}
+_FALLBACK_ZIPCODES = {'1000': 5, '1050': 4, '2000': 4, '9000': 3, '3000': 2, '4000': 2, '8000': 2}
+
+
+# -----------------------------------------------------------------------------
+# 1. Schema from the structure report
+# -----------------------------------------------------------------------------
+def parse_structure_report(path: str = STRUCTURE_REPORT) -> dict[str, dict]:
+    """
+    Read tables, columns, indexes and row counts from a report written by
+    database_schema_extractor.py.
+
+    Returns
+        dict[str, dict]
+            Per table: ``{'rows': int, 'columns': [(name, type)], 'indexes': [(name, [columns])]}``.
+    """
+    tables: dict[str, dict] = {}
+    current: dict | None = None
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if match := re.match(r'## Table: `(\w+)`', line):
+                current = tables.setdefault(match.group(1), {'rows': 0, 'columns': [], 'indexes': []})
+            elif current is None:
+                continue
+            elif match := re.match(r'\*\*Row Count\*\*: ~?([\d,]+)', line):
+                current['rows'] = int(match.group(1).replace(',', ''))
+            elif match := re.match(r'\| `(\w+)` \| `(\w*)` \|', line):
+                current['columns'].append((match.group(1), match.group(2)))
+            elif match := re.match(r'- (?:UNIQUE|INDEX) `(\w*)`', line):
+                current['indexes'].append((match.group(1), []))
+            elif (match := re.match(r'\s+- Columns: (.*)', line)) and current['indexes']:
+                current['indexes'][-1][1].extend(re.findall(r'`(\w+)`', match.group(1)))
+    return tables
+
+
+# -----------------------------------------------------------------------------
+# 2. Value distributions
+# -----------------------------------------------------------------------------
+def _read_weights(name: str, key_col: str, weight_col: str, data_dir: str,
+                  convert=str) -> dict:
+    """``{value: weight}`` from a committed result CSV, or ``{}`` when it is missing."""
+    path = os.path.join(data_dir, DATA_FILES[name])
+    weights: dict = {}
+    try:
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                try:
+                    key = convert(row[key_col]) if row[key_col] != '' else None
+                    weights[key] = weights.get(key, 0) + float(row[weight_col])
+                except (KeyError, ValueError):
+                    continue
+    except OSError:
+        return {}
+    return {k: w for k, w in weights.items() if w > 0}
+
+
+def _zipcode(value: str) -> str:
+    """Zipcode of a geo_distribution rollup row; the 'Other zipcodes' / 'Unknown' buckets are skipped."""
+    if value in ('Other zipcodes', 'Unknown'):
+        raise ValueError(value)
+    return value
+
+
+def load_distributions(data_dir: str = DATA_DIR) -> dict[str, dict]:
+    """Sampling weights for StartDate years, JuridicalForm, NaceCode and Zipcode."""
+    return {
+        'year': _read_weights('creation_trends', 'year', 'new_companies', data_dir, int) or _FALLBACK_YEARS,
+        'juridical_form': _read_weights('juridical_form', 'JuridicalForm', 'company_count', data_dir, float)
+                          or _FALLBACK_FORMS,
+        'nace_code': _read_weights('sector_growth', 'nace_code', 'new_companies', data_dir, int) or _FALLBACK_NACE,
+        'zipcode': _read_weights('geo_distribution', 'zipcode', 'company_count', data_dir, _zipcode)
+                   or _read_weights('geo_distribution', 'Zipcode', 'company_count', data_dir)  # flat export
+                   or _FALLBACK_ZIPCODES,
+    }
+
+
+def _sample(rng: np.random.Generator, weights: dict, size: int) -> list:
+    """Draw ``size`` values of ``weights`` (dict keys) proportionally to the weights."""
+    values = list(weights)
+    p = np.array([weights[v] for v in values], dtype=float)
+    picks = rng.choice(len(values), size=size, p=p / p.sum())
+    return [values[i] for i in picks]
+
+
+def _start_dates(rng: np.random.Generator, years: dict, size: int) -> list[str | None]:
+    """dd-mm-yyyy strings with valid days per month, and a small share of NULLs."""
+    year = np.array(_sample(rng, years, size))
+    month = rng.integers(1, 13, size)
+    days_in_month = np.array([calendar.monthrange(2001, m)[1] for m in range(1, 13)])
+    day = 1 + (rng.random(size) * days_in_month[month - 1]).astype(int)
+    missing = rng.random(size) < NULL_START_DATE_SHARE
+    return [None if miss else f'{d:02d}-{m:02d}-{y}' for d, m, y, miss in zip(day, month, year, missing)]
+
+
+def _enterprise_numbers(count: int) -> list[str]:
+    """KBO-style numbers '0200.065.765', ascending like in the extract."""
+    numbers = 200_000_000 + np.arange(count, dtype=np.int64) * 37
+    return [f'{s[:4]}.{s[4:7]}.{s[7:]}' for s in (f'{n:010d}' for n in numbers)]
+
+
+def _establishment_numbers(count: int) -> list[str]:
+    """Establishment-style numbers '2.000.000.123'."""
+    numbers = 2_000_000_000 + np.arange(count, dtype=np.int64) * 53
+    return [f'{s[0]}.{s[1:4]}.{s[4:7]}.{s[7:]}' for s in (f'{n:010d}' for n in numbers)]
+
+
+def _entity_numbers(rng: np.random.Generator, enterprises: list[str], establishments: list[str],
+                    size: int) -> list[str]:
+    """Owners of dependent rows (activity, address, ...), sorted within the batch like the extract."""
+    from_enterprise = rng.random(size) < ENTERPRISE_SHARE if establishments else np.ones(size, bool)
+    ent_idx = rng.integers(0, len(enterprises), size)
+    est_idx = rng.integers(0, max(len(establishments), 1), size)
+    return sorted(enterprises[e] if pick else establishments[s]
+                  for pick, e, s in zip(from_enterprise, ent_idx, est_idx))
+
+
+# -----------------------------------------------------------------------------
+# 3. Row generators (one list of tuples per table, column order of the report)
+# -----------------------------------------------------------------------------
+def _generate_rows(table: str, size: int, rng: np.random.Generator, dist: dict[str, dict],
+                   keys: dict[str, list[str]]) -> list[tuple]:
+    ent, est = keys['enterprise'], keys['establishment']
+    if table == 'enterprise':
+        forms = _sample(rng, dist['juridical_form'], size)
+        dates = _start_dates(rng, dist['year'], size)
+        situation = rng.choice([0, 12, 14, 91], size=size, p=[0.9, 0.04, 0.03, 0.03])
+        return [(number, 'AC', int(sit), 1 if form is None else 2, form, None, date)
+                for number, form, date, sit in zip(ent, forms, dates, situation)]
+    if table == 'establishment':
+        dates = _start_dates(rng, dist['year'], size)
+        owners = rng.integers(0, len(ent), size)
+        return [(number, date, ent[o]) for number, date, o in zip(est, dates, owners)]
+    if table == 'activity':
+        owners = _entity_numbers(rng, ent, est, size)
+        codes = _sample(rng, dist['nace_code'], size)
+        version = rng.choice([2008, 2003, 2025], size=size, p=[0.7, 0.2, 0.1])
+        group = rng.choice([1, 6], size=size, p=[0.8, 0.2])
+        kind = rng.choice(['MAIN', 'SECO', 'ANCI'], size=size, p=[0.5, 0.4, 0.1])
+        return [(o, int(g), int(v), c, k) for o, g, v, c, k in zip(owners, group, version, codes, kind)]
+    if table == 'address':
+        owners = _entity_numbers(rng, ent, est, size)
+        zipcodes = _sample(rng, dist['zipcode'], size)
+        houses = rng.integers(1, 300, size)
+        return [(o, 'REGO' if o[0] == '0' else 'BAET', None, None, z, f'Gemeente {z}', f'Commune {z}',
+                 f'Straat {h % 97}', f'Rue {h % 97}', str(h), None, None, None)
+                for o, z, h in zip(owners, zipcodes, houses)]
+    if table == 'denomination':
+        owners = _entity_numbers(rng, ent, est, size)
+        language = rng.choice([1, 2, 3, 4], size=size, p=[0.5, 0.35, 0.05, 0.1])
+        kind = rng.choice([1, 2, 3], size=size, p=[0.7, 0.2, 0.1])
+        return [(o, int(lang), int(k), f'Company {i}') for i, (o, lang, k) in enumerate(zip(owners, language, kind))]
+    if table == 'contact':
+        owners = _entity_numbers(rng, ent, est, size)
+        kind = rng.choice(['TEL', 'EMAIL', 'WEB'], size=size, p=[0.4, 0.4, 0.2])
+        return [(o, 'ENT' if o[0] == '0' else 'EST', k, f'{k.lower()}-{i}') for i, (o, k) in enumerate(zip(owners, kind))]
+    if table == 'branch':
+        dates = _start_dates(rng, dist['year'], size)
+        owners = rng.integers(0, len(ent), size)
+        return [(f'9.{i:09d}', date, ent[o]) for i, (date, o) in enumerate(zip(dates, owners))]
+    if table == 'code':
+        category = rng.choice(['Nace2008', 'Nace2003', 'JuridicalForm', 'ActivityGroup'], size=size)
+        language = rng.choice(['NL', 'FR', 'DE', 'EN'], size=size)
+        return [(c, str(i), lang, f'{c} {i}') for i, (c, lang) in enumerate(zip(category, language))]
+    if table == 'meta':
+        rows = [('SnapshotDate', '01-01-2025'), ('ExtractTimestamp', '01-01-2025 00:00:00'),
+                ('ExtractType', 'full'), ('ExtractNumber', 'synthetic'), ('Version', '1.0.0')]
+        return rows[:max(size, 1)]
+    raise ValueError(f"No generator for table {table}")
+
+
+# -----------------------------------------------------------------------------
+# 4. Database generation
+# -----------------------------------------------------------------------------
+def generate_database(db_path: str, scale: float = 1.0, seed: int = 42,
+                      structure_path: str = STRUCTURE_REPORT, data_dir: str = DATA_DIR) -> dict[str, int]:
+    """
+    Write a synthetic KBO-shaped database to ``db_path`` (replaced if it exists).
+
+    Parameters
+        db_path : str
+            Output SQLite file.
+        scale : float, optional
+            Percentage of the documented row counts (default: 1.0 = 1 %).
+        seed : int, optional
+            Random seed; the same seed and scale give the same database.
+        structure_path : str, optional
+            Structure report with the schema and the reference row counts.
+        data_dir : str, optional
+            Folder of the committed results used as value distributions.
+
+    Returns
+        dict[str, int]
+            Rows written per table.
+    """
+    schema = parse_structure_report(structure_path)
+    rng = np.random.default_rng(seed)
+    dist = load_distributions(data_dir)
+    sizes = {table: max(1, round(info['rows'] * scale / 100)) for table, info in schema.items()}
+    if 'meta' in sizes:
+        sizes['meta'] = schema['meta']['rows']  # snapshot metadata does not scale
+    keys = {'enterprise': _enterprise_numbers(sizes.get('enterprise', 1)),
+            'establishment': _establishment_numbers(sizes.get('establishment', 0))}
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF;")
+        conn.execute("PRAGMA synchronous=OFF;")
+        for table, info in schema.items():
+            start = time.perf_counter()
+            columns = ', '.join(f'[{name}] {dtype}' for name, dtype in info['columns'])
+            conn.execute(f"CREATE TABLE [{table}] ({columns});")
+            placeholders = ', '.join('?' * len(info['columns']))
+            for offset in range(0, sizes[table], INSERT_BATCH_SIZE):
+                size = min(INSERT_BATCH_SIZE, sizes[table] - offset)
+                batch_keys = keys
+                if table in ('enterprise', 'establishment'):  # one key per row, in order
+                    batch_keys = dict(keys, **{table: keys[table][offset:offset + size]})
+                rows = _generate_rows(table, size, rng, dist, batch_keys)
+                conn.executemany(f"INSERT INTO [{table}] VALUES ({placeholders});", rows)
+            for index_name, index_cols in info['indexes']:
+                index_name = index_name or f"{table}_{'_'.join(index_cols)}_idx"
+                cols = ', '.join(f'[{col}]' for col in index_cols)
+                conn.execute(f"CREATE INDEX [{index_name}] ON [{table}] ({cols});")
+            conn.commit()
+            print(f"✅ {table}: {sizes[table]:,} rows ({time.perf_counter() - start:.2f}s)")
+    finally:
+        conn.close()
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic KBO-shaped SQLite database.")
+    parser.add_argument('db_path', help="Output SQLite file")
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help="Percentage of the documented row counts (default: 1)")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument('--structure', default=STRUCTURE_REPORT, help="Structure report with the schema")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.structure):
+        print(f"❌ Structure report not found: {args.structure}")
+        return
+    generate_database(args.db_path, args.scale, args.seed, args.structure)
+
+
+if __name__ == "__main__":
+    main()
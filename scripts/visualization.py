@@ -3,31 +3,143 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 import os
-import re
+import time
+import json
+import hashlib
+import inspect
+import tracemalloc
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from plotly.io import write_html, write_image
+from plotly.offline import get_plotlyjs
+from datasets import DATA_FORMATS, DATASET_SCHEMAS, dataset_path, geo_rollup_from_flat, standardize_name
+from columnar import arrow_column_names, read_arrow
+
+try:
+    import pyarrow  # noqa: F401
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 # Ensure the plots folder exists
 os.makedirs('plots', exist_ok=True)
 
 def standardize_column_names(df):
-    df.columns = df.columns.str.lower()
-    df.columns = [re.sub(r'[^\w]', '_', col) for col in df.columns]
-    df.columns = [re.sub(r'_+', '_', col) for col in df.columns]
-    df.columns = [col.strip('_') for col in df.columns]
+    df.columns = [standardize_name(col) for col in df.columns]
     return df
 
+# HTML output: 'full' embeds plotly.js in every page, 'shared' points every page
+# at one plots/plotly.min.js, 'dashboard' puts all charts on plots/dashboard.html.
+# 'figure' (used by analytics_service.py) writes nothing and returns the compact figure
+HTML_MODES = ('full', 'shared', 'dashboard')
+HTML_MODE = 'full'
+PLOTLYJS_PATH = 'plots/plotly.min.js'
+DASHBOARD_PATH = 'plots/dashboard.html'
+FRAGMENT_DIR = 'plots/.fragments'  # dashboard parts, kept for the render cache but not published
+FLOAT_DECIMALS = 2
+
+def set_html_mode(mode):
+    global HTML_MODE
+    if mode not in HTML_MODES and mode != 'figure':
+        raise ValueError(f"Unknown HTML mode: {mode}")
+    HTML_MODE = mode
+
+def compact_array(values, axis=False):
+    # Numeric arrays as numpy so plotly.io writes them as base64 typed arrays:
+    # rounded, whole numbers as int32, axis values (formatted by plotly.js) as float32
+    arr = np.asarray(values)
+    if arr.dtype.kind in 'iu':
+        return arr.astype(np.int32) if arr.dtype.itemsize > 4 and np.abs(arr).max(initial=0) < 2**31 else arr
+    if arr.dtype.kind != 'f':
+        return values
+    arr = np.round(arr, FLOAT_DECIMALS)
+    if np.isfinite(arr).all() and (arr == np.round(arr)).all() and np.abs(arr).max(initial=0) < 2**31:
+        return arr.astype(np.int32)
+    return arr.astype(np.float32) if axis else arr
+
+def compact_figure(fig):
+    # Traces are rebuilt: plotly ignores assigning an equal array of another dtype
+    traces = []
+    for trace in fig.data:
+        updates = {attr: compact_array(trace[attr], axis=attr != 'values')
+                   for attr in ('x', 'y', 'r', 'values') if attr in trace and trace[attr] is not None}
+        if 'marker' in trace:
+            marker = {attr: compact_array(trace.marker[attr]) for attr in ('size', 'color', 'colors')
+                      if attr in trace.marker and trace.marker[attr] is not None
+                      and not isinstance(trace.marker[attr], str)}
+            updates['marker'] = type(trace.marker)(trace.marker, **marker)
+        traces.append(type(trace)(trace, **updates))
+    return go.Figure(data=traces, layout=fig.layout)
+
+def write_plotlyjs():
+    # One plotly.js bundle for every page, rewritten only when plotly was upgraded
+    bundle = get_plotlyjs()
+    try:
+        with open(PLOTLYJS_PATH, encoding='utf-8') as f:
+            if f.read() == bundle:
+                return
+    except OSError:
+        pass
+    tmp_path = f'{PLOTLYJS_PATH}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(bundle)
+    os.replace(tmp_path, PLOTLYJS_PATH)
+    print(f"Saved shared plotly.js: {PLOTLYJS_PATH}")
+
 def save_plot(fig, filename):
+    if HTML_MODE == 'figure':
+        return compact_figure(fig)
     html_path = f'plots/{filename}.html'
     png_path = f'plots/{filename}.png'
-    write_html(fig, html_path, auto_open=False)
+    if HTML_MODE == 'full':
+        write_html(fig, html_path, auto_open=False)
+    else:
+        fig = compact_figure(fig)
+    if HTML_MODE == 'shared':
+        write_html(fig, html_path, include_plotlyjs=os.path.basename(PLOTLYJS_PATH), auto_open=False)
+    elif HTML_MODE == 'dashboard':
+        # A bare <div> per chart, assembled into the dashboard page afterwards
+        os.makedirs(FRAGMENT_DIR, exist_ok=True)
+        html_path = f'{FRAGMENT_DIR}/{filename}.html'
+        with open(html_path, 'w', encoding='utf-8') as f:
+            f.write(fig.to_html(full_html=False, include_plotlyjs=False, default_height='600px'))
     try:
         write_image(fig, png_path, scale=2)
         print(f"Saved static image: {png_path}")
     except Exception as e:
+        # None marks the output as not written: an older PNG may still be on disk
         print(f"Failed to save PNG: {e} (please ensure kaleido is installed)")
+        png_path = None
     print(f"Saved interactive chart: {html_path}")
     return html_path, png_path
 
+DASHBOARD_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>KBO Company Analysis</title>
+<script src="{plotlyjs}"></script>
+<style>body {{ font-family: sans-serif; max-width: 1200px; margin: 0 auto; }} .chart {{ margin: 32px 0; }}</style>
+</head>
+<body>
+<h1>KBO Company Analysis</h1>
+{charts}
+</body>
+</html>
+"""
+
+def write_dashboard(outputs):
+    # Concatenate the rendered fragments (chart name -> output paths) in chart order into one page
+    charts = []
+    for name in CHART_BUILDERS:
+        for path in outputs.get(name, []):
+            if os.path.dirname(path) == FRAGMENT_DIR and os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    charts.append(f'<div class="chart">{f.read()}</div>')
+    with open(DASHBOARD_PATH, 'w', encoding='utf-8') as f:
+        f.write(DASHBOARD_TEMPLATE.format(plotlyjs=os.path.basename(PLOTLYJS_PATH), charts='\n'.join(charts)))
+    print(f"Saved dashboard with {len(charts)} charts: {DASHBOARD_PATH}")
+
 # 1. Juridical Form Distribution
 def visualize_juridical_form(df):
     if 'juridicalform' not in df.columns or 'percentage' not in df.columns:
@@ -89,16 +201,16 @@ def visualize_creation_trends(df):
 
 # 5. Geographical Distribution of Companies
 def visualize_geo_distribution(df):
-    required_cols = ['zipcode', 'company_count', 'percentage']
+    required_cols = ['province', 'municipality', 'zipcode', 'company_count']
     if not all(col in df.columns for col in required_cols):
         print(f"Error: DataFrame is missing required columns {required_cols}")
         return None
-    df = df.groupby('zipcode').agg({'company_count': 'sum', 'percentage': 'first'}).reset_index()
-    df = df.sort_values('company_count', ascending=False).head(20)
-    fig = px.treemap(df, path=['zipcode'], values='company_count',
-                     title='Geographical Distribution of Companies (Top 20 Zip Codes)',
-                     color='company_count', color_continuous_scale='Blues',
-                     hover_data=['percentage'])
+    # The rollup is already top-N per level: show provinces, click to drill down
+    fig = px.treemap(df, path=[px.Constant('All companies'), 'province', 'municipality', 'zipcode'],
+                     values='company_count', maxdepth=2,
+                     title='Geographical Distribution of Companies (Province › Municipality › Zip Code)',
+                     color='company_count', color_continuous_scale='Blues')
+    fig.update_traces(textinfo='label+value+percent parent')
     fig.update_layout(margin=dict(t=50, l=25, r=25, b=25))
     return save_plot(fig, 'geographical_distribution')
 
@@ -108,8 +220,12 @@ def visualize_sector_growth(df):
     if not all(col in df.columns for col in required_cols):
         print(f"Error: DataFrame is missing required columns {required_cols}")
         return None
-    top_sectors = df.groupby('sector_name')['yoy_growth'].mean().nlargest(10).index
+    top_sectors = df.groupby('sector_name', observed=True)['yoy_growth'].mean().nlargest(10).index
     filtered_df = df[df['sector_name'].isin(top_sectors)]
+    if HTML_MODE != 'full':
+        # Decimate to one point per sector and year (the mean over its NACE codes)
+        filtered_df = filtered_df.groupby(['sector_name', 'year'], observed=True)['yoy_growth'] \
+            .mean().reset_index()
     fig = px.line(filtered_df, x='year', y='yoy_growth', color='sector_name',
                   title='Year-over-Year Growth Trends for Top 10 Sectors',
                   markers=True)
@@ -218,57 +334,248 @@ def visualize_industry_archetypes(df):
         title="Industry Archetype Characteristics Comparison", showlegend=True)
     return save_plot(fig, 'industry_archetypes')
 
+# Dataset name -> chart builder, in rendering order
+CHART_BUILDERS = {
+    'juridical_form': visualize_juridical_form,
+    'company_status': visualize_company_status,
+    'company_age': visualize_company_age,
+    'creation_trends': visualize_creation_trends,
+    'geo_distribution': visualize_geo_distribution,
+    'sector_growth': visualize_sector_growth,
+    'overall_growth': visualize_overall_growth,
+    'recent_growth': visualize_recent_growth,
+    'emerging_industries': visualize_emerging_industries,
+    'invisible_champions': visualize_invisible_champions,
+    'cruel_industries': visualize_cruel_industries,
+    'industry_archetypes': visualize_industry_archetypes
+}
+
+def read_csv_fast(path, **kwargs):
+    # pyarrow engine when installed; the C engine covers the options and types it
+    # does not support (ValueError from pandas, ArrowInvalid / ArrowNotImplementedError)
+    if PYARROW_AVAILABLE:
+        try:
+            return pd.read_csv(path, engine='pyarrow', **kwargs)
+        except (ValueError, NotImplementedError) as e:
+            print(f"pyarrow engine cannot read {path} ({e}), falling back to the C engine")
+    return pd.read_csv(path, **kwargs)
+
+def read_dataset(path, schema=None):
+    # Read only the columns the chart needs, with the compact dtypes of the schema
+    if path.endswith('.arrow'):
+        # Typed and memory-mapped: only the casts to category/string are left to do
+        columns = None
+        if schema is not None:
+            columns = [col for col in arrow_column_names(path) if standardize_name(col) in schema['usecols']]
+        return standardize_column_names(read_arrow(path, columns, schema and schema['dtypes']))
+    if schema is None:
+        return standardize_column_names(read_csv_fast(path))
+    # Column names, not positions: the pyarrow engine rejects integer usecols
+    header = {col: standardize_name(col) for col in pd.read_csv(path, nrows=0).columns}
+    usecols = [col for col, name in header.items() if name in schema['usecols']]
+    dtype = {col: schema['dtypes'][header[col]] for col in usecols if header[col] in schema['dtypes']}
+    try:
+        df = read_csv_fast(path, usecols=usecols, dtype=dtype)
+    except (ValueError, TypeError) as e:
+        print(f"Declared dtypes do not fit {path} ({e}), inferring them instead")
+        df = read_csv_fast(path, usecols=usecols)
+    return standardize_column_names(df)
+
+def input_path(name, fmt='csv'):
+    # Arrow file when requested and present, the CSV export otherwise
+    path = dataset_path(name, fmt)
+    return path if os.path.exists(path) else dataset_path(name, 'csv')
+
+def load_dataset(name, fmt='csv'):
+    path = input_path(name, fmt)
+    try:
+        tracemalloc.start()  # numpy/pandas buffers are traced; Arrow's own pool is not
+        df = read_dataset(path, DATASET_SCHEMAS.get(name))
+        if name == 'geo_distribution' and 'province' not in df.columns and 'zipcode' in df.columns:
+            # Legacy flat zipcode export: roll it up here until the file is regenerated
+            df = geo_rollup_from_flat(df).astype(DATASET_SCHEMAS[name]['dtypes'])
+            print(f"Rolled up the flat zipcode export {path} by province "
+                  "(re-run query_runner.py --only geo_distribution for municipality names)")
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = df.memory_usage(deep=True).sum()
+        print(f"Loaded: {path} ({len(df):,} rows, {size / 1024:,.1f} KiB in memory, "
+              f"peak {peak / 1024:,.1f} KiB while loading)")
+        return df
+    except Exception as e:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        print(f"Failed to load {path}: {e}")
+        return None
+
+def chrome_available():
+    # kaleido's sync server hangs every export when Chrome is missing, so look first
+    if os.environ.get('BROWSER_PATH'):
+        return True
+    try:
+        from choreographer.browsers import Chromium
+        return Chromium.find_browser(skip_local=False) is not None
+    except Exception:
+        return False
+
+def start_kaleido():
+    # Keep one Chromium alive for every write_image call of this process
+    # instead of cold-starting it per figure: plotly's kaleido.calc_fig_sync
+    # goes through this server when it runs (start_sync_server: kaleido >= 1.1)
+    try:
+        import kaleido
+    except ImportError:
+        return
+    if not hasattr(kaleido, 'start_sync_server') or not chrome_available():
+        print("Kaleido server not started, falling back to per-figure export")
+        return
+    kaleido.start_sync_server(silence_warnings=True)  # stopped by kaleido at exit
+
+# Render cache: chart name -> fingerprint of its input CSV and code, plus its outputs
+CACHE_MANIFEST = 'plots/.render_cache.json'
+
+def chart_fingerprint(name, fmt='csv', html_mode='full'):
+    # Hash of the input file bytes, of the HTML mode and of the code that turns
+    # it into files (builder, save_plot and reader); None if the input is missing
+    digest = hashlib.sha256(html_mode.encode('utf-8'))
+    try:
+        with open(input_path(name, fmt), 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    except OSError:
+        return None
+    for func in (CHART_BUILDERS[name], save_plot, compact_figure, compact_array, read_dataset, read_arrow,
+                 load_dataset, geo_rollup_from_flat):
+        digest.update(inspect.getsource(func).encode('utf-8'))
+    digest.update(json.dumps(DATASET_SCHEMAS.get(name), sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+def load_manifest():
+    try:
+        with open(CACHE_MANIFEST, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    tmp_path = f'{CACHE_MANIFEST}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, CACHE_MANIFEST)
+
+def evict_stale_entries(manifest):
+    # Drop entries (and their files) for charts that no longer exist
+    for name in [n for n in manifest if n not in CHART_BUILDERS]:
+        for path in manifest.pop(name).get('outputs', []):
+            if os.path.exists(path):
+                os.remove(path)
+        print(f"Evicted stale cache entry: {name}")
+
+def is_cached(manifest, name, fingerprint):
+    entry = manifest.get(name)
+    return (fingerprint is not None and entry is not None
+            and entry.get('fingerprint') == fingerprint
+            and bool(entry.get('outputs'))
+            and all(os.path.exists(path) for path in entry['outputs']))
+
+def update_manifest(manifest, results, fingerprints):
+    for r in results:
+        if r['status'] == 'ok' and fingerprints.get(r['name']):
+            manifest[r['name']] = {'fingerprint': fingerprints[r['name']], 'outputs': r['outputs']}
+        elif r['status'] != 'cached':
+            manifest.pop(r['name'], None)
+
+def render_chart(name, df=None, fmt='csv', html_mode='full'):
+    # Build and save one chart; errors are reported instead of raised so a
+    # broken dataset never stops the other charts
+    start = time.perf_counter()
+    try:
+        set_html_mode(html_mode)
+        if df is None:
+            df = load_dataset(name, fmt)
+        if df is None:
+            return {'name': name, 'status': 'skipped', 'seconds': time.perf_counter() - start}
+        result = CHART_BUILDERS[name](df)
+        # Only the files written by this run count; 'partial' charts are not cached
+        outputs = [path for path in (result or []) if path is not None]
+        status = 'skipped' if result is None else 'ok' if len(outputs) == len(result) else 'partial'
+        return {'name': name, 'status': status, 'outputs': outputs,
+                'seconds': time.perf_counter() - start}
+    except Exception as e:
+        return {'name': name, 'status': 'failed', 'error': str(e),
+                'seconds': time.perf_counter() - start}
+
+def render_parallel(names, workers, fmt='csv', html_mode='full'):
+    # Each worker process loads its own dataset and reuses its own Kaleido server
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_kaleido) as pool:
+        futures = {pool.submit(render_chart, name, None, fmt, html_mode): name for name in names}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:  # e.g. a worker process died
+                results.append({'name': futures[future], 'status': 'failed', 'error': str(e), 'seconds': 0.0})
+    order = {name: i for i, name in enumerate(names)}
+    return sorted(results, key=lambda r: order[r['name']])
+
+def print_render_report(results, wall_time):
+    print("Chart timings:")
+    for r in results:
+        error = f" ({r['error']})" if r.get('error') else ''
+        print(f"  {r['name']:<22} {r['status']:<8} {r['seconds']:6.2f}s{error}")
+    failed = [r['name'] for r in results if r['status'] == 'failed']
+    print(f"Rendered {len(results)} charts in {wall_time:.2f}s"
+          + (f", failed: {', '.join(failed)}" if failed else ''))
+
 def main():
+    parser = argparse.ArgumentParser(description="Generate the HTML and PNG charts from the datasets in data/.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Render charts in this many worker processes (default: 1, sequential)")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-render every chart, ignoring the render cache")
+    parser.add_argument('--format', choices=DATA_FORMATS, default='csv', dest='fmt',
+                        help="Read the typed Arrow files when present (default: csv)")
+    parser.add_argument('--html', choices=HTML_MODES, default='full',
+                        help="full: plotly.js in every page (default); shared: one plots/plotly.min.js "
+                             "and compact data; dashboard: all charts on plots/dashboard.html")
+    args = parser.parse_args()
+
     print("Starting to generate visualizations...")
-    data_files = {
-        'juridical_form': 'juridical_form.csv',
-        'company_status': 'company_status.csv',
-        'company_age': 'company_age.csv',
-        'creation_trends': 'creation_trends.csv',
-        'geo_distribution': 'geo_distribution.csv',
-        'sector_growth': 'sector_growth.csv',
-        'overall_growth': 'overall_growth.csv',
-        'recent_growth': 'recent_growth.csv',
-        'emerging_industries': 'emerging_industries.csv',
-        'invisible_champions': 'invisible_champions.csv',
-        'cruel_industries': 'cruel_industries.csv',
-        'industry_archetypes': 'industry_archetypes.csv'
-    }
-    data_frames = {}
-    for name, file in data_files.items():
-        try:
-            df = pd.read_csv(f'data/{file}')
-            data_frames[name] = standardize_column_names(df)
-            print(f"Loaded: data/{file}")
-        except Exception as e:
-            print(f"Failed to load data/{file}: {e}")
-            data_frames[name] = None
-    print("Data loading complete, starting to generate charts...")
-    if data_frames['juridical_form'] is not None:
-        visualize_juridical_form(data_frames['juridical_form'])
-    if data_frames['company_status'] is not None:
-        visualize_company_status(data_frames['company_status'])
-    if data_frames['company_age'] is not None:
-        visualize_company_age(data_frames['company_age'])
-    if data_frames['creation_trends'] is not None:
-        visualize_creation_trends(data_frames['creation_trends'])
-    if data_frames['geo_distribution'] is not None:
-        visualize_geo_distribution(data_frames['geo_distribution'])
-    if data_frames['sector_growth'] is not None:
-        visualize_sector_growth(data_frames['sector_growth'])
-    if data_frames['overall_growth'] is not None:
-        visualize_overall_growth(data_frames['overall_growth'])
-    if data_frames['recent_growth'] is not None:
-        visualize_recent_growth(data_frames['recent_growth'])
-    if data_frames['emerging_industries'] is not None:
-        visualize_emerging_industries(data_frames['emerging_industries'])
-    if data_frames['invisible_champions'] is not None:
-        visualize_invisible_champions(data_frames['invisible_champions'])
-    if data_frames['cruel_industries'] is not None:
-        visualize_cruel_industries(data_frames['cruel_industries'])
-    if data_frames['industry_archetypes'] is not None:
-        visualize_industry_archetypes(data_frames['industry_archetypes'])
+    start = time.perf_counter()
+    manifest = load_manifest()
+    evict_stale_entries(manifest)
+    fingerprints = {name: chart_fingerprint(name, args.fmt, args.html) for name in CHART_BUILDERS}
+    names = [name for name in CHART_BUILDERS
+             if args.force or not is_cached(manifest, name, fingerprints[name])]
+    results = [{'name': name, 'status': 'cached', 'seconds': 0.0}
+               for name in CHART_BUILDERS if name not in names]
+    if results:
+        print(f"Skipping {len(results)} unchanged charts (use --force to re-render)")
+
+    if args.html != 'full':
+        write_plotlyjs()
+    if names and args.workers > 1:
+        print(f"Rendering {len(names)} charts with {args.workers} workers...")
+        results += render_parallel(names, args.workers, args.fmt, args.html)
+    elif names:
+        data_frames = {name: load_dataset(name, args.fmt) for name in names}
+        print("Data loading complete, starting to generate charts...")
+        start_kaleido()
+        # A dataset that failed to load is reported as skipped, like in render_parallel,
+        # without handing None to render_chart (which would load the file again)
+        results += [render_chart(name, df, args.fmt, args.html) if df is not None
+                    else {'name': name, 'status': 'skipped', 'seconds': 0.0}
+                    for name, df in data_frames.items()]
+
+    update_manifest(manifest, results, fingerprints)
+    save_manifest(manifest)
+    if args.html == 'dashboard':
+        outputs = {name: entry.get('outputs', []) for name, entry in manifest.items()}
+        outputs.update({r['name']: r['outputs'] for r in results if r.get('outputs')})
+        write_dashboard(outputs)
+    order = {name: i for i, name in enumerate(CHART_BUILDERS)}
+    print_render_report(sorted(results, key=lambda r: order[r['name']]), time.perf_counter() - start)
     print("All charts have been generated and saved in the plots/ folder.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()